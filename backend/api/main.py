@@ -4,14 +4,24 @@ Configures middleware, routes, and lifecycle events.
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from api.routes import post_generator
+from api.utils.admission import AdmissionMiddleware, RateLimiter
 from api.utils.config import get_settings
-from api.utils.logger import setup_logging
+from api.utils.logger import DEFAULT_SAMPLE_RATES, setup_logging, stop_logging
+from api.utils.metrics import CONTENT_TYPE, REGISTRY, MetricsMiddleware
 import structlog
 
 # Initialize settings and logging
 settings = get_settings()
-logger = setup_logging(settings.log_level)
+logger = setup_logging(
+    settings.log_level,
+    log_file=settings.log_file,
+    max_bytes=settings.log_file_max_bytes,
+    backup_count=settings.log_file_backup_count,
+    queue_size=settings.log_queue_size,
+    sample_rates={**DEFAULT_SAMPLE_RATES, **settings.log_sample_rates} if settings.log_sampling_enabled else {}
+)
 
 # Create FastAPI application
 app = FastAPI(
@@ -24,6 +34,19 @@ app = FastAPI(
     openapi_url="/openapi.json"
 )
 
+# Per-client rate limits (inside CORS, so 429 responses carry CORS headers)
+if settings.rate_limit_enabled:
+    app.add_middleware(
+        AdmissionMiddleware,
+        limiter=RateLimiter(
+            rate=settings.rate_limit_per_minute / 60.0,
+            burst=settings.rate_limit_burst,
+            max_clients=settings.rate_limit_max_clients
+        ),
+        max_wait=settings.admission_wait_timeout,
+        key_header=settings.rate_limit_key_header
+    )
+
 # Configure CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -33,6 +56,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record request metrics (outermost, so CORS preflights are counted too)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(post_generator.router)
 
@@ -41,7 +68,8 @@ app.include_router(post_generator.router)
 async def startup_event():
     """
     Execute on application startup.
-    Logs startup information.
+    Logs startup information, builds the agent so the first request does not
+    pay for it, and starts pre-warming popular topics.
     """
     logger.info(
         "application_startup",
@@ -49,6 +77,9 @@ async def startup_event():
         app_name=settings.app_name,
         debug=settings.debug
     )
+    await post_generator.init_agent(settings)
+    if settings.prewarm_enabled:
+        post_generator.start_prewarm(settings)
 
 
 @app.on_event("shutdown")
@@ -57,7 +88,11 @@ async def shutdown_event():
     Execute on application shutdown.
     Cleanup and final logging.
     """
+    await post_generator.stop_pool_warmup()
+    await post_generator.stop_prewarm()
+    await post_generator.shutdown_job_manager()
     logger.info("application_shutdown")
+    stop_logging()
 
 
 @app.get("/")
@@ -75,3 +110,19 @@ async def root():
         "redoc": "/redoc",
         "health": "/api/v1/health"
     }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Prometheus scrape endpoint.
+    
+    Metrics are kept per process; with several workers each scrape reflects
+    the worker that served it.
+    
+    Returns:
+        Response in the Prometheus text exposition format
+    """
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
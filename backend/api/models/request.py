@@ -2,6 +2,7 @@
 Pydantic request models for API validation.
 """
 from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 
 
 class PostGenerationRequest(BaseModel):
@@ -14,6 +15,20 @@ class PostGenerationRequest(BaseModel):
         description="Topic to search news about and generate LinkedIn post",
         examples=["Artificial Intelligence in Healthcare", "Climate Change Policy"]
     )
+    image_mode: Literal["inline", "skip", "defer"] = Field(
+        "inline",
+        description=(
+            "inline: include the image suggestion; skip: leave it out; "
+            "defer: return without it and fetch it later from GET /image-suggestion"
+        )
+    )
+    generation_mode: Optional[Literal["direct", "deep"]] = Field(
+        None,
+        description=(
+            "direct: one search round and one LLM call; deep: multi-step ReAct agent "
+            "(default from GENERATION_MODE)"
+        )
+    )
     
     class Config:
         json_schema_extra = {
@@ -21,3 +36,24 @@ class PostGenerationRequest(BaseModel):
                 "topic": "Artificial Intelligence"
             }
         }
+
+
+class BatchPostGenerationRequest(BaseModel):
+    """Request model for generating LinkedIn posts for several topics."""
+    
+    topics: List[PostGenerationRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=50,
+        description="Topics to generate posts for (duplicates are generated once)"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "topics": [
+                    {"topic": "Artificial Intelligence"},
+                    {"topic": "Climate Change Policy"}
+                ]
+            }
+        }
@@ -2,7 +2,7 @@
 Pydantic response models for API responses.
 """
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
 
@@ -37,6 +37,18 @@ class PostGenerationResponse(BaseModel):
     generated_at: datetime = Field(
         description="Timestamp of generation in ISO 8601 format"
     )
+    cached: bool = Field(
+        False,
+        description="True if the post was served from the result cache"
+    )
+    image_pending: bool = Field(
+        False,
+        description="True if the image suggestion was deferred and is still being generated"
+    )
+    partial: bool = Field(
+        False,
+        description="True if the request deadline cut searching short; such posts are not cached"
+    )
     
     class Config:
         json_schema_extra = {
@@ -49,6 +61,107 @@ class PostGenerationResponse(BaseModel):
                 ],
                 "linkedin_post": "Is AI really changing everything? 🤖\n\nRecent developments show AI is transforming industries at an unprecedented pace.\n\n1. Healthcare diagnostics are now 40% more accurate with AI assistance\n2. Financial institutions are preventing fraud with 95% accuracy\n3. Manufacturing efficiency has improved by 30% through predictive maintenance\n\nWhilst the technology is impressive, the real question is how we ensure ethical implementation. We need frameworks that balance innovation with responsibility.\n\nWhat's your experience with AI in your industry? #ArtificialIntelligence #Technology #Innovation",
                 "image_suggestion": "Professional image showing AI neural network visualization with modern technology theme",
-                "generated_at": "2025-11-05T10:30:00"
+                "generated_at": "2025-11-05T10:30:00",
+                "cached": False,
+                "image_pending": False
             }
         }
+
+
+class ImageSuggestionResponse(BaseModel):
+    """Response model for a deferred image suggestion."""
+    
+    topic: str = Field(
+        description="Topic requested"
+    )
+    status: Literal["ready", "unavailable"] = Field(
+        description="ready if a suggestion exists, unavailable if it failed or timed out"
+    )
+    image_suggestion: Optional[str] = Field(
+        None,
+        description="Suggested image description (null if unavailable)"
+    )
+
+
+class BatchPostResult(BaseModel):
+    """Outcome of one topic in a batch generation."""
+    
+    index: int = Field(
+        description="Position of the topic in the request"
+    )
+    topic: str = Field(
+        description="Topic requested"
+    )
+    status: Literal["ok", "error"] = Field(
+        description="Whether generation succeeded for this topic"
+    )
+    post: Optional[PostGenerationResponse] = Field(
+        None,
+        description="Generated post (null on error)"
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Error message (null on success)"
+    )
+
+
+class BatchPostGenerationResponse(BaseModel):
+    """Response model for batch LinkedIn post generation."""
+    
+    results: List[BatchPostResult] = Field(
+        default_factory=list,
+        description="Per-topic results in request order"
+    )
+    succeeded: int = Field(
+        description="Number of topics generated successfully"
+    )
+    failed: int = Field(
+        description="Number of topics that failed"
+    )
+
+
+class JobSubmissionResponse(BaseModel):
+    """Response model for a queued generation job."""
+    
+    job_id: str = Field(
+        description="Identifier to poll with GET /jobs/{job_id}"
+    )
+    status: Literal["queued", "running", "succeeded", "failed"] = Field(
+        description="Current job status"
+    )
+    status_url: str = Field(
+        description="Path of the job status endpoint"
+    )
+
+
+class JobStatusResponse(BaseModel):
+    """Response model for the status (and result) of a generation job."""
+    
+    job_id: str = Field(
+        description="Job identifier"
+    )
+    topic: str = Field(
+        description="Topic requested"
+    )
+    status: Literal["queued", "running", "succeeded", "failed"] = Field(
+        description="Current job status"
+    )
+    created_at: datetime = Field(
+        description="When the job was queued"
+    )
+    started_at: Optional[datetime] = Field(
+        None,
+        description="When a worker picked the job up"
+    )
+    finished_at: Optional[datetime] = Field(
+        None,
+        description="When the job succeeded or failed"
+    )
+    result: Optional[PostGenerationResponse] = Field(
+        None,
+        description="Generated post (null until the job succeeds)"
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Error message (null unless the job failed)"
+    )
@@ -1,27 +1,58 @@
 """
 FastAPI routes for LinkedIn post generation.
 """
-from fastapi import APIRouter, HTTPException, Depends
-from api.models.request import PostGenerationRequest
-from api.models.response import PostGenerationResponse
-from api.services.langchain_agent import NewsToLinkedInAgent
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from api.models.request import PostGenerationRequest, BatchPostGenerationRequest
+from api.models.response import (
+    PostGenerationResponse,
+    ImageSuggestionResponse,
+    BatchPostResult,
+    BatchPostGenerationResponse,
+    JobSubmissionResponse,
+    JobStatusResponse
+)
+from api.services.langchain_agent import (
+    NewsToLinkedInAgent,
+    get_search_cache,
+    get_post_cache,
+    get_image_cache,
+    get_page_cache,
+    get_topic_tracker
+)
+from api.services.jobs import JobManager, QueueFullError
+from api.services.prewarm import PrewarmScheduler
+from api.utils.admission import AdmissionRejected, retry_after_header
 from api.utils.config import get_settings, Settings
+from api.utils.deadline import Deadline, DeadlineExceeded
+from api.utils.job_store import create_job_store
 from api.utils.logger import setup_logging
 import structlog
+import asyncio
+import json
+import threading
 from datetime import datetime
-from typing import Dict
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 router = APIRouter(prefix="/api/v1", tags=["Post Generation"])
 logger = structlog.get_logger()
 
 # Cache agent instance
 _agent_instance = None
+_agent_lock = threading.Lock()
+_agent_ready = threading.Event()  # Set once the agent (and its pool, if enabled) is warm
+_pool_warmup = None
+_job_manager = None
+_prewarm_scheduler = None
 
 
 def get_agent(settings: Settings = Depends(get_settings)) -> NewsToLinkedInAgent:
     """
     Dependency injection for agent with caching.
     
+    The agent is normally built by init_agent at startup. Built under a lock,
+    so requests arriving first never build (and probe models) more than once.
+    
     Args:
         settings: Application settings
     
@@ -30,17 +61,153 @@ def get_agent(settings: Settings = Depends(get_settings)) -> NewsToLinkedInAgent
     """
     global _agent_instance
     if _agent_instance is None:
-        _agent_instance = NewsToLinkedInAgent(
-            gemini_api_key=settings.gemini_api_key,
-            groq_api_key=settings.groq_api_key
-        )
+        with _agent_lock:
+            if _agent_instance is None:
+                _agent_instance = NewsToLinkedInAgent(
+                    gemini_api_key=settings.gemini_api_key,
+                    groq_api_key=settings.groq_api_key,
+                    settings=settings
+                )
+                if not settings.agent_pool_enabled:
+                    _agent_ready.set()
     return _agent_instance
 
 
+async def init_agent(settings: Settings) -> None:
+    """
+    Build the agent (called from the startup hook) and start warming its pool.
+    
+    The agent is built in a thread so the event loop stays free. With
+    AGENT_POOL_ENABLED, the pool warms in the background and the service
+    reports not-ready until it has.
+    
+    Args:
+        settings: Application settings
+    """
+    global _pool_warmup
+    loop = asyncio.get_running_loop()
+    try:
+        agent = await loop.run_in_executor(None, get_agent, settings)
+    except Exception as e:
+        # Left to the first request, which reports the error
+        logger.error("agent_init_failed", error=str(e), exc_info=True)
+        return
+    
+    if settings.agent_pool_enabled and _pool_warmup is None:
+        async def warm_pool() -> None:
+            try:
+                await agent.warm_pool()
+            except Exception as e:
+                logger.error("agent_pool_warmup_failed", error=str(e), exc_info=True)
+            _agent_ready.set()
+        
+        _pool_warmup = asyncio.ensure_future(warm_pool())
+
+
+async def stop_pool_warmup() -> None:
+    """Cancel pool warm-up, if it is still running."""
+    global _pool_warmup
+    if _pool_warmup is not None:
+        _pool_warmup.cancel()
+        await asyncio.gather(_pool_warmup, return_exceptions=True)
+        _pool_warmup = None
+
+
+def get_job_manager(
+    agent: NewsToLinkedInAgent = Depends(get_agent),
+    settings: Settings = Depends(get_settings)
+) -> JobManager:
+    """
+    Dependency injection for the job manager, created on first use.
+    
+    Args:
+        agent: Agent the job workers generate posts with
+        settings: Application settings
+    
+    Returns:
+        JobManager: Shared job manager
+    """
+    global _job_manager
+    if _job_manager is None:
+        async def run_job(params: Dict[str, Any]) -> Dict[str, Any]:
+            result = await agent.generate_post(params["topic"], params["image_mode"], params["generation_mode"])
+            return _build_post_response(params["topic"], result).model_dump(mode="json")
+        
+        _job_manager = JobManager(
+            run_job,
+            create_job_store(settings.job_store, settings.job_store_path),
+            workers=settings.job_workers,
+            queue_depth=settings.job_queue_depth,
+            ttl=settings.job_ttl
+        )
+    return _job_manager
+
+
+def get_deadline(request: Request, settings: Settings = Depends(get_settings)) -> Optional[Deadline]:
+    """
+    Dependency injection for the request deadline, started as the request arrives.
+    
+    Clients may ask for a shorter deadline with the REQUEST_DEADLINE_HEADER
+    header (seconds); REQUEST_DEADLINE stays the upper bound.
+    
+    Args:
+        request: Incoming request
+        settings: Application settings
+    
+    Returns:
+        Deadline, or None if neither the settings nor the client set one
+    
+    Raises:
+        HTTPException: If the header is not a positive number (400)
+    """
+    seconds = settings.request_deadline
+    header = request.headers.get(settings.request_deadline_header) if settings.request_deadline_header else None
+    if header is not None:
+        try:
+            requested = float(header)
+        except ValueError:
+            requested = 0.0
+        if not requested > 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{settings.request_deadline_header} must be a positive number of seconds"
+            )
+        seconds = min(requested, seconds) if seconds > 0 else requested
+    return Deadline(seconds) if seconds > 0 else None
+
+
+async def shutdown_job_manager() -> None:
+    """Stop the job workers, if they were started."""
+    if _job_manager is not None:
+        await _job_manager.shutdown()
+
+
+def start_prewarm(settings: Settings) -> None:
+    """
+    Start pre-warming popular topics (called from the startup hook).
+    
+    Args:
+        settings: Application settings
+    """
+    global _prewarm_scheduler
+    if _prewarm_scheduler is None:
+        _prewarm_scheduler = PrewarmScheduler(get_agent(settings), get_topic_tracker(settings), settings)
+        _prewarm_scheduler.start()
+
+
+async def stop_prewarm() -> None:
+    """Stop pre-warming, if it was started."""
+    global _prewarm_scheduler
+    if _prewarm_scheduler is not None:
+        await _prewarm_scheduler.stop()
+        _prewarm_scheduler = None
+
+
 @router.post("/generate-post", response_model=PostGenerationResponse)
 async def generate_linkedin_post(
     request: PostGenerationRequest,
-    agent: NewsToLinkedInAgent = Depends(get_agent)
+    agent: NewsToLinkedInAgent = Depends(get_agent),
+    deadline: Optional[Deadline] = Depends(get_deadline)
 ) -> PostGenerationResponse:
     """
     Generate a LinkedIn post from recent news on a given topic.
@@ -50,7 +217,8 @@ async def generate_linkedin_post(
     **Request Body:**
     ```json
     {
-        "topic": "Artificial Intelligence"
+        "topic": "Artificial Intelligence",
+        "image_mode": "inline"
     }
     ```
     
@@ -61,7 +229,9 @@ async def generate_linkedin_post(
         "news_sources": ["url1", "url2", "url3"],
         "linkedin_post": "AI is transforming industries... [generated text]",
         "image_suggestion": "Optional image URL or null",
-        "generated_at": "2025-11-05T10:30:00"
+        "generated_at": "2025-11-05T10:30:00",
+        "cached": false,
+        "image_pending": false
     }
     ```
     
@@ -71,15 +241,33 @@ async def generate_linkedin_post(
     3. Creates a professional LinkedIn post in British English style
     4. Suggests relevant imagery
     
+    Repeat topics are served from a short-lived result cache (``cached`` is
+    true), and concurrent requests for the same topic share one generation.
+    
+    ``generation_mode`` "direct" searches once (query variants in parallel)
+    and writes the post in a single LLM call; "deep" runs the multi-step
+    ReAct agent. The default comes from ``GENERATION_MODE``.
+    
+    The image suggestion runs alongside the agent. ``image_mode`` "skip"
+    leaves it out; "defer" returns without it (``image_pending`` is true) and
+    it can be fetched from GET /image-suggestion.
+    
+    Every stage runs within ``REQUEST_DEADLINE`` (or the shorter deadline in
+    the ``X-Request-Deadline`` header). A deep-mode agent still working near
+    the deadline writes the post from the searches it has made so far.
+    
     Args:
         request: PostGenerationRequest with topic field
         agent: Injected NewsToLinkedInAgent instance
+        deadline: Injected request deadline
     
     Returns:
         PostGenerationResponse: Generated post with metadata
     
     Raises:
-        HTTPException: If generation fails (500)
+        HTTPException: If every generation slot stays busy (429), the
+            deadline passes before a post is written (504) or generation
+            fails (500)
     """
     try:
         logger.info(
@@ -89,16 +277,12 @@ async def generate_linkedin_post(
         )
         
         # Generate post using agent
-        result = await agent.generate_post(request.topic)
+        result = await agent.generate_post(
+            request.topic, request.image_mode, request.generation_mode, deadline=deadline
+        )
         
         # Build response
-        response = PostGenerationResponse(
-            topic=request.topic,
-            news_sources=result["news_sources"],
-            linkedin_post=result["linkedin_post"],
-            image_suggestion=result.get("image_suggestion"),
-            generated_at=datetime.utcnow()
-        )
+        response = _build_post_response(request.topic, result)
         
         logger.info(
             "post_generated_successfully",
@@ -107,7 +291,19 @@ async def generate_linkedin_post(
         )
         
         return response
-        
+    
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": retry_after_header(e.retry_after)}
+        )
+    except DeadlineExceeded as e:
+        logger.warning("post_generation_deadline_exceeded", topic=request.topic, error=str(e))
+        raise HTTPException(
+            status_code=504,
+            detail="Post generation did not finish within the request deadline"
+        )
     except Exception as e:
         logger.error(
             "post_generation_failed",
@@ -121,16 +317,400 @@ async def generate_linkedin_post(
         )
 
 
+def _build_post_response(topic: str, result: Dict[str, Any]) -> PostGenerationResponse:
+    """
+    Build the API response from an agent result.
+    
+    Args:
+        topic: Requested topic
+        result: Dict returned by NewsToLinkedInAgent.generate_post
+    
+    Returns:
+        PostGenerationResponse: Response model
+    """
+    return PostGenerationResponse(
+        topic=topic,
+        news_sources=result["news_sources"],
+        linkedin_post=result["linkedin_post"],
+        image_suggestion=result.get("image_suggestion"),
+        generated_at=datetime.utcnow(),
+        cached=result.get("cached", False),
+        image_pending=result.get("image_pending", False),
+        partial=result.get("partial", False)
+    )
+
+
+async def _batch_results(
+    agent: NewsToLinkedInAgent,
+    topics: List[str],
+    concurrency: int,
+    image_modes: List[str],
+    generation_modes: List[Optional[str]],
+    topic_deadline: Optional[float] = None
+) -> AsyncIterator[BatchPostResult]:
+    """
+    Run a batch on the agent and convert each outcome to a BatchPostResult.
+    
+    Args:
+        agent: Shared agent instance
+        topics: Topics to generate
+        concurrency: Maximum concurrent generations
+        image_modes: Image mode for each topic
+        generation_modes: Generation mode for each topic (None for the default)
+        topic_deadline: Seconds each topic may take once it starts
+    
+    Yields:
+        BatchPostResult as each topic completes
+    """
+    async for item in agent.generate_posts(
+        topics, concurrency, image_modes, generation_modes, topic_deadline=topic_deadline
+    ):
+        if item["error"] is not None:
+            logger.warning("batch_topic_failed", topic=item["topic"], error=str(item["error"]))
+            yield BatchPostResult(
+                index=item["index"],
+                topic=item["topic"],
+                status="error",
+                error=f"Failed to generate post: {str(item['error'])}"
+            )
+        else:
+            yield BatchPostResult(
+                index=item["index"],
+                topic=item["topic"],
+                status="ok",
+                post=_build_post_response(item["topic"], item["result"])
+            )
+
+
+@router.post("/generate-posts", response_model=BatchPostGenerationResponse)
+async def generate_linkedin_posts(
+    request: BatchPostGenerationRequest,
+    stream: bool = False,
+    agent: NewsToLinkedInAgent = Depends(get_agent),
+    settings: Settings = Depends(get_settings),
+    deadline: Optional[Deadline] = Depends(get_deadline)
+):
+    """
+    Generate LinkedIn posts for several topics in one call.
+    
+    **Endpoint:** POST /api/v1/generate-posts
+    
+    **Request Body:**
+    ```json
+    {
+        "topics": [{"topic": "Artificial Intelligence"}, {"topic": "Climate Change Policy"}]
+    }
+    ```
+    
+    Topics run on the shared agent, at most ``BATCH_CONCURRENCY`` at a time.
+    Duplicate topics and repeated searches are only run once. A failing topic
+    is reported in its own result and does not fail the batch.
+    
+    With ``?stream=true`` the response is NDJSON (``application/x-ndjson``),
+    one BatchPostResult line per topic as it completes.
+    
+    Each topic gets the request deadline's length from when it starts, so
+    topics queued behind others are not cut short; topics that miss it are
+    reported as errors.
+    
+    Args:
+        request: BatchPostGenerationRequest with topics
+        stream: Stream results as NDJSON instead of one JSON document
+        agent: Injected NewsToLinkedInAgent instance
+        settings: Application settings
+        deadline: Injected request deadline
+    
+    Returns:
+        BatchPostGenerationResponse, or a StreamingResponse when streaming
+    """
+    topics = [item.topic for item in request.topics]
+    topic_deadline = deadline.seconds if deadline is not None else None
+    image_modes = [item.image_mode for item in request.topics]
+    generation_modes = [item.generation_mode for item in request.topics]
+    logger.info("batch_generation_request", topics=len(topics), stream=stream)
+    
+    if stream:
+        async def ndjson_lines() -> AsyncIterator[str]:
+            async for result in _batch_results(agent, topics, settings.batch_concurrency, image_modes, generation_modes, topic_deadline):
+                yield result.model_dump_json() + "\n"
+        
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
+    results = [result async for result in _batch_results(agent, topics, settings.batch_concurrency, image_modes, generation_modes, topic_deadline)]
+    results.sort(key=lambda result: result.index)
+    succeeded = sum(1 for result in results if result.status == "ok")
+    
+    return BatchPostGenerationResponse(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded
+    )
+
+
+def _format_sse(event: str, data: Any) -> str:
+    """
+    Format one Server-Sent Events message.
+    
+    Args:
+        event: Event name
+        data: JSON-serialisable payload
+    
+    Returns:
+        SSE wire format string
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _sse_stream(
+    events: AsyncIterator[Dict[str, Any]],
+    topic: str,
+    heartbeat_interval: float
+) -> AsyncIterator[str]:
+    """
+    Serialise agent events as SSE, with heartbeats while the agent is busy.
+    
+    Args:
+        events: Event iterator from NewsToLinkedInAgent.stream_post
+        topic: Requested topic (for logging)
+        heartbeat_interval: Seconds of silence before sending a keep-alive comment
+    
+    Yields:
+        SSE formatted chunks
+    """
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(events.__anext__())
+            done, _ = await asyncio.wait({pending}, timeout=heartbeat_interval)
+            if not done:
+                # Keep proxies from closing the idle connection
+                yield ": keep-alive\n\n"
+                continue
+            
+            try:
+                event = pending.result()
+            except StopAsyncIteration:
+                break
+            finally:
+                pending = None
+            
+            if event["event"] == "done":
+                event["data"]["topic"] = topic
+                event["data"]["generated_at"] = datetime.utcnow().isoformat()
+            yield _format_sse(event["event"], event["data"])
+    except Exception as e:
+        logger.error("post_stream_failed", error=str(e), topic=topic, exc_info=True)
+        yield _format_sse("error", {"detail": f"Failed to generate post: {str(e)}"})
+    finally:
+        if pending is not None:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+        await events.aclose()
+
+
+@router.post("/generate-post/stream")
+async def stream_linkedin_post(
+    request: PostGenerationRequest,
+    agent: NewsToLinkedInAgent = Depends(get_agent),
+    settings: Settings = Depends(get_settings),
+    deadline: Optional[Deadline] = Depends(get_deadline)
+) -> StreamingResponse:
+    """
+    Generate a LinkedIn post, streaming progress as Server-Sent Events.
+    
+    **Endpoint:** POST /api/v1/generate-post/stream
+    
+    **Events:**
+    - `search_started` / `search_finished`: each web search the agent runs
+    - `token`: chunks of the post as the LLM writes it
+    - `reset`: discard tokens received so far (the agent rejected that step)
+    - `sources`: news source URLs used
+    - `image_suggestion`: suggested image description (null if unavailable,
+      skipped or deferred)
+    - `done`: the complete post, same shape as POST /generate-post; this is
+      authoritative if it differs from the concatenated tokens
+    - `error`: generation failed or missed the request deadline; the stream
+      ends after this event
+    
+    Args:
+        request: PostGenerationRequest with topic field
+        agent: Injected NewsToLinkedInAgent instance
+        settings: Application settings
+        deadline: Injected request deadline
+    
+    Returns:
+        StreamingResponse: text/event-stream response
+    """
+    logger.info(
+        "post_stream_request",
+        topic=request.topic,
+        timestamp=datetime.utcnow().isoformat()
+    )
+    
+    return StreamingResponse(
+        _sse_stream(
+            agent.stream_post(request.topic, request.image_mode, request.generation_mode, deadline=deadline),
+            request.topic,
+            settings.sse_heartbeat_interval
+        ),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@router.post("/jobs", response_model=JobSubmissionResponse, status_code=202)
+async def submit_generation_job(
+    request: PostGenerationRequest,
+    jobs: JobManager = Depends(get_job_manager),
+    settings: Settings = Depends(get_settings)
+) -> JobSubmissionResponse:
+    """
+    Queue a LinkedIn post generation and return immediately.
+    
+    **Endpoint:** POST /api/v1/jobs
+    
+    Same request body as POST /generate-post. Responds 202 with a job id to
+    poll at GET /jobs/{job_id}. Jobs run on a fixed pool of ``JOB_WORKERS``
+    in-process workers; when ``JOB_QUEUE_DEPTH`` jobs are already waiting the
+    request is refused with 429 and a ``Retry-After`` header.
+    
+    Args:
+        request: PostGenerationRequest with topic field
+        jobs: Injected JobManager
+        settings: Application settings
+    
+    Returns:
+        JobSubmissionResponse: Job id and status URL
+    
+    Raises:
+        HTTPException: If the job queue is full (429)
+    """
+    try:
+        job = jobs.submit(request.model_dump())
+    except QueueFullError as e:
+        logger.warning("job_rejected", topic=request.topic, error=str(e))
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(settings.job_retry_after)}
+        )
+    
+    return JobSubmissionResponse(
+        job_id=job["id"],
+        status=job["status"],
+        status_url=f"{router.prefix}/jobs/{job['id']}"
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_generation_job(
+    job_id: str,
+    jobs: JobManager = Depends(get_job_manager)
+) -> JobStatusResponse:
+    """
+    Get the status of a generation job, with the post once it has succeeded.
+    
+    **Endpoint:** GET /api/v1/jobs/{job_id}
+    
+    Jobs are kept for ``JOB_TTL`` seconds after submission.
+    
+    Args:
+        job_id: Identifier returned by POST /jobs
+        jobs: Injected JobManager
+    
+    Returns:
+        JobStatusResponse: Status, timestamps and result or error
+    
+    Raises:
+        HTTPException: If the job is unknown or expired (404)
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    
+    return JobStatusResponse(
+        job_id=job["id"],
+        topic=job["params"]["topic"],
+        status=job["status"],
+        created_at=_timestamp(job["created_at"]),
+        started_at=_timestamp(job["started_at"]),
+        finished_at=_timestamp(job["finished_at"]),
+        result=job["result"],
+        error=job["error"]
+    )
+
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    """Convert an epoch timestamp from the job store to a UTC datetime."""
+    return datetime.utcfromtimestamp(value) if value is not None else None
+
+
+@router.get("/image-suggestion", response_model=ImageSuggestionResponse)
+async def get_image_suggestion(
+    topic: str = Query(..., min_length=3, max_length=200),
+    agent: NewsToLinkedInAgent = Depends(get_agent)
+) -> ImageSuggestionResponse:
+    """
+    Get the image suggestion for a topic.
+    
+    **Endpoint:** GET /api/v1/image-suggestion?topic=...
+    
+    Returns the suggestion cached or still being generated for a post
+    requested with ``image_mode`` "defer", or generates one if neither exists.
+    
+    Args:
+        topic: Topic of the post
+        agent: Injected NewsToLinkedInAgent instance
+    
+    Returns:
+        ImageSuggestionResponse: Suggestion and its status
+    """
+    image_suggestion = await agent.suggest_image(topic)
+    return ImageSuggestionResponse(
+        topic=topic,
+        status="ready" if image_suggestion else "unavailable",
+        image_suggestion=image_suggestion
+    )
+
+
+@router.get("/ready")
+async def readiness_check() -> JSONResponse:
+    """
+    Readiness check for load balancers and orchestrators.
+    
+    Reports 503 until the agent is built and, with AGENT_POOL_ENABLED, its
+    executor pool is warm. GET /health stays a liveness check.
+    
+    Returns:
+        JSONResponse with status (200 when ready, 503 otherwise)
+    """
+    if not _agent_ready.is_set() or _agent_instance is None:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return JSONResponse(content={"status": "ready", "llm": _agent_instance.llm_status()})
+
+
 @router.get("/health")
-async def health_check() -> Dict[str, str]:
+async def health_check() -> Dict[str, Any]:
     """
     Health check endpoint for monitoring and load balancers.
     
     Returns:
-        Dict with status and timestamp
+        Dict with status, timestamp, cache statistics and LLM breaker state
     """
+    page_cache = get_page_cache()
     return {
         "status": "healthy",
         "service": "LinkedIn Post Generator API",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow().isoformat(),
+        "caches": {
+            "search": get_search_cache().stats(),
+            "post": get_post_cache().stats(),
+            "image": get_image_cache().stats(),
+            "page": page_cache.stats() if page_cache is not None else None
+        },
+        "llm": _agent_instance.llm_status() if _agent_instance is not None else None
     }
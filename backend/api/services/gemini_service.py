@@ -1,45 +1,142 @@
 """
 Gemini service for direct AI interactions.
-Alternative to LangChain for simpler use cases.
+Alternative to LangChain for simpler use cases: single prompts and batches of
+prompts, without the agent or the failover router.
 """
+import asyncio
+import random
+import time
 import google.generativeai as genai
-from typing import Optional
+from google.api_core import exceptions as google_exceptions
+from typing import List, Optional
 import structlog
+from api.utils.config import Settings, get_settings
+from api.utils.metrics import LLM_CALL_SECONDS
 
 logger = structlog.get_logger()
 
+# Errors worth retrying: rate limits, overload and server-side failures
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
+
 
 class GeminiService:
-    """Direct Gemini API service without LangChain."""
+    """
+    Direct Gemini API service without LangChain.
+    
+    Calls go through the SDK's async API, so they never block the event loop.
+    The model object (and the gRPC channel it opens on first use) is reused
+    for every call.
+    """
     
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        model_name: Optional[str] = None,
+        settings: Optional[Settings] = None
+    ):
         """
         Initialize Gemini service.
         
         Args:
             api_key: Google Gemini API key
+            model_name: Gemini model (defaults to GEMINI_MODEL)
+            settings: Application settings (defaults to the cached settings)
         """
+        self.settings = settings or get_settings()
+        self.model_name = model_name or self.settings.gemini_model
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.model = genai.GenerativeModel(self.model_name)
     
-    async def generate_content(self, prompt: str) -> Optional[str]:
+    async def generate_content(self, prompt: str, timeout: Optional[float] = None) -> Optional[str]:
         """
         Generate content using Gemini.
         
+        Transient failures (timeouts, rate limits, overload) are retried up to
+        GEMINI_SERVICE_MAX_RETRIES times with jittered exponential backoff.
+        
         Args:
             prompt: Input prompt for generation
+            timeout: Per-attempt timeout in seconds (defaults to LLM_CALL_TIMEOUT)
         
         Returns:
             Generated content or None if failed
         """
-        try:
-            logger.info("gemini_generation_started", prompt_length=len(prompt))
-            
-            response = self.model.generate_content(prompt)
-            
-            logger.info("gemini_generation_completed")
-            return response.text
-            
-        except Exception as e:
-            logger.error("gemini_generation_failed", error=str(e), exc_info=True)
-            return None
+        timeout = timeout or self.settings.llm_call_timeout
+        target = f"gemini:{self.model_name}"
+        logger.info("gemini_generation_started", prompt_length=len(prompt), model=self.model_name)
+        
+        attempts = self.settings.gemini_service_max_retries + 1
+        for attempt in range(attempts):
+            started = time.monotonic()
+            try:
+                response = await asyncio.wait_for(self.model.generate_content_async(prompt), timeout=timeout)
+                text = response.text
+            except RETRYABLE_ERRORS as e:
+                LLM_CALL_SECONDS.observe(time.monotonic() - started, target=target, outcome="failure")
+                if attempt + 1 == attempts:
+                    logger.error("gemini_generation_failed", error=str(e) or type(e).__name__, attempts=attempts)
+                    return None
+                delay = self._backoff(attempt)
+                logger.warning("gemini_generation_retry", error=str(e) or type(e).__name__,
+                               attempt=attempt + 1, delay=round(delay, 3))
+                await asyncio.sleep(delay)
+            except Exception as e:
+                LLM_CALL_SECONDS.observe(time.monotonic() - started, target=target, outcome="failure")
+                logger.error("gemini_generation_failed", error=str(e), exc_info=True)
+                return None
+            else:
+                LLM_CALL_SECONDS.observe(time.monotonic() - started, target=target, outcome="success")
+                logger.info("gemini_generation_completed")
+                return text
+        return None
+    
+    async def generate_many(
+        self,
+        prompts: List[str],
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> List[Optional[str]]:
+        """
+        Generate content for several prompts with bounded concurrency.
+        
+        Each prompt is retried independently; one failing prompt does not
+        fail the others.
+        
+        Args:
+            prompts: Input prompts
+            concurrency: Maximum calls in flight (defaults to GEMINI_SERVICE_CONCURRENCY)
+            timeout: Per-attempt timeout in seconds (defaults to LLM_CALL_TIMEOUT)
+        
+        Returns:
+            Generated content (or None if failed) for each prompt, in order
+        """
+        semaphore = asyncio.Semaphore(max(concurrency or self.settings.gemini_service_concurrency, 1))
+        
+        async def generate_one(prompt: str) -> Optional[str]:
+            async with semaphore:
+                return await self.generate_content(prompt, timeout=timeout)
+        
+        return list(await asyncio.gather(*(generate_one(prompt) for prompt in prompts)))
+    
+    def _backoff(self, attempt: int) -> float:
+        """
+        Delay before the next attempt ("full jitter" exponential backoff).
+        
+        Args:
+            attempt: Zero-based number of the attempt that failed
+        
+        Returns:
+            Seconds to sleep
+        """
+        ceiling = min(
+            self.settings.gemini_service_backoff_max,
+            self.settings.gemini_service_backoff_base * 2 ** attempt
+        )
+        return random.uniform(0, ceiling)
@@ -0,0 +1,170 @@
+"""
+Asynchronous generation jobs.
+A bounded queue feeds a fixed pool of in-process workers; job state and results
+go to a job store (see api.utils.job_store).
+"""
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import structlog
+from api.utils.admission import AdmissionRejected
+from api.utils.metrics import JOBS_FINISHED, JOBS_QUEUED
+
+logger = structlog.get_logger()
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at its configured depth."""
+
+
+class JobManager:
+    """
+    Bounded queue of generation jobs served by a fixed pool of workers.
+    
+    Workers are asyncio tasks started on the first submission, so they run on
+    the server's event loop. Submissions beyond the queue depth are refused
+    with QueueFullError rather than piling up.
+    """
+    
+    def __init__(
+        self,
+        runner: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        store,
+        workers: int = 2,
+        queue_depth: int = 100,
+        ttl: float = 3600.0
+    ):
+        """
+        Initialize the manager.
+        
+        Args:
+            runner: Coroutine function turning job params into a JSON-ready result
+            store: MemoryJobStore or SQLiteJobStore
+            workers: Number of jobs run at once
+            queue_depth: Jobs that may wait before submissions are refused
+            ttl: Seconds a job (and its result) is kept after submission
+        """
+        self.runner = runner
+        self.store = store
+        self.workers = max(workers, 1)
+        self.ttl = ttl
+        self._queue: Optional[asyncio.Queue] = None
+        self._queue_depth = max(queue_depth, 1)
+        self._tasks: List[asyncio.Task] = []
+    
+    def _ensure_workers(self) -> asyncio.Queue:
+        """Create the queue and start the workers on first use."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._queue_depth)
+            self._tasks = [
+                asyncio.ensure_future(self._work(index)) for index in range(self.workers)
+            ]
+        return self._queue
+    
+    @property
+    def pending(self) -> int:
+        """Jobs waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    def submit(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a job.
+        
+        Args:
+            params: Arguments for the runner
+        
+        Returns:
+            The new job record
+        
+        Raises:
+            QueueFullError: If the queue is at its configured depth
+        """
+        queue = self._ensure_workers()
+        if queue.full():
+            raise QueueFullError(f"Job queue is full ({queue.maxsize} waiting)")
+        
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": QUEUED,
+            "params": params,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "expires_at": now + self.ttl,
+        }
+        self.store.create(job)
+        queue.put_nowait(job["id"])
+        JOBS_QUEUED.inc()
+        logger.info("job_queued", job_id=job["id"], pending=queue.qsize())
+        return job
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job.
+        
+        Args:
+            job_id: Job identifier
+        
+        Returns:
+            Job record, or None if unknown or expired
+        """
+        return self.store.get(job_id)
+    
+    async def _work(self, index: int) -> None:
+        """Worker loop: run queued jobs one at a time."""
+        while True:
+            job_id = await self._queue.get()
+            JOBS_QUEUED.dec()
+            try:
+                job = self.store.get(job_id)
+                if job is None:
+                    continue
+                self.store.update(job_id, status=RUNNING, started_at=time.time())
+                try:
+                    result = await self._run(job)
+                except Exception as e:
+                    logger.warning("job_failed", job_id=job_id, error=str(e))
+                    self.store.update(job_id, status=FAILED, error=str(e), finished_at=time.time())
+                    JOBS_FINISHED.inc(outcome=FAILED)
+                else:
+                    self.store.update(job_id, status=SUCCEEDED, result=result, finished_at=time.time())
+                    JOBS_FINISHED.inc(outcome=SUCCEEDED)
+                    logger.info("job_succeeded", job_id=job_id, worker=index)
+            except Exception as e:
+                logger.error("job_worker_error", job_id=job_id, error=str(e), exc_info=True)
+            finally:
+                self._queue.task_done()
+    
+    async def _run(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run a job, waiting out admission rejections while the job is live.
+        
+        A queued job has already been accepted, so a busy server delays it
+        rather than failing it.
+        """
+        while True:
+            try:
+                return await self.runner(job["params"])
+            except AdmissionRejected as e:
+                if time.time() + e.retry_after >= job["expires_at"]:
+                    raise
+                logger.info("job_waiting_for_capacity", job_id=job["id"], retry_after=e.retry_after)
+                await asyncio.sleep(e.retry_after)
+    
+    async def shutdown(self) -> None:
+        """Stop the workers (queued jobs are abandoned)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        JOBS_QUEUED.dec(self.pending)
+        self._tasks = []
+        self._queue = None
@@ -2,34 +2,402 @@
 LangChain agent for fetching news and generating LinkedIn posts.
 Uses Google Gemini API with Groq as fallback, integrated with multiple search engines.
 """
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain.tools import Tool
-from langchain_community.tools import DuckDuckGoSearchRun
-from langchain_core.prompts import PromptTemplate
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextvars import ContextVar, copy_context
+import asyncio
+import importlib
+import importlib.util
+import threading
+import time
 import structlog
 import re
 import os
-import requests
-from bs4 import BeautifulSoup
+from api.utils.config import Settings, get_settings
+from api.utils.deadline import Deadline, current_deadline, deadline_scope, time_left
+from api.utils.admission import ConcurrencyLimiter
+from api.utils.cache import BlockingSingleFlight, SingleFlight, TTLCache, normalize_key
+from api.utils.page_cache import PageCache, resolve_cache_path
+from api.utils.model_state import load_model_state, resolve_state_path, save_model_state
+from api.utils.observations import ObservationCompactor
+from api.utils.search_results import SearchLog, SearchResult, render_results
+from api.utils.trending import TopicTracker
+from api.utils.metrics import (
+    CACHE_LOOKUPS,
+    DEADLINE_EXPIRIES,
+    GENERATIONS_IN_PROGRESS,
+    PAGE_FETCH_SECONDS,
+    SEARCH_ENGINE_SECONDS,
+    STAGE_SECONDS
+)
+
+# LangChain, the provider SDKs, requests and bs4 take seconds to import, so they
+# are imported on first use rather than when the API (/, /health, /docs) starts
+if TYPE_CHECKING:
+    import requests
+    from langchain.agents import AgentExecutor
+    from langchain_core.callbacks import AsyncCallbackHandler
+    from langchain_core.prompts import PromptTemplate
+    from api.services.llm_router import LLMRouter, RouteTarget
+    from api.utils.semantic_index import SemanticIndex
 
 logger = structlog.get_logger()
 
-# Check if Groq is available
-try:
-    from langchain_groq import ChatGroq
-    GROQ_AVAILABLE = True
-except ImportError:
-    GROQ_AVAILABLE = False
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+# Page prefix scanning for snippet extraction
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+HEAD_END_PATTERN = re.compile(rb"</head\s*>", re.IGNORECASE)
+META_DESCRIPTION_PATTERN = re.compile(rb"<meta[^>]+name\s*=\s*[\"']?description", re.IGNORECASE)
+PARAGRAPH_END_PATTERN = re.compile(rb"</p\s*>", re.IGNORECASE)
+SEARCH_TOOL_NAME = "WebSearch"
+# Lower bound for request timeouts cut down by the deadline (requests rejects 0)
+MIN_REQUEST_TIMEOUT = 0.5
+NO_SEARCH_RESULTS = "No search results arrived in time."
+
+# Writing rules shared by the ReAct agent and the direct pipeline
+POST_GUIDELINES = """FORMATTING RULES:
+- NO asterisks (*), NO markdown symbols, NO bullet points with symbols
+- Use simple numbered points (1., 2., 3.) or write in flowing paragraphs
+- NO hyphens, dashes (-, --, ---) or em dashes (—)
+- Use commas or full stops instead of dashes
+- NO semicolons in casual writing
+- NO ellipses (...) unless showing hesitation
+- Use colons sparingly, avoid "Key points:" style introductions
+
+LANGUAGE & STYLE (British English):
+- Be direct and assertive, eliminate hedging words like "however", "it's worth noting"
+- Avoid stock transitions like "furthermore", "in conclusion"
+- Use contractions naturally (don't, can't, it's)
+- Choose simple words over formal ones (use not utilise, find out not ascertain)
+- Vary sentence length for rhythm
+- Write conversationally but professionally
+
+CONTENT STRUCTURE:
+- Start with a compelling hook or question
+- Present 2-3 key insights naturally in flowing text or simple numbered points
+- Add thoughtful commentary
+- End with an engaging question or call to action
+- Include relevant emojis where suitable
+- Keep under 300 words
+- Write as if speaking to a colleague, not presenting a formal report
+"""
+
+DIRECT_POST_TEMPLATE = """You are a professional LinkedIn content creator and news analyst specialising in British English writing.
+
+Your task is to create an engaging LinkedIn post about: {topic}
+Base it on 2-3 credible sources from these recent search results:
+
+{search_results}
+
+Follow these strict guidelines:
+
+{guidelines}
+Reply with the complete LinkedIn post only, with NO asterisks, NO markdown symbols, NO dashes."""
+
+# Candidate models probed in order of preference
+GEMINI_MODELS = [
+    "gemini-2.0-flash-exp",
+    "gemini-1.5-flash",
+    "gemini-1.5-pro",
+    "gemini-pro",
+]
+GROQ_MODELS = [
+    "llama-3.1-8b-instant",
+    "llama3-70b-8192",
+    "llama3-8b-8192",
+    "mixtral-8x7b-32768",
+]
+
+# Shared HTTP session and page-fetch pool (created on first search)
+_http_session: Optional["requests.Session"] = None
+_fetch_pool: Optional[ThreadPoolExecutor] = None
+_engine_pool: Optional[ThreadPoolExecutor] = None
+_search_cache: Optional[TTLCache] = None
+_post_cache: Optional[TTLCache] = None
+_image_cache: Optional[TTLCache] = None
+_page_cache: Optional[PageCache] = None
+_run_limiter: Optional[ConcurrencyLimiter] = None
+_topic_tracker: Optional[TopicTracker] = None
+_semantic_indexes: Dict[str, "SemanticIndex"] = {}
+_post_flights = SingleFlight()
+_image_flights = SingleFlight()
+_background_tasks: set = set()
+# Compactor of the generation running in this context (tool threads inherit it)
+_observation_compactor: ContextVar[Optional[ObservationCompactor]] = ContextVar("observation_compactor", default=None)
+# Results of every search made by the generation running in this context
+_search_log: ContextVar[Optional[SearchLog]] = ContextVar("search_log", default=None)
+_search_flights = BlockingSingleFlight()
+_fetch_lock = threading.Lock()
+
+
+def _get_fetch_resources(workers: int) -> Tuple["requests.Session", ThreadPoolExecutor]:
+    """
+    Lazily create the pooled HTTP session and thread pool used for page fetches.
+    
+    Args:
+        workers: Maximum number of concurrent page fetches
+    
+    Returns:
+        Tuple of (session, executor) shared across searches
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    global _http_session, _fetch_pool
+    with _fetch_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({'User-Agent': USER_AGENT})
+            _http_session = session
+        if _fetch_pool is None:
+            _fetch_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page-fetch")
+    return _http_session, _fetch_pool
+
+
+def _get_engine_pool(workers: int) -> ThreadPoolExecutor:
+    """
+    Lazily create the thread pool that runs search engines side by side.
+    
+    Only used by the hedged and race modes. Kept separate from the page-fetch
+    pool so an engine waiting on its own page fetches can never starve them
+    of workers.
+    
+    Args:
+        workers: Maximum number of engine calls running at once process-wide
+    
+    Returns:
+        Shared executor for search engine calls
+    """
+    global _engine_pool
+    with _fetch_lock:
+        if _engine_pool is None:
+            _engine_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search-engine")
+    return _engine_pool
+
+
+def get_search_cache(settings: Optional[Settings] = None) -> TTLCache:
+    """
+    Get the process-wide cache of WebSearch observations.
+    
+    Args:
+        settings: Application settings used on first creation
+    
+    Returns:
+        TTLCache keyed on normalized query text
+    """
+    global _search_cache
+    with _fetch_lock:
+        if _search_cache is None:
+            settings = settings or get_settings()
+            _search_cache = TTLCache(
+                maxsize=settings.search_cache_size,
+                ttl=settings.search_cache_ttl,
+                name="search"
+            )
+    return _search_cache
+
+
+def get_post_cache(settings: Optional[Settings] = None) -> TTLCache:
+    """
+    Get the process-wide cache of generated posts.
+    
+    Args:
+        settings: Application settings used on first creation
+    
+    Returns:
+        TTLCache keyed on normalized topic
+    """
+    global _post_cache
+    with _fetch_lock:
+        if _post_cache is None:
+            settings = settings or get_settings()
+            _post_cache = TTLCache(
+                maxsize=settings.post_cache_size,
+                ttl=settings.post_cache_ttl,
+                name="post"
+            )
+    return _post_cache
+
+
+def get_run_limiter(settings: Optional[Settings] = None) -> ConcurrencyLimiter:
+    """
+    Get the process-wide limit on concurrent generations.
+    
+    Args:
+        settings: Application settings used on first creation
+    
+    Returns:
+        ConcurrencyLimiter shared by every request and batch
+    """
+    global _run_limiter
+    with _fetch_lock:
+        if _run_limiter is None:
+            settings = settings or get_settings()
+            _run_limiter = ConcurrencyLimiter(
+                limit=settings.max_concurrent_generations,
+                wait_timeout=settings.admission_wait_timeout,
+                retry_after=settings.admission_retry_after
+            )
+    return _run_limiter
+
+
+def get_topic_tracker(settings: Optional[Settings] = None) -> TopicTracker:
+    """
+    Get the process-wide topic request frequencies.
+    
+    Args:
+        settings: Application settings used on first creation
+    
+    Returns:
+        TopicTracker fed by every post request
+    """
+    global _topic_tracker
+    with _fetch_lock:
+        if _topic_tracker is None:
+            settings = settings or get_settings()
+            _topic_tracker = TopicTracker(
+                max_topics=settings.prewarm_tracked_topics,
+                half_life=settings.prewarm_half_life
+            )
+    return _topic_tracker
+
+
+def get_semantic_index(name: str, settings: Optional[Settings] = None) -> "SemanticIndex":
+    """
+    Get the process-wide similarity index of a cache's keys.
+    
+    Args:
+        name: Name of the cache the index points into ("post" or "search")
+        settings: Application settings used on first creation
+    
+    Returns:
+        SemanticIndex mapping texts to that cache's keys
+    """
+    with _fetch_lock:
+        index = _semantic_indexes.get(name)
+        if index is None:
+            # NumPy loads on the first cache miss, not at startup
+            from api.utils.semantic_index import SemanticIndex
+            
+            settings = settings or get_settings()
+            index = _semantic_indexes[name] = SemanticIndex(
+                capacity=settings.semantic_cache_capacity,
+                dim=settings.semantic_cache_dim,
+                name=name
+            )
+    return index
+
+
+def get_image_cache(settings: Optional[Settings] = None) -> TTLCache:
+    """
+    Get the process-wide cache of image suggestions.
+    
+    Args:
+        settings: Application settings used on first creation
+    
+    Returns:
+        TTLCache keyed on normalized topic
+    """
+    global _image_cache
+    with _fetch_lock:
+        if _image_cache is None:
+            settings = settings or get_settings()
+            _image_cache = TTLCache(
+                maxsize=settings.post_cache_size,
+                ttl=settings.post_cache_ttl,
+                name="image"
+            )
+    return _image_cache
+
+
+def get_page_cache(settings: Optional[Settings] = None) -> Optional[PageCache]:
+    """
+    Get the persistent page snippet cache shared across worker processes.
+    
+    Args:
+        settings: Application settings
+    
+    Returns:
+        PageCache, or None if the page cache is disabled
+    """
+    global _page_cache
+    settings = settings or get_settings()
+    if not settings.page_cache_enabled:
+        return None
+    path = resolve_cache_path(settings.page_cache_path)
+    with _fetch_lock:
+        if _page_cache is None or _page_cache.path != path:
+            _page_cache = PageCache(path, max_entries=settings.page_cache_max_entries)
+    return _page_cache
+
+
+# Names resolved from their libraries on first access (tests patch them here)
+_DEFERRED_IMPORTS = {
+    "ChatGoogleGenerativeAI": ("langchain_google_genai", "ChatGoogleGenerativeAI"),
+    "ChatGroq": ("langchain_groq", "ChatGroq"),
+    "DDGS": ("duckduckgo_search", "DDGS"),
+    "google_search": ("googlesearch", "search"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Import a deferred name on first access and keep it as a module global.
+    
+    Args:
+        name: Attribute requested from this module
+    
+    Returns:
+        The imported object
+    
+    Raises:
+        AttributeError: If the name is not a deferred import
+    """
+    if name not in _DEFERRED_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _DEFERRED_IMPORTS[name]
+    value = getattr(importlib.import_module(module_name), attribute)
+    globals()[name] = value
+    return value
+
+
+def _deferred(name: str) -> Any:
+    """
+    Get a deferred import, preferring a value already set on the module.
+    
+    Args:
+        name: Key of _DEFERRED_IMPORTS
+    
+    Returns:
+        The imported (or patched) object
+    """
+    return globals()[name] if name in globals() else __getattr__(name)
+
+
+def current_search_log() -> Optional[SearchLog]:
+    """
+    Get the search log of the generation running in this context.
+    
+    Returns:
+        SearchLog, or None outside a generation
+    """
+    return _search_log.get()
+
+
+# Check if Groq is available (without importing it)
+GROQ_AVAILABLE = importlib.util.find_spec("langchain_groq") is not None
+if not GROQ_AVAILABLE:
     logger.warning("langchain_groq not available - Groq fallback disabled")
 
-# Check if Google Search is available
-try:
-    from googlesearch import search as google_search
-    GOOGLE_SEARCH_AVAILABLE = True
-except ImportError:
-    GOOGLE_SEARCH_AVAILABLE = False
+# Check if Google Search is available (without importing it)
+GOOGLE_SEARCH_AVAILABLE = importlib.util.find_spec("googlesearch") is not None
+if not GOOGLE_SEARCH_AVAILABLE:
     logger.warning("googlesearch-python not available - Google search fallback disabled")
 
 
@@ -40,103 +408,371 @@ class NewsToLinkedInAgent:
     2. Analyzes the content
     3. Generates a LinkedIn-style post
     
-    Supports Google Gemini with Groq as fallback.
+    Supports Google Gemini with Groq as fallback. Every LLM call goes through
+    an LLMRouter, which fails over between models behind circuit breakers.
     """
     
-    def __init__(self, gemini_api_key: str, groq_api_key: str = ""):
+    def __init__(self, gemini_api_key: str, groq_api_key: str = "", settings: Optional[Settings] = None):
         """
         Initialize the agent with Gemini API and optional Groq fallback.
         
         Args:
             gemini_api_key: Google Gemini API key
             groq_api_key: Groq API key (fallback)
+            settings: Application settings (defaults to cached settings)
         """
         self.gemini_api_key = gemini_api_key
         self.groq_api_key = groq_api_key
+        self.settings = settings or get_settings()
         self.llm = None
         self.provider = None
+        self.model = None
+        self._state_path = resolve_state_path(self.settings.model_state_path)
         
-        # Try Gemini first, then Groq
-        try:
-            self.llm = self._try_gemini()
-            self.provider = "gemini"
-            logger.info("llm_initialized", provider="gemini")
-        except Exception as e:
-            logger.warning("gemini_failed", error=str(e))
-            if self.groq_api_key and GROQ_AVAILABLE:
-                try:
-                    self.llm = self._try_groq()
-                    self.provider = "groq"
-                    logger.info("llm_initialized", provider="groq")
-                except Exception as groq_error:
-                    logger.error("groq_failed", error=str(groq_error))
-                    raise RuntimeError("Both Gemini and Groq initialization failed") from groq_error
-            else:
-                raise RuntimeError(f"Gemini failed and no Groq fallback available: {e}") from e
+        # Start with a model straight away; probing happens off the request path
+        remembered = load_model_state(self._state_path, self.settings.model_state_max_age)
+        if remembered and self._provider_usable(remembered["provider"]):
+            self.provider, self.model = remembered["provider"], remembered["model"]
+        elif self.gemini_api_key:
+            self.provider, self.model = "gemini", self.settings.gemini_model
+        elif self.groq_api_key and GROQ_AVAILABLE:
+            self.provider, self.model = "groq", self.settings.groq_model
+        else:
+            raise RuntimeError("No LLM provider configured: set GEMINI_API_KEY or GROQ_API_KEY")
+        
+        from langchain.tools import Tool
+        from api.services.llm_router import LLMRouter
+        
+        self.llm = LLMRouter(
+            targets=[self._build_target(provider, model) for provider, model in
+                     self._model_candidates()[:max(self.settings.llm_router_max_targets, 1)]],
+            call_timeout=self.settings.llm_call_timeout
+        )
+        logger.info("llm_initialized", provider=self.provider, model=self.model, remembered=bool(remembered))
         
         # Initialize web search tool with error handling
         self.tools = [
             Tool(
-                name="WebSearch",
+                name=SEARCH_TOOL_NAME,
                 func=self._safe_search,
                 description="Search for recent news and articles. Input should be a search query string."
             )
         ]
         
         self.agent_executor = self._create_agent()
+        self.stream_executor = self._create_agent(stream_tokens=True)
+        # Provider/model name -> (executor, streaming executor), see warm_pool
+        self._executor_pool: Dict[str, Tuple["AgentExecutor", "AgentExecutor"]] = {}
+        
+        # A remembered model was already probed by an earlier cold start
+        self._probe_thread = None
+        if self.settings.model_probe_enabled and not remembered:
+            self._probe_thread = threading.Thread(
+                target=self._probe_models,
+                name="model-probe",
+                daemon=True
+            )
+            self._probe_thread.start()
     
     def _safe_search(self, query: str) -> str:
         """
-        Multi-engine search with fallbacks: Google -> Yahoo -> DuckDuckGo.
+        Multi-engine search: Google -> Yahoo -> DuckDuckGo by default.
+        
+        The engine order and scheduling come from settings. In "fallback" mode
+        each engine starts only after the previous one failed, in "hedged" mode
+        the next engine also starts once the hedge delay elapses, and in "race"
+        mode all engines start at once. The first good result set wins; engines
+        that already started keep running to completion in the background
+        (their threads cannot be interrupted), only queued ones are dropped.
+        Successful results are cached on the normalized query (a similar
+        enough cached query also counts, see _cache_lookup), and identical
+        queries already in flight (e.g. from a batch) share one search.
+        Results are recorded in the generation's search log and rendered,
+        compacted (see _compact), as the observation. Under a request deadline
+        one search may use DEADLINE_SEARCH_SHARE of the time left.
         
         Args:
             query: Search query string
-            
+        
         Returns:
             Search results from first successful engine
         """
-        # Try Google Search first
-        if GOOGLE_SEARCH_AVAILABLE:
-            try:
-                logger.info("attempting_google_search", query=query)
-                results = []
-                for url in google_search(query, num_results=5, advanced=True):
-                    try:
-                        # Fetch snippet from the URL
-                        response = requests.get(url.url, timeout=5, headers={
-                            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                        })
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        # Get meta description or first paragraph
-                        description = soup.find('meta', {'name': 'description'})
-                        if description and description.get('content'):
-                            snippet = description.get('content')
-                        else:
-                            paragraph = soup.find('p')
-                            snippet = paragraph.get_text()[:200] if paragraph else ""
-                        
-                        results.append(f"Title: {url.title}\nURL: {url.url}\nSnippet: {snippet}\n")
-                    except:
-                        results.append(f"Title: {url.title}\nURL: {url.url}\n")
-                
-                if results:
-                    result_text = "\n".join(results)
-                    logger.info("google_search_success", query=query, results_count=len(results))
-                    return result_text
-            except Exception as e:
-                logger.warning("google_search_failed", error=str(e), query=query)
+        cache = get_search_cache(self.settings)
+        cache_key, cached = self._cache_lookup(cache, query)
+        if cached is not None:
+            logger.info("search_cache_hit", query=query)
+            return self._observe(query, cached)
+        
+        def search_and_cache() -> Optional[Tuple[SearchResult, ...]]:
+            # A leader may have finished between our miss and taking the flight
+            found = cache.peek(cache_key)
+            if found is not None:
+                return found
+            with deadline_scope(self._search_deadline()):
+                found = self._run_search_engines(query)
+            if found:
+                self._cache_store(cache, cache_key, query, found)
+            return found
+        
+        result, shared = _search_flights.do(cache_key, search_and_cache)
+        if shared:
+            logger.info("search_coalesced", query=query)
+        if result:
+            return self._observe(query, result)
+        
+        # All searches failed
+        logger.error("all_search_engines_failed", query=query)
+        return f"Unable to fetch live search results for '{query}'. Generating content based on general knowledge and recent trends in this topic."
+    
+    def _search_deadline(self) -> Optional[Deadline]:
+        """
+        Deadline for one search: its share of the request's time left.
+        
+        Returns:
+            Deadline, or None if the request has none
+        """
+        deadline = current_deadline()
+        if deadline is None:
+            return None
+        return Deadline(deadline.remaining() * self.settings.deadline_search_share)
+    
+    def _search_deadline_reached(self, query: str, abandoned: List[str]) -> None:
+        """Log and count a search cut short by its deadline, and flag the generation."""
+        logger.warning("search_deadline_reached", query=query, abandoned=abandoned)
+        DEADLINE_EXPIRIES.inc(stage="search")
+        search_log = _search_log.get()
+        if search_log is not None:
+            search_log.cut_short = True
+    
+    @staticmethod
+    def _request_timeout(timeout: float) -> float:
+        """
+        Timeout for one HTTP request, capped by the current deadline.
+        
+        Args:
+            timeout: Configured timeout in seconds
+        
+        Returns:
+            Timeout in seconds (at least MIN_REQUEST_TIMEOUT)
+        """
+        return max(time_left(timeout), MIN_REQUEST_TIMEOUT)
+    
+    def _observe(self, query: str, results: Tuple[SearchResult, ...]) -> str:
+        """
+        Record a search in the generation's log and render its observation.
+        
+        Args:
+            query: Search query string
+            results: Hits in rank order
+        
+        Returns:
+            Observation text for the agent
+        """
+        search_log = _search_log.get()
+        if search_log is not None:
+            search_log.record(query, results)
+        return self._compact(results)
+    
+    def _compact(self, results: Tuple[SearchResult, ...]) -> str:
+        """
+        Render search results compactly for the agent scratchpad.
+        
+        Within a generation, results already shown by another engine or an
+        earlier step are dropped; outside one, only boilerplate stripping and
+        the token budget apply.
+        
+        Args:
+            results: Hits in rank order
+        
+        Returns:
+            Compacted observation, or all results if compaction is disabled
+        """
+        if not self.settings.observation_compaction_enabled:
+            return render_results(results)
+        compactor = _observation_compactor.get() or self._new_compactor()
+        return compactor.compact(results)
+    
+    def _new_compactor(self) -> ObservationCompactor:
+        """Create an observation compactor from settings."""
+        return ObservationCompactor(
+            token_budget=self.settings.observation_token_budget,
+            similarity=self.settings.observation_dedupe_similarity
+        )
+    
+    def _run_search_engines(self, query: str) -> Optional[Tuple[SearchResult, ...]]:
+        """
+        Schedule the configured engines and return the first good result set.
+        
+        Args:
+            query: Search query string
+        
+        Returns:
+            Results from the winning engine, or None if all failed
+        """
+        available = {
+            "google": self._search_google,
+            "yahoo": self._search_yahoo,
+            "duckduckgo": self._search_duckduckgo,
+        }
+        if not GOOGLE_SEARCH_AVAILABLE:
+            available.pop("google")
+        engines = [name for name in self.settings.search_engine_order if name in available]
+        if not engines:
+            return None
+        
+        deadline = current_deadline()
+        if self.settings.search_mode == "fallback":
+            # Sequential: run inline in the caller's thread, no pool hand-off
+            for index, name in enumerate(engines):
+                if deadline is not None and deadline.expired:
+                    self._search_deadline_reached(query, engines[index:])
+                    return None
+                result = self._timed_engine(name, available[name], query)
+                if result:
+                    return result
+            return None
+        
+        engine_pool = _get_engine_pool(self.settings.search_engine_workers)
+        delays = self._hedge_delays(len(engines))
+        pending = {}
+        launched = 0
+        
+        while launched < len(engines) or pending:
+            if deadline is not None and deadline.expired:
+                for future in pending:
+                    future.cancel()
+                self._search_deadline_reached(query, list(pending.values()) + engines[launched:])
+                return None
+            
+            if not pending:
+                # Nothing running: start the next engine straight away
+                name = engines[launched]
+                pending[engine_pool.submit(copy_context().run, self._timed_engine, name, available[name], query)] = name
+                launched += 1
+                continue
+            
+            # Once every engine is running, wait for whichever finishes next
+            timeout = delays[launched - 1] if launched < len(engines) else None
+            if deadline is not None:
+                timeout = deadline.remaining() if timeout is None else min(timeout, deadline.remaining())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            
+            if not done:
+                if launched == len(engines) or (deadline is not None and deadline.expired):
+                    continue
+                # Hedge delay elapsed: start the next engine alongside
+                name = engines[launched]
+                logger.info("search_hedge_started", engine=name, query=query)
+                pending[engine_pool.submit(copy_context().run, self._timed_engine, name, available[name], query)] = name
+                launched += 1
+                continue
+            
+            for future in done:
+                name = pending.pop(future)
+                result = future.result()
+                if result:
+                    # Drops engines still queued; running losers finish in the background
+                    for other in pending:
+                        other.cancel()
+                    if pending:
+                        logger.info("search_race_won", engine=name, abandoned=list(pending.values()))
+                    return result
+        
+        return None
+    
+    def _timed_engine(self, name: str, search: Any, query: str) -> Optional[Tuple[SearchResult, ...]]:
+        """
+        Run one search engine, recording its latency and outcome.
+        
+        Args:
+            name: Engine name
+            search: Engine method
+            query: Search query string
+        
+        Returns:
+            Engine result or None
+        """
+        started = time.perf_counter()
+        result = None
+        try:
+            result = search(query)
+            return result
+        finally:
+            SEARCH_ENGINE_SECONDS.observe(
+                time.perf_counter() - started,
+                engine=name,
+                outcome="success" if result else "failure"
+            )
+    
+    def _hedge_delays(self, engine_count: int) -> List[Optional[float]]:
+        """
+        Resolve the delay before starting each subsequent engine.
+        
+        Args:
+            engine_count: Number of engines that will be scheduled
+        
+        Returns:
+            Delays in seconds before starting each engine after the first
+        """
+        slots = max(engine_count - 1, 0)
+        if self.settings.search_mode == "race":
+            return [0.0] * slots
+        configured = self.settings.search_hedge_delays or [0.0]
+        return [configured[min(i, len(configured) - 1)] for i in range(slots)]
+    
+    def _search_google(self, query: str) -> Optional[Tuple[SearchResult, ...]]:
+        """
+        Search Google and enrich results with page snippets.
+        
+        Args:
+            query: Search query string
+        
+        Returns:
+            Results or None if the search failed
+        """
+        try:
+            logger.info("attempting_google_search", query=query)
+            hits = list(_deferred("google_search")(
+                query,
+                num_results=self.settings.search_max_results,
+                advanced=True,
+                timeout=self._request_timeout(self.settings.search_engine_timeout)
+            ))
+            snippets = self._fetch_snippets([hit.url for hit in hits])
+            
+            results = tuple(
+                SearchResult(hit.title, hit.url, snippets.get(hit.url, ""), "google", rank)
+                for rank, hit in enumerate(hits, 1)
+            )
+            if results:
+                logger.info("google_search_success", query=query, results_count=len(results))
+                return results
+        except Exception as e:
+            logger.warning("google_search_failed", error=str(e), query=query)
+        return None
+    
+    def _search_yahoo(self, query: str) -> Optional[Tuple[SearchResult, ...]]:
+        """
+        Search Yahoo by scraping the results page.
+        
+        Args:
+            query: Search query string
+        
+        Returns:
+            Results or None if the search failed
+        """
+        from bs4 import BeautifulSoup
+        from requests.utils import quote
         
-        # Try Yahoo Search as fallback
         try:
             logger.info("attempting_yahoo_search", query=query)
-            yahoo_url = f"https://search.yahoo.com/search?p={requests.utils.quote(query)}"
-            response = requests.get(yahoo_url, timeout=10, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
+            session, _ = _get_fetch_resources(self.settings.search_fetch_workers)
+            yahoo_url = f"{self.settings.search_yahoo_url}?p={quote(query)}"
+            response = session.get(yahoo_url, timeout=self._request_timeout(self.settings.search_engine_timeout))
             soup = BeautifulSoup(response.text, 'html.parser')
             
             results = []
-            for item in soup.select('.algo, .Sr, div[class*="result"]')[:5]:
+            for item in soup.select('.algo, .Sr, div[class*="result"]')[:self.settings.search_max_results]:
                 try:
                     title_elem = item.select_one('h3, a')
                     link_elem = item.select_one('a')
@@ -146,103 +782,347 @@ class NewsToLinkedInAgent:
                         title = title_elem.get_text().strip()
                         link = link_elem.get('href', '')
                         snippet = snippet_elem.get_text().strip() if snippet_elem else ""
-                        results.append(f"Title: {title}\nURL: {link}\nSnippet: {snippet}\n")
+                        results.append(SearchResult(title, link, snippet, "yahoo", len(results) + 1))
                 except:
                     continue
             
             if results:
-                result_text = "\n".join(results)
                 logger.info("yahoo_search_success", query=query, results_count=len(results))
-                return result_text
+                return tuple(results)
         except Exception as e:
             logger.warning("yahoo_search_failed", error=str(e), query=query)
+        return None
+    
+    def _search_duckduckgo(self, query: str) -> Optional[Tuple[SearchResult, ...]]:
+        """
+        Search DuckDuckGo through its text search API.
+        
+        Args:
+            query: Search query string
+        
+        Returns:
+            Results or None if the search failed
+        """
+        try:
+            logger.info("attempting_duckduckgo_search", query=query)
+            ddgs = _deferred("DDGS")(timeout=self._request_timeout(self.settings.search_engine_timeout))
+            hits = ddgs.text(query, max_results=self.settings.search_max_results) or []
+            results = tuple(
+                SearchResult(hit.get("title", ""), hit.get("href", ""), hit.get("body", ""), "duckduckgo", rank)
+                for rank, hit in enumerate(hits, 1)
+            )
+            if results:
+                logger.info("duckduckgo_search_success", query=query, results_count=len(results))
+                return results
+        except Exception as e:
+            logger.warning("duckduckgo_search_failed", error=str(e), query=query)
+        return None
+    
+    def _fetch_snippets(self, urls: List[str]) -> Dict[str, str]:
+        """
+        Fetch result pages concurrently within the configured time budget.
+        
+        Pages that fail or are still loading when the budget (or the search's
+        deadline) runs out are left out, so one slow publisher never stalls
+        the whole search.
+        
+        Args:
+            urls: Result page URLs to fetch
+        
+        Returns:
+            Mapping of URL to snippet for pages that arrived in time
+        """
+        if not urls:
+            return {}
+        
+        session, pool = _get_fetch_resources(self.settings.search_fetch_workers)
+        futures = {
+            pool.submit(copy_context().run, self._fetch_snippet, session, url): url
+            for url in dict.fromkeys(urls)
+        }
+        done, pending = wait(futures, timeout=time_left(self.settings.search_fetch_budget))
+        
+        for future in pending:
+            future.cancel()
+        if pending:
+            logger.warning("page_fetch_budget_exceeded", pending=len(pending), fetched=len(done))
+        
+        snippets = {}
+        for future in done:
+            try:
+                snippets[futures[future]] = future.result()
+            except Exception as e:
+                logger.debug("page_fetch_failed", url=futures[future], error=str(e))
+        return snippets
+    
+    def _fetch_snippet(self, session: "requests.Session", url: str) -> str:
+        """
+        Fetch a page snippet, recording its latency and outcome.
+        
+        Args:
+            session: Pooled HTTP session
+            url: Page URL
+        
+        Returns:
+            Snippet text (empty if the page has none or is not HTML)
+        
+        Raises:
+            TimeoutError: If the page took longer than the fetch timeout
+        """
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            snippet, outcome = self._load_snippet(session, url)
+            return snippet
+        except TimeoutError:
+            outcome = "timeout"
+            raise
+        finally:
+            PAGE_FETCH_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+    
+    def _load_snippet(self, session: "requests.Session", url: str) -> Tuple[str, str]:
+        """
+        Fetch a single page and extract its meta description or first paragraph.
+        
+        Snippets are kept in the persistent page cache. A page fetched within
+        PAGE_CACHE_FRESH_SECONDS is served from it directly; an older one is
+        revalidated with If-None-Match / If-Modified-Since, so an unchanged
+        page costs a 304 instead of a download.
+        
+        Only the start of the page is downloaded: reading stops at
+        SEARCH_FETCH_MAX_BYTES, or as soon as the prefix holds a snippet (a
+        meta description before </head>, or a complete first paragraph).
+        Non-HTML responses are skipped without reading the body. The body is
+        also abandoned once SEARCH_FETCH_TIMEOUT has elapsed in total, so a
+        slow-drip page cannot hold a fetch worker for longer than that
+        (requests' own timeout only bounds each socket read).
+        
+        Args:
+            session: Pooled HTTP session
+            url: Page URL
+        
+        Returns:
+            Tuple of (snippet, outcome) where outcome is cached, not_modified,
+            skipped or fetched
+        
+        Raises:
+            TimeoutError: If the page took longer than the fetch timeout
+        """
+        from bs4 import BeautifulSoup, SoupStrainer
+        
+        page_cache = get_page_cache(self.settings)
+        entry = page_cache.get(url) if page_cache is not None else None
+        headers = {}
+        if entry is not None:
+            if time.time() - entry["fetched_at"] < self.settings.page_cache_fresh_seconds:
+                return entry["snippet"], "cached"
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        
+        timeout = self._request_timeout(self.settings.search_fetch_timeout)
+        max_bytes = self.settings.search_fetch_max_bytes
+        deadline = time.monotonic() + timeout
+        with session.get(url, timeout=timeout, stream=True, headers=headers) as response:
+            if response.status_code == 304 and entry is not None:
+                page_cache.touch(url)
+                return entry["snippet"], "not_modified"
+            
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type and content_type not in HTML_CONTENT_TYPES:
+                logger.debug("snippet_skipped_content_type", url=url, content_type=content_type)
+                return "", "skipped"
+            
+            prefix = bytearray()
+            for chunk in response.iter_content(chunk_size=16384):
+                prefix += chunk
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Page fetch exceeded {timeout}s: {url}")
+                if len(prefix) >= max_bytes:
+                    del prefix[max_bytes:]
+                    break
+                if self._has_snippet(prefix):
+                    break
+            html = prefix.decode(response.encoding or "utf-8", errors="replace")
+            cacheable = response.status_code == 200
+            validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(["meta", "p"]))
+        # Get meta description or first paragraph
+        description = soup.find('meta', {'name': 'description'})
+        if description and description.get('content'):
+            snippet = description.get('content')
+        else:
+            paragraph = soup.find('p')
+            snippet = paragraph.get_text()[:200] if paragraph else ""
+        
+        if cacheable and page_cache is not None:
+            page_cache.put(url, snippet, *validators)
+        return snippet, "fetched"
+    
+    @staticmethod
+    def _has_snippet(prefix: bytearray) -> bool:
+        """
+        Check whether a page prefix already contains what extraction needs.
+        
+        Args:
+            prefix: Bytes downloaded so far
+        
+        Returns:
+            True if the prefix holds a closed first paragraph, or a closed head
+            with a meta description
+        """
+        if PARAGRAPH_END_PATTERN.search(prefix):
+            return True
+        head_end = HEAD_END_PATTERN.search(prefix)
+        return bool(head_end and META_DESCRIPTION_PATTERN.search(prefix, 0, head_end.start()))
+    
+    def _provider_usable(self, provider: str) -> bool:
+        """
+        Check whether a provider has credentials and an installed client.
+        
+        Args:
+            provider: Provider name ("gemini" or "groq")
+        
+        Returns:
+            True if the provider can be used
+        """
+        if provider == "gemini":
+            return bool(self.gemini_api_key)
+        if provider == "groq":
+            return bool(self.groq_api_key) and GROQ_AVAILABLE
+        return False
+    
+    def _build_llm(self, provider: str, model: str):
+        """
+        Construct a chat model client (no network call).
         
-        # Try DuckDuckGo as final fallback
-        try:
-            logger.info("attempting_duckduckgo_search", query=query)
-            search = DuckDuckGoSearchRun()
-            result = search.run(query)
-            if result and len(result.strip()) > 0:
-                logger.info("duckduckgo_search_success", query=query)
-                return result
-        except Exception as e:
-            logger.warning("duckduckgo_search_failed", error=str(e), query=query)
+        Args:
+            provider: Provider name ("gemini" or "groq")
+            model: Model name
         
-        # All searches failed
-        logger.error("all_search_engines_failed", query=query)
-        return f"Unable to fetch live search results for '{query}'. Generating content based on general knowledge and recent trends in this topic."
+        Returns:
+            LangChain chat model
+        """
+        if provider == "groq":
+            return _deferred("ChatGroq")(
+                groq_api_key=self.groq_api_key,
+                model_name=model,
+                temperature=0.7
+            )
+        return _deferred("ChatGoogleGenerativeAI")(
+            model=model,
+            google_api_key=self.gemini_api_key,
+            temperature=0.7,
+            convert_system_message_to_human=True
+        )
     
-    def _try_gemini(self):
-        """Try to initialize Gemini LLM with fallback models."""
-        logger.info("attempting_gemini_init")
+    def _build_target(self, provider: str, model: str, llm=None) -> "RouteTarget":
+        """
+        Wrap a model in a router target with its own circuit breaker.
         
-        # Try different Gemini models in order of availability
-        models_to_try = [
-            "gemini-2.0-flash-exp",
-            "gemini-1.5-flash",
-            "gemini-1.5-pro",
-            "gemini-pro",
-        ]
+        Args:
+            provider: Provider name
+            model: Model name
+            llm: Existing client to reuse (built if omitted)
         
-        for model in models_to_try:
-            try:
-                logger.info("trying_gemini_model", model=model)
-                llm = ChatGoogleGenerativeAI(
-                    model=model,
-                    google_api_key=self.gemini_api_key,
-                    temperature=0.7,
-                    convert_system_message_to_human=True
-                )
-                # Test with a simple call
-                llm.invoke("test")
-                logger.info("gemini_model_success", model=model)
-                return llm
-            except Exception as e:
-                logger.warning("gemini_model_failed", model=model, error=str(e))
-                continue
+        Returns:
+            RouteTarget for the LLM router
+        """
+        from api.services.llm_router import CircuitBreaker, RouteTarget
         
-        raise RuntimeError("All Gemini models failed to initialize")
+        breaker = CircuitBreaker(
+            window=self.settings.llm_breaker_window,
+            min_calls=self.settings.llm_breaker_min_calls,
+            error_rate=self.settings.llm_breaker_error_rate,
+            slow_call_seconds=self.settings.llm_breaker_slow_call_seconds,
+            slow_rate=self.settings.llm_breaker_slow_rate,
+            open_seconds=self.settings.llm_breaker_open_seconds
+        )
+        return RouteTarget(provider, model, llm or self._build_llm(provider, model), breaker)
     
-    def _try_groq(self):
-        """Try to initialize Groq LLM."""
-        if not GROQ_AVAILABLE:
-            raise ImportError("langchain_groq not available")
+    def llm_status(self) -> Dict[str, Any]:
+        """
+        Current routing order and circuit breaker state.
         
-        if not self.groq_api_key:
-            raise ValueError("GROQ_API_KEY not set")
+        Returns:
+            Dict with the primary provider/model, per-target breaker state and
+            the provider/models with a pooled executor
+        """
+        from api.services.llm_router import LLMRouter
         
-        logger.info("attempting_groq_init")
+        status = {"provider": self.provider, "model": self.model}
+        if isinstance(self.llm, LLMRouter):
+            status["targets"] = self.llm.snapshot()
+        status["pool"] = list(self._executor_pool)
+        return status
+    
+    def _model_candidates(self) -> List[Tuple[str, str]]:
+        """
+        List (provider, model) pairs to probe, current model first.
         
-        # Try different Groq models in order of preference
-        models_to_try = [
-            "llama-3.1-8b-instant",
-            "llama3-70b-8192",
-            "llama3-8b-8192",
-            "mixtral-8x7b-32768",
-        ]
+        Returns:
+            Ordered, de-duplicated candidates: Gemini models, then Groq models
+        """
+        candidates = [(self.provider, self.model)]
+        if self._provider_usable("gemini"):
+            candidates += [("gemini", model) for model in [self.settings.gemini_model, *GEMINI_MODELS]]
+        if self._provider_usable("groq"):
+            candidates += [("groq", model) for model in [self.settings.groq_model, *GROQ_MODELS]]
+        return list(dict.fromkeys(candidates))
+    
+    def _probe_models(self) -> Optional[Tuple[str, str]]:
+        """
+        Find a working model and switch to it if it differs from the current one.
+        
+        Runs in a background thread after startup. The first candidate that
+        answers a test prompt is persisted so later cold starts skip probing.
         
-        for model in models_to_try:
+        Returns:
+            (provider, model) that answered, or None if every candidate failed
+        """
+        for provider, model in self._model_candidates():
             try:
-                logger.info("trying_groq_model", model=model)
-                llm = ChatGroq(
-                    groq_api_key=self.groq_api_key,
-                    model_name=model,
-                    temperature=0.7
-                )
-                # Test the model with a simple call
+                logger.info("probing_model", provider=provider, model=model)
+                llm = self._build_llm(provider, model)
                 llm.invoke("test")
-                logger.info("groq_model_success", model=model)
-                return llm
             except Exception as e:
-                logger.warning("groq_model_failed", model=model, error=str(e))
+                logger.warning("model_probe_failed", provider=provider, model=model, error=str(e))
                 continue
+            
+            if (provider, model) != (self.provider, self.model):
+                self._switch_model(provider, model, llm)
+            save_model_state(self._state_path, provider, model)
+            logger.info("model_probe_success", provider=provider, model=model)
+            return provider, model
+        
+        logger.error("all_models_failed_probe", kept_provider=self.provider, kept_model=self.model)
+        return None
+    
+    def _switch_model(self, provider: str, model: str, llm) -> None:
+        """
+        Route to a new primary model; the agent itself is not rebuilt.
         
-        raise RuntimeError("All Groq models failed to initialize")
+        Args:
+            provider: Provider name
+            model: Model name
+            llm: Chat model client for the new model
+        """
+        logger.warning("llm_switched", from_provider=self.provider, from_model=self.model,
+                       provider=provider, model=model)
+        self.llm.promote(self._build_target(provider, model, llm))
+        self.provider, self.model = provider, model
     
-    def _create_agent(self) -> AgentExecutor:
+    def _create_agent(self, stream_tokens: bool = False, llm: Optional["LLMRouter"] = None) -> "AgentExecutor":
         """
         Create the ReAct agent with custom prompt.
         
+        Args:
+            stream_tokens: Call the LLM in streaming mode so token callbacks
+                fire as text arrives (used by the SSE endpoint)
+            llm: Router the agent calls (defaults to the shared router)
+        
         Returns:
             AgentExecutor: Configured agent executor
         """
@@ -253,32 +1133,7 @@ Your task is to:
 2. Find 2-3 credible sources
 3. Create an engaging LinkedIn post following these strict guidelines:
 
-FORMATTING RULES:
-- NO asterisks (*), NO markdown symbols, NO bullet points with symbols
-- Use simple numbered points (1., 2., 3.) or write in flowing paragraphs
-- NO hyphens, dashes (-, --, ---) or em dashes (—)
-- Use commas or full stops instead of dashes
-- NO semicolons in casual writing
-- NO ellipses (...) unless showing hesitation
-- Use colons sparingly, avoid "Key points:" style introductions
-
-LANGUAGE & STYLE (British English):
-- Be direct and assertive, eliminate hedging words like "however", "it's worth noting"
-- Avoid stock transitions like "furthermore", "in conclusion"
-- Use contractions naturally (don't, can't, it's)
-- Choose simple words over formal ones (use not utilise, find out not ascertain)
-- Vary sentence length for rhythm
-- Write conversationally but professionally
-
-CONTENT STRUCTURE:
-- Start with a compelling hook or question
-- Present 2-3 key insights naturally in flowing text or simple numbered points
-- Add thoughtful commentary
-- End with an engaging question or call to action
-- Include relevant emojis where suitable
-- Keep under 300 words
-- Write as if speaking to a colleague, not presenting a formal report
-
+{guidelines}
 You have access to these tools:
 {tools}
 
@@ -299,97 +1154,749 @@ Begin!
 Question: {input}
 {agent_scratchpad}
 """
+
+        from langchain.agents import AgentExecutor, create_react_agent
+        from langchain_core.prompts import PromptTemplate
         
-        prompt = PromptTemplate.from_template(template)
-        agent = create_react_agent(self.llm, self.tools, prompt)
+        llm = llm or self.llm
+        prompt = PromptTemplate.from_template(template.replace("{guidelines}", POST_GUIDELINES))
+        if stream_tokens:
+            agent = self._create_streaming_react_agent(prompt, llm)
+        else:
+            agent = create_react_agent(llm, self.tools, prompt)
         
         return AgentExecutor(
             agent=agent,
             tools=self.tools,
-            verbose=True,
-            max_iterations=5,
+            max_iterations=self.settings.agent_max_iterations,
             handle_parsing_errors=True
         )
     
-    async def generate_post(self, topic: str) -> Dict[str, any]:
+    def _create_streaming_react_agent(self, prompt: "PromptTemplate", llm: "LLMRouter"):
+        """
+        Build the same runnable as create_react_agent, but stream the LLM step.
+        
+        Args:
+            prompt: ReAct prompt template
+            llm: Router the agent calls
+        
+        Returns:
+            Runnable producing AgentAction or AgentFinish
+        """
+        from langchain.agents.format_scratchpad import format_log_to_str
+        from langchain.agents.output_parsers import ReActSingleInputOutputParser
+        from langchain.tools.render import render_text_description
+        from langchain_core.runnables import RunnableLambda, RunnablePassthrough
+        
+        prompt = prompt.partial(
+            tools=render_text_description(list(self.tools)),
+            tool_names=", ".join([tool.name for tool in self.tools]),
+        )
+        llm_with_stop = llm.bind(stop=["\nObservation"])
+        
+        async def stream_llm(prompt_value, config):
+            message = None
+            async for chunk in llm_with_stop.astream(prompt_value, config=config):
+                message = chunk if message is None else message + chunk
+            return message
+        
+        return (
+            RunnablePassthrough.assign(
+                agent_scratchpad=lambda x: format_log_to_str(x["intermediate_steps"]),
+            )
+            | prompt
+            | RunnableLambda(stream_llm)
+            | ReActSingleInputOutputParser()
+        )
+    
+    async def warm_pool(self) -> List[str]:
+        """
+        Build one pair of executors per provider/model and warm its model.
+        
+        Each pooled executor calls its own model first (the other router
+        targets, with their shared breakers, stay behind it as fallbacks), so
+        a whole ReAct run stays on one model. Every model answers a warm-up
+        call first, which opens its connection and gives its breaker a first
+        outcome; models that fail it are left out of the pool.
+        
+        Returns:
+            Names of the pooled provider/models
+        """
+        from api.services.llm_router import LLMRouter
+        
+        targets = list(self.llm.targets)
+        
+        async def warm(target: "RouteTarget") -> bool:
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(target.llm.ainvoke("test"), timeout=self.settings.llm_call_timeout)
+            except Exception as e:
+                target.breaker.record(False, time.monotonic() - started)
+                logger.warning("agent_pool_warmup_failed", target=target.name, error=str(e) or type(e).__name__)
+                return False
+            target.breaker.record(True, time.monotonic() - started)
+            return True
+        
+        warmed = await asyncio.gather(*(warm(target) for target in targets))
+        for target, ok in zip(targets, warmed):
+            if not ok:
+                continue
+            llm = LLMRouter(
+                targets=[target, *(other for other in targets if other is not target)],
+                call_timeout=self.settings.llm_call_timeout
+            )
+            self._executor_pool[target.name] = (
+                self._create_agent(llm=llm),
+                self._create_agent(stream_tokens=True, llm=llm)
+            )
+        
+        logger.info("agent_pool_warm", pooled=list(self._executor_pool), targets=len(targets))
+        return list(self._executor_pool)
+    
+    def _pick_executor(self, stream: bool = False) -> "AgentExecutor":
+        """
+        Choose the executor for a generation.
+        
+        Routes to the pooled executor of the first provider/model, in the
+        router's order, whose breaker is closed. Without a pool, or when that
+        model has no pooled executor, the shared executor is used.
+        
+        Args:
+            stream: Whether the streaming executor is wanted
+        
+        Returns:
+            AgentExecutor
+        """
+        default = self.stream_executor if stream else self.agent_executor
+        if not self._executor_pool:
+            return default
+        for target in self.llm.targets:
+            if target.breaker.state == target.breaker.CLOSED:
+                pooled = self._executor_pool.get(target.name)
+                return pooled[stream] if pooled is not None else default
+        return default
+    
+    async def stream_post(
+        self,
+        topic: str,
+        image_mode: str = "inline",
+        generation_mode: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Dict[str, any]]:
+        """
+        Generate a LinkedIn post while yielding progress events.
+        
+        Events are dicts with "event" and "data" keys, in order:
+        search_started / search_finished for each WebSearch call, token for
+        each chunk of the final answer, sources, image_suggestion and done.
+        A reset event means the tokens so far belonged to a step the agent
+        rejected and should be discarded; done always carries the final post.
+        
+        The generation goes through the same cache and single-flight as
+        generate_post, so a stream joining an in-flight generation for the
+        same topic receives the whole post as one token event.
+        
+        Args:
+            topic: Topic to search news about
+            image_mode: "inline", "skip" or "defer" (see generate_post)
+            generation_mode: "deep" or "direct" (see generate_post)
+            deadline: Request deadline (see generate_post)
+        
+        Yields:
+            Progress events for the generation
+        
+        Raises:
+            Exception: If generation fails
+        """
+        get_topic_tracker(self.settings).record(topic)
+        cache = get_post_cache(self.settings)
+        cache_key, cached = self._cache_lookup(cache, topic)
+        if cached is not None:
+            logger.info("post_cache_hit", topic=topic, streaming=True)
+            with deadline_scope(deadline):
+                post = await self._apply_image_mode(topic, {**cached, "cached": True}, image_mode, refill=True)
+            yield {"event": "token", "data": {"text": post["linkedin_post"]}}
+            yield {"event": "sources", "data": {"news_sources": post["news_sources"]}}
+            yield {"event": "image_suggestion", "data": {"image_suggestion": post["image_suggestion"]}}
+            yield {"event": "done", "data": post}
+            return
+        
+        from api.services.stream_events import StreamingEventHandler
+        
+        generation_mode = generation_mode or self.settings.generation_mode
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        # The direct pipeline's only LLM call writes the answer itself
+        handler = StreamingEventHandler(
+            queue,
+            answer_marker=None if generation_mode == "direct" else FINAL_ANSWER_MARKER
+        )
+        
+        async def generate_and_cache() -> Dict[str, any]:
+            post = await self._run_generation(
+                topic,
+                executor=self._pick_executor(stream=True),
+                callbacks=[handler],
+                include_image=image_mode == "inline",
+                generation_mode=generation_mode,
+                deadline=deadline
+            )
+            self._store_post(cache, cache_key, topic, post)
+            return post
+        
+        flight = asyncio.ensure_future(_post_flights.do(cache_key, generate_and_cache))
+        flight.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+            
+            post, shared = await flight
+            if shared:
+                logger.info("post_generation_coalesced", topic=topic, streaming=True)
+            if not handler.answer_streamed:
+                yield {"event": "token", "data": {"text": post["linkedin_post"]}}
+            yield {"event": "sources", "data": {"news_sources": post["news_sources"]}}
+            with deadline_scope(deadline):
+                post = await self._apply_image_mode(topic, {**post, "cached": False}, image_mode, refill=shared)
+            yield {"event": "image_suggestion", "data": {"image_suggestion": post["image_suggestion"]}}
+            yield {"event": "done", "data": post}
+        finally:
+            # The shared generation is shielded and still completes for others
+            if not flight.done():
+                flight.cancel()
+    
+    async def generate_post(
+        self,
+        topic: str,
+        image_mode: str = "inline",
+        generation_mode: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, any]:
         """
         Generate LinkedIn post with news sources.
         
+        Finished posts are cached on the normalized topic, and concurrent
+        requests for the same topic share a single generation. A post cached
+        for a similar enough topic is also reused (see _cache_lookup).
+        
         Args:
             topic: Topic to search news about
+            image_mode: "inline" to include the image suggestion, "skip" to
+                leave it out, or "defer" to compute it in the background
+                (fetch it later via suggest_image)
+            generation_mode: "deep" (ReAct agent) or "direct" (one search
+                round, one LLM call); defaults to GENERATION_MODE
+            deadline: Request deadline every stage's timeout is capped by
+                (None for no deadline); a request joining an in-flight
+                generation shares the first request's deadline
         
         Returns:
             Dictionary containing:
             - linkedin_post: Generated post content
             - news_sources: List of source URLs
             - image_suggestion: Suggested image description
+            - image_pending: Whether a deferred image suggestion is still running
+            - cached: Whether the post was served from the result cache
+            - partial: Whether the deadline cut searching short (not cached)
+        
+        Raises:
+            DeadlineExceeded: If the deadline passed before a post was written
+            Exception: If generation fails
+        """
+        get_topic_tracker(self.settings).record(topic)
+        cache = get_post_cache(self.settings)
+        cache_key, cached = self._cache_lookup(cache, topic)
+        if cached is not None:
+            logger.info("post_cache_hit", topic=topic)
+            with deadline_scope(deadline):
+                return await self._apply_image_mode(topic, {**cached, "cached": True}, image_mode, refill=True)
+        
+        async def generate_and_cache() -> Dict[str, any]:
+            post = await self._run_generation(
+                topic,
+                include_image=image_mode == "inline",
+                generation_mode=generation_mode or self.settings.generation_mode,
+                deadline=deadline
+            )
+            self._store_post(cache, cache_key, topic, post)
+            return post
+        
+        post, shared = await _post_flights.do(cache_key, generate_and_cache)
+        if shared:
+            logger.info("post_generation_coalesced", topic=topic)
+        with deadline_scope(deadline):
+            return await self._apply_image_mode(topic, {**post, "cached": False}, image_mode, refill=shared)
+    
+    def _cache_lookup(self, cache: TTLCache, text: str) -> Tuple[str, Any]:
+        """
+        Look up a topic or query, falling back to the most similar cached one.
+        
+        With SEMANTIC_CACHE_ENABLED, an exact miss is matched against the
+        cache's semantic index, and the entry of an indexed text at least
+        SEMANTIC_CACHE_THRESHOLD similar is returned ("AI in healthcare" then
+        serves "healthcare AI").
+        
+        Args:
+            cache: Post or search cache
+            text: Topic or query as requested
+        
+        Returns:
+            (normalized key for storing a new entry, cached value or None)
+        """
+        cache_key = normalize_key(text)
+        cached = cache.get(cache_key)
+        if cached is not None or not self.settings.semantic_cache_enabled:
+            return cache_key, cached
+        
+        index = get_semantic_index(cache.name, self.settings)
+        match = index.lookup(text, self.settings.semantic_cache_threshold)
+        if match is None:
+            return cache_key, None
+        similar_key, similarity = match
+        cached = cache.peek(similar_key)
+        if cached is None:
+            # Expired or evicted since it was indexed
+            index.discard(similar_key)
+            return cache_key, None
+        CACHE_LOOKUPS.inc(cache=cache.name, result="similar_hit")
+        logger.info("semantic_cache_hit", cache=cache.name, text=text,
+                    matched=similar_key, similarity=round(similarity, 3))
+        return cache_key, cached
+    
+    def _cache_store(self, cache: TTLCache, cache_key: str, text: str, value: Any) -> None:
+        """
+        Cache a value and index its text for similarity lookups.
+        
+        Args:
+            cache: Post or search cache
+            cache_key: Normalized key from _cache_lookup
+            text: Topic or query as requested
+            value: Post or search results
+        """
+        cache.set(cache_key, value)
+        if self.settings.semantic_cache_enabled:
+            get_semantic_index(cache.name, self.settings).add(cache_key, text)
+    
+    def _store_post(self, cache: TTLCache, cache_key: str, topic: str, post: Dict[str, any]) -> None:
+        """
+        Cache a generated post, unless the request deadline cut it short.
+        
+        A partial post was written from fewer searches than usual; caching it
+        would serve it to every request for the topic (and pre-warming would
+        keep it alive), so a later request generates the topic again.
+        
+        Args:
+            cache: Post cache
+            cache_key: Normalized key from _cache_lookup
+            topic: Topic as requested
+            post: Post from _run_generation
+        """
+        if post.get("partial"):
+            logger.info("partial_post_not_cached", topic=topic)
+            return
+        self._cache_store(cache, cache_key, topic, post)
+    
+    async def refresh_post(self, topic: str) -> Dict[str, any]:
+        """
+        Regenerate a topic's post and replace its cache entry.
+        
+        Used by the pre-warmer before the cached post expires. Requests for
+        the topic arriving meanwhile share this generation.
+        
+        Args:
+            topic: Topic to regenerate
+        
+        Returns:
+            The new post
+        
+        Raises:
+            Exception: If generation fails (the old entry is left in place)
+        """
+        cache = get_post_cache(self.settings)
+        cache_key = normalize_key(topic)
+        
+        async def generate_and_cache() -> Dict[str, any]:
+            post = await self._run_generation(topic, generation_mode=self.settings.generation_mode)
+            self._store_post(cache, cache_key, topic, post)
+            return post
+        
+        post, _ = await _post_flights.do(cache_key, generate_and_cache)
+        return post
+    
+    async def _apply_image_mode(
+        self,
+        topic: str,
+        post: Dict[str, any],
+        image_mode: str,
+        refill: bool
+    ) -> Dict[str, any]:
+        """
+        Shape a post's image suggestion to what the request asked for.
+        
+        Args:
+            topic: Topic of the post
+            post: Post dict (copied by the caller)
+            image_mode: "inline", "skip" or "defer"
+            refill: Fetch a missing image for inline requests (the post came
+                from the cache or from a generation started with another mode)
+        
+        Returns:
+            The post with image_suggestion and image_pending set
+        """
+        post["image_pending"] = False
+        if image_mode == "skip":
+            post["image_suggestion"] = None
+        elif post.get("image_suggestion") is None:
+            if image_mode == "defer":
+                self._defer_image(topic)
+                post["image_pending"] = True
+            elif refill:
+                post["image_suggestion"] = await self.suggest_image(topic)
+        return post
+    
+    async def suggest_image(self, topic: str) -> Optional[str]:
+        """
+        Get the image suggestion for a topic, bounded by its own timeout and
+        the request deadline.
+        
+        Suggestions are cached and concurrent calls for one topic (including a
+        deferred background call) share a single LLM request.
+        
+        Args:
+            topic: Topic for image suggestion
+        
+        Returns:
+            Image description or None if failed or timed out
+        """
+        cache = get_image_cache(self.settings)
+        cache_key = normalize_key(topic)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        async def suggest_and_cache() -> Optional[str]:
+            timeout = time_left(self.settings.image_suggestion_timeout)
+            try:
+                with STAGE_SECONDS.time(stage="image_suggestion"):
+                    suggestion = await asyncio.wait_for(self._suggest_image(topic), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning("image_suggestion_timeout", topic=topic, timeout=round(timeout, 2))
+                return None
+            if suggestion:
+                cache.set(cache_key, suggestion)
+            return suggestion
+        
+        suggestion, _ = await _image_flights.do(cache_key, suggest_and_cache)
+        return suggestion
+    
+    def _defer_image(self, topic: str) -> None:
+        """
+        Start the image suggestion in the background.
+        
+        The task outlives the request, so it does not inherit the request
+        deadline and gets the full IMAGE_SUGGESTION_TIMEOUT.
+        
+        Args:
+            topic: Topic for image suggestion
+        """
+        with deadline_scope(None):
+            task = asyncio.ensure_future(self.suggest_image(topic))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    
+    async def generate_posts(
+        self,
+        topics: List[str],
+        concurrency: int,
+        image_modes: Optional[List[str]] = None,
+        generation_modes: Optional[List[Optional[str]]] = None,
+        topic_deadline: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, any]]:
+        """
+        Generate posts for several topics with bounded concurrency.
+        
+        Topics that normalize to the same key (with the same image and
+        generation modes) are generated once. Results are yielded as each
+        topic completes, not in request order.
+        
+        Args:
+            topics: Topics to generate posts for
+            concurrency: Maximum number of generations running at once
+            image_modes: Image mode per topic (defaults to "inline" for all)
+            generation_modes: Generation mode per topic (None for the default)
+            topic_deadline: Seconds each topic may take, counted from when
+                it starts (None for no deadline); a batch as a whole has none
+        
+        Yields:
+            Dicts with index, topic and either result or error
+        """
+        image_modes = image_modes or ["inline"] * len(topics)
+        generation_modes = generation_modes or [None] * len(topics)
+        indices_by_key: Dict[tuple, List[int]] = {}
+        for index, topic in enumerate(topics):
+            key = (normalize_key(topic), image_modes[index], generation_modes[index])
+            indices_by_key.setdefault(key, []).append(index)
+        
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        
+        async def run_one(indices: List[int]):
+            async with semaphore:
+                try:
+                    first = indices[0]
+                    deadline = Deadline(topic_deadline) if topic_deadline is not None else None
+                    post = await self.generate_post(
+                        topics[first], image_modes[first], generation_modes[first], deadline=deadline
+                    )
+                    return indices, post, None
+                except Exception as e:
+                    return indices, None, e
+        
+        logger.info("batch_generation_started", topics=len(topics), unique_topics=len(indices_by_key))
+        tasks = [asyncio.ensure_future(run_one(indices)) for indices in indices_by_key.values()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                indices, result, error = await next_done
+                for index in indices:
+                    yield {
+                        "index": index,
+                        "topic": topics[index],
+                        "result": result,
+                        "error": error
+                    }
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _run_generation(
+        self,
+        topic: str,
+        executor: Optional["AgentExecutor"] = None,
+        callbacks: Optional[List["AsyncCallbackHandler"]] = None,
+        include_image: bool = True,
+        generation_mode: str = "deep",
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, any]:
+        """
+        Run the agent and image suggestion for a topic.
+        
+        The run holds one of the process-wide generation slots (see
+        get_run_limiter), so concurrent requests and batches share one cap on
+        LLM work. The image prompt only depends on the topic, so the
+        suggestion runs concurrently with the agent under its own timeout.
+        
+        Args:
+            topic: Topic to search news about
+            executor: Agent executor to use in deep mode (defaults to _pick_executor)
+            callbacks: Extra callback handlers for the agent run
+            include_image: Whether to request an image suggestion
+            generation_mode: "deep" for the ReAct agent, "direct" for one search
+                round and one LLM call
+            deadline: Request deadline, made current for every stage (tasks
+                and tool threads inherit it)
+        
+        Returns:
+            Dictionary with linkedin_post, news_sources, image_suggestion
+            (None if the suggestion missed the deadline) and partial (True if
+            the deadline cut searching short)
         
         Raises:
+            AdmissionRejected: If no generation slot frees up in time
+            DeadlineExceeded: If the deadline passed before a post was written
             Exception: If generation fails
         """
+        async with get_run_limiter(self.settings).slot():
+            with deadline_scope(deadline):
+                return await self._generate(topic, executor, callbacks, include_image, generation_mode)
+    
+    async def _generate(
+        self,
+        topic: str,
+        executor: Optional["AgentExecutor"],
+        callbacks: Optional[List["AsyncCallbackHandler"]],
+        include_image: bool,
+        generation_mode: str
+    ) -> Dict[str, any]:
+        """Body of _run_generation, run while holding a generation slot."""
+        image_task = asyncio.ensure_future(self.suggest_image(topic)) if include_image else None
+        compactor = self._new_compactor()
+        compactor_token = _observation_compactor.set(compactor)
+        search_log = SearchLog()
+        search_log_token = _search_log.set(search_log)
+        GENERATIONS_IN_PROGRESS.inc()
         try:
             logger.info("generating_post", topic=topic)
             
-            # Run agent
-            result = await self.agent_executor.ainvoke({"input": topic})
+            config = {"callbacks": callbacks} if callbacks else None
+            if generation_mode == "direct":
+                with STAGE_SECONDS.time(stage="direct"):
+                    result = await self._run_direct(topic, config)
+            else:
+                with STAGE_SECONDS.time(stage="agent"):
+                    result = await self._run_agent(executor or self._pick_executor(), topic, config)
             
-            # Extract sources from agent intermediate steps
-            news_sources = self._extract_sources(result)
+            with STAGE_SECONDS.time(stage="extract_sources"):
+                news_sources = self._extract_sources(search_log)
             
-            # Generate image suggestion
-            image_suggestion = await self._suggest_image(topic)
+            # Image suggestion has been running alongside the agent
+            image_suggestion = await image_task if image_task is not None else None
             
             logger.info(
                 "post_generated",
                 topic=topic,
-                sources_count=len(news_sources)
+                sources_count=len(news_sources),
+                observation_tokens=compactor.raw_tokens,
+                compacted_observation_tokens=compactor.compacted_tokens
             )
             
             return {
                 "linkedin_post": result["output"],
                 "news_sources": news_sources,
-                "image_suggestion": image_suggestion
+                "image_suggestion": image_suggestion,
+                "partial": result.get("partial", False) or search_log.cut_short
             }
-            
+        
         except Exception as e:
             logger.error("agent_error", error=str(e), topic=topic, exc_info=True)
             raise
+        finally:
+            GENERATIONS_IN_PROGRESS.dec()
+            _observation_compactor.reset(compactor_token)
+            _search_log.reset(search_log_token)
+            if image_task is not None and not image_task.done():
+                image_task.cancel()
+    
+    async def _run_direct(self, topic: str, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Generate a post with one parallel search round and a single LLM call.
+        
+        Every configured query variant goes through the WebSearch tool at once
+        (so caching, coalescing and stream events work as in the agent), then
+        the results are written up with the same guidelines as the agent uses.
+        
+        Args:
+            topic: Topic to search news about
+            config: Runnable config carrying callbacks (streams tokens if set)
+        
+        Returns:
+            Dict shaped like an AgentExecutor result: output and
+            intermediate_steps as (query, observation) pairs
+        """
+        search_tool = self.tools[0]
+        queries = list(dict.fromkeys(
+            template.format(topic=topic) for template in self.settings.direct_search_queries
+        )) or [topic]
+        observations = await asyncio.gather(
+            *(search_tool.ainvoke(query, config=config) for query in queries)
+        )
+        steps = list(zip(queries, observations))
+        return {"output": await self._write_post(topic, steps, config), "intermediate_steps": steps}
     
-    def _extract_sources(self, result: Dict) -> List[str]:
+    async def _run_agent(
+        self,
+        executor: "AgentExecutor",
+        topic: str,
+        config: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
-        Extract URLs from agent's intermediate steps.
+        Run the ReAct agent, keeping time back to write the post.
+        
+        Under a request deadline the agent may use the time left minus
+        DEADLINE_ANSWER_RESERVE. An agent still working then is cancelled,
+        and the post is written in one LLM call from the searches it already
+        made, rather than failing a request the client is still waiting on.
         
         Args:
-            result: Agent execution result
+            executor: Agent executor
+            topic: Topic to search news about
+            config: Runnable config carrying callbacks
         
         Returns:
-            List of source URLs (max 3)
+            AgentExecutor result (output and intermediate_steps)
         """
-        sources = []
+        deadline = current_deadline()
+        if deadline is None:
+            return await executor.ainvoke({"input": topic}, config=config)
         
+        run = asyncio.ensure_future(executor.ainvoke({"input": topic}, config=config))
         try:
-            # Check if intermediate_steps exists
-            if "intermediate_steps" in result:
-                for step in result["intermediate_steps"]:
-                    # Extract URLs from observations
-                    if len(step) > 1:
-                        observation = str(step[1])
-                        # Find URLs in the observation
-                        urls = re.findall(r'https?://[^\s<>"{}|\\^`\[\]]+', observation)
-                        sources.extend(urls)
-            
-            # Also check the output for URLs
-            if "output" in result:
-                urls = re.findall(r'https?://[^\s<>"{}|\\^`\[\]]+', result["output"])
-                sources.extend(urls)
-            
-            # Remove duplicates and limit to 3
-            sources = list(dict.fromkeys(sources))[:3]
-            
-        except Exception as e:
-            logger.warning("source_extraction_failed", error=str(e))
+            done, _ = await asyncio.wait(
+                {run},
+                timeout=max(deadline.remaining() - self.settings.deadline_answer_reserve, 0)
+            )
+        except asyncio.CancelledError:
+            run.cancel()
+            raise
+        if done:
+            return run.result()
+        
+        run.cancel()
+        await asyncio.gather(run, return_exceptions=True)
+        search_log = _search_log.get()
+        steps = [(query, render_results(results)) for query, results in search_log.searches()] if search_log else []
+        logger.warning("agent_deadline_reached", topic=topic, searches=len(steps),
+                       remaining=round(deadline.remaining(), 2))
+        DEADLINE_EXPIRIES.inc(stage="agent")
+        return {
+            "output": await self._write_post(topic, steps, config),
+            "intermediate_steps": steps,
+            "partial": True
+        }
+    
+    async def _write_post(
+        self,
+        topic: str,
+        steps: List[Tuple[str, str]],
+        config: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Write the post from search observations in a single LLM call.
         
-        return sources if sources else ["Sources from web search"]
+        Args:
+            topic: Topic of the post
+            steps: (query, observation) pairs
+            config: Runnable config carrying callbacks (streams tokens if set)
+        
+        Returns:
+            Post text
+        """
+        limit = self.settings.direct_search_result_chars
+        search_results = "\n\n".join(
+            f"Results for \"{query}\":\n{str(observation)[:limit]}" for query, observation in steps
+        ) or NO_SEARCH_RESULTS
+        prompt = DIRECT_POST_TEMPLATE.format(
+            topic=topic,
+            search_results=search_results,
+            guidelines=POST_GUIDELINES
+        )
+        
+        if config and config.get("callbacks"):
+            # Stream so token callbacks fire as the post is written
+            message = None
+            async for chunk in self.llm.astream(prompt, config=config):
+                message = chunk if message is None else message + chunk
+        else:
+            message = await self.llm.ainvoke(prompt)
+        
+        output = message.content.strip() if message is not None else ""
+        if output.startswith(FINAL_ANSWER_MARKER):
+            output = output[len(FINAL_ANSWER_MARKER):].strip()
+        return output
+    
+    def _extract_sources(self, search_log: SearchLog) -> List[str]:
+        """
+        Pick the post's sources from the searches the generation made.
+        
+        Args:
+            search_log: Searches recorded during the generation
+        
+        Returns:
+            Result URLs in search and rank order (max 3; empty if no search
+            returned results)
+        """
+        return search_log.urls(limit=3)
     
     async def _suggest_image(self, topic: str) -> Optional[str]:
         """
@@ -410,7 +1917,7 @@ Question: {input}
             
             response = await self.llm.ainvoke(prompt)
             return response.content
-            
+        
         except Exception as e:
             logger.warning("image_suggestion_failed", error=str(e))
             return None
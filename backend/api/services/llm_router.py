@@ -0,0 +1,369 @@
+"""
+LLM router with per-model circuit breakers.
+Routes every chat call to the first healthy provider/model, failing over
+between Gemini and Groq at runtime without rebuilding the agent.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextvars import copy_context
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+import structlog
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from api.utils.deadline import DeadlineExceeded, current_deadline, time_left
+from api.utils.metrics import DEADLINE_EXPIRIES, LLM_CALL_SECONDS, LLM_FAILOVERS
+
+logger = structlog.get_logger()
+
+# Runs synchronous calls so they can be timed out; a call that times out
+# keeps its thread until the provider returns
+_sync_calls = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-sync")
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker for one provider/model.
+    
+    Closed: calls flow and outcomes are recorded. The breaker opens when the
+    window holds at least min_calls outcomes and either the error rate or the
+    slow-call rate reaches its threshold. Open: calls are refused until
+    open_seconds have passed. Half-open: one trial call is let through; success
+    closes the breaker, failure opens it again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 5,
+        error_rate: float = 0.5,
+        slow_call_seconds: float = 20.0,
+        slow_rate: float = 0.8,
+        open_seconds: float = 30.0
+    ):
+        """
+        Initialize the breaker.
+        
+        Args:
+            window: Number of recent calls considered
+            min_calls: Calls needed in the window before the breaker can trip
+            error_rate: Failure ratio that trips the breaker
+            slow_call_seconds: Latency above which a call counts as slow
+            slow_rate: Slow-call ratio that trips the breaker
+            open_seconds: Time spent open before a half-open trial
+        """
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.trips = 0
+        self._outcomes: deque = deque(maxlen=window)
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """
+        Decide whether a call may go to this model now.
+        
+        Returns:
+            True if the call is allowed (claims the half-open trial slot)
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+            return True
+    
+    def record(self, success: bool, latency: float) -> None:
+        """
+        Record a call outcome and update the breaker state.
+        
+        Args:
+            success: Whether the call succeeded
+            latency: Call duration in seconds
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trial_in_flight = False
+                if success:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            
+            self._outcomes.append((success, latency >= self.slow_call_seconds))
+            if len(self._outcomes) < self.min_calls:
+                return
+            failures = sum(1 for ok, _ in self._outcomes if not ok)
+            slow = sum(1 for _, is_slow in self._outcomes if is_slow)
+            if (failures / len(self._outcomes) >= self.error_rate
+                    or slow / len(self._outcomes) >= self.slow_rate):
+                self._open()
+    
+    def release(self) -> None:
+        """Give back a half-open trial slot whose call was cancelled."""
+        with self._lock:
+            self._trial_in_flight = False
+    
+    def _open(self) -> None:
+        """Move to the open state (lock held by caller)."""
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        self._outcomes.clear()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current breaker state for health reporting.
+        
+        Returns:
+            Dict with state, trip count and window statistics
+        """
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = sum(1 for ok, _ in self._outcomes if not ok)
+            return {
+                "state": self.state,
+                "trips": self.trips,
+                "window_calls": calls,
+                "window_failures": failures,
+            }
+
+
+class RouteTarget:
+    """One provider/model the router can send calls to."""
+    
+    __slots__ = ("provider", "model", "llm", "breaker")
+    
+    def __init__(self, provider: str, model: str, llm: BaseChatModel, breaker: CircuitBreaker):
+        self.provider = provider
+        self.model = model
+        self.llm = llm
+        self.breaker = breaker
+    
+    @property
+    def name(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+
+class LLMRouter(BaseChatModel):
+    """
+    Chat model that fails over between targets behind circuit breakers.
+    
+    Targets are tried in order, skipping any whose breaker is open. Each call
+    has its own timeout, capped by the request deadline; once the deadline has
+    passed no further target is tried. Synchronous calls run in a worker
+    thread so the same timeout applies. Streaming calls only fail over before
+    the first chunk has been produced, and an abandoned stream is closed.
+    """
+    
+    targets: List[Any]
+    call_timeout: float = 30.0
+    
+    class Config:
+        arbitrary_types_allowed = True
+    
+    @property
+    def _llm_type(self) -> str:
+        return "llm-router"
+    
+    @property
+    def primary(self) -> RouteTarget:
+        """First target in routing order."""
+        return self.targets[0]
+    
+    def promote(self, target: RouteTarget) -> None:
+        """
+        Move a target to the front of the routing order, adding it if new.
+        
+        Args:
+            target: Target to route to first (an existing target with the same
+                provider/model keeps its breaker history)
+        """
+        for index, existing in enumerate(self.targets):
+            if existing.name == target.name:
+                self.targets.insert(0, self.targets.pop(index))
+                return
+        self.targets.insert(0, target)
+    
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Breaker state of every target, in routing order.
+        
+        Returns:
+            List of dicts with provider, model and breaker state
+        """
+        return [
+            {"provider": target.provider, "model": target.model, **target.breaker.snapshot()}
+            for target in self.targets
+        ]
+    
+    def _candidates(self) -> Iterator[RouteTarget]:
+        """
+        Yield targets whose breaker admits a call, asking each only when reached.
+        
+        Admission is lazy so a half-open trial slot is only claimed by a
+        target that is actually called.
+        
+        Raises:
+            RuntimeError: If no breaker admits a call
+        """
+        previous = None
+        for target in list(self.targets):
+            if target.breaker.allow():
+                if previous is not None:
+                    # Only resumed after the previous target failed
+                    LLM_FAILOVERS.inc(from_target=previous.name, to_target=target.name)
+                previous = target
+                yield target
+        if previous is None:
+            raise RuntimeError("All LLM providers are unavailable (circuit breakers open)")
+    
+    @staticmethod
+    def _check_deadline(error: Optional[Exception], target: Optional[RouteTarget] = None) -> None:
+        """
+        Stop failing over once the request deadline has passed.
+        
+        Args:
+            error: Failure of the last target tried, if any
+            target: Target admitted for the call the deadline cut short (or
+                prevented); its breaker is not charged and any half-open
+                trial slot it claimed is given back
+        
+        Raises:
+            DeadlineExceeded: If the current request deadline has passed
+        """
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired:
+            if target is not None:
+                target.breaker.release()
+            DEADLINE_EXPIRIES.inc(stage="llm")
+            raise DeadlineExceeded("Request deadline passed during the LLM call") from error
+    
+    def _record(self, target: RouteTarget, started: float, error: Optional[Exception]) -> None:
+        """Record a call outcome and log failover."""
+        latency = time.monotonic() - started
+        target.breaker.record(error is None, latency)
+        LLM_CALL_SECONDS.observe(latency, target=target.name, outcome="success" if error is None else "failure")
+        if error is not None:
+            logger.warning("llm_call_failed", target=target.name, error=str(error) or type(error).__name__)
+    
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        last_error: Optional[Exception] = None
+        for target in self._candidates():
+            self._check_deadline(last_error, target)
+            started = time.monotonic()
+            call = _sync_calls.submit(copy_context().run, target.llm._generate, messages, stop=stop, **kwargs)
+            try:
+                result = call.result(timeout=time_left(self.call_timeout))
+            except Exception as e:
+                if isinstance(e, FutureTimeoutError):
+                    self._check_deadline(e, target)
+                self._record(target, started, e)
+                last_error = e
+                continue
+            self._record(target, started, None)
+            return result
+        self._check_deadline(last_error)
+        raise last_error
+    
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        last_error: Optional[Exception] = None
+        for target in self._candidates():
+            # Releases the trial slot a half-open breaker just gave this target
+            self._check_deadline(last_error, target)
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(
+                    target.llm._agenerate(messages, stop=stop, **kwargs),
+                    timeout=time_left(self.call_timeout)
+                )
+            except asyncio.CancelledError:
+                target.breaker.release()
+                raise
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self._check_deadline(e, target)
+                self._record(target, started, e)
+                last_error = e
+                continue
+            self._record(target, started, None)
+            return result
+        self._check_deadline(last_error)
+        raise last_error
+    
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        last_error: Optional[Exception] = None
+        for target in self._candidates():
+            # Releases the trial slot a half-open breaker just gave this target
+            self._check_deadline(last_error, target)
+            started = time.monotonic()
+            deadline = started + time_left(self.call_timeout)
+            stream = target.llm._astream(messages, stop=stop, run_manager=run_manager, **kwargs).__aiter__()
+            produced = False
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(
+                            stream.__anext__(),
+                            timeout=max(deadline - time.monotonic(), 0)
+                        )
+                    except StopAsyncIteration:
+                        break
+                    produced = True
+                    yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                # Cancelled, or the consumer stopped reading
+                target.breaker.release()
+                raise
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self._check_deadline(e, target)
+                self._record(target, started, e)
+                if produced:
+                    raise
+                last_error = e
+                continue
+            finally:
+                # Release the provider's HTTP stream on timeout or early exit
+                await stream.aclose()
+            self._record(target, started, None)
+            return
+        self._check_deadline(last_error)
+        raise last_error
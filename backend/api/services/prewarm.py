@@ -0,0 +1,112 @@
+"""
+Background pre-warming of popular topics.
+Regenerates the most requested topics shortly before their cached posts
+expire, so repeat traffic keeps hitting a warm cache.
+"""
+import asyncio
+import random
+from typing import TYPE_CHECKING, List, Optional
+import structlog
+from api.utils.cache import normalize_key
+from api.utils.config import Settings
+from api.utils.metrics import PREWARM_REFRESHES
+from api.utils.trending import TopicTracker
+
+if TYPE_CHECKING:
+    from api.services.langchain_agent import NewsToLinkedInAgent
+
+logger = structlog.get_logger()
+
+
+class PrewarmScheduler:
+    """
+    Periodically refreshes the top topics whose cached post is about to expire.
+    
+    Work is spread out: refreshes in a cycle are spaced apart, and a cycle
+    stops early when fewer than the reserved generation slots are free, so
+    user requests and provider rate limits come first.
+    """
+    
+    def __init__(self, agent: "NewsToLinkedInAgent", tracker: TopicTracker, settings: Settings):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            agent: Agent whose post cache is kept warm
+            tracker: Topic request frequencies
+            settings: Application settings (PREWARM_*)
+        """
+        self.agent = agent
+        self.tracker = tracker
+        self.settings = settings
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Start the background loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._loop())
+            logger.info("prewarm_started", top_n=self.settings.prewarm_top_n,
+                        interval=self.settings.prewarm_interval)
+    
+    async def stop(self) -> None:
+        """Stop the background loop (a refresh in progress is cancelled)."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    async def _loop(self) -> None:
+        """Run a cycle every interval (with jitter, so workers drift apart)."""
+        while True:
+            await asyncio.sleep(self.settings.prewarm_interval * random.uniform(0.8, 1.2))
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error("prewarm_cycle_failed", error=str(e), exc_info=True)
+    
+    def due_topics(self) -> List[str]:
+        """
+        Popular topics whose cached post expires within the lead time.
+        
+        Returns:
+            Topics to refresh, most popular first
+        """
+        from api.services.langchain_agent import get_post_cache
+        
+        cache = get_post_cache(self.settings)
+        due = []
+        for topic, _ in self.tracker.top(self.settings.prewarm_top_n, self.settings.prewarm_min_requests):
+            remaining = cache.ttl_remaining(normalize_key(topic))
+            if remaining is None or remaining <= self.settings.prewarm_lead_seconds:
+                due.append(topic)
+        return due
+    
+    async def run_once(self) -> List[str]:
+        """
+        Refresh the topics that are due, one at a time.
+        
+        Returns:
+            Topics refreshed successfully
+        """
+        from api.services.langchain_agent import get_run_limiter
+        
+        limiter = get_run_limiter(self.settings)
+        refreshed = []
+        for index, topic in enumerate(self.due_topics()):
+            if limiter.available <= self.settings.prewarm_reserved_slots:
+                logger.info("prewarm_deferred", topic=topic, available_slots=limiter.available)
+                PREWARM_REFRESHES.inc(outcome="deferred")
+                break
+            if index:
+                await asyncio.sleep(self.settings.prewarm_spacing)
+            try:
+                await self.agent.refresh_post(topic)
+            except Exception as e:
+                logger.warning("prewarm_refresh_failed", topic=topic, error=str(e))
+                PREWARM_REFRESHES.inc(outcome="failure")
+                continue
+            PREWARM_REFRESHES.inc(outcome="success")
+            refreshed.append(topic)
+        if refreshed:
+            logger.info("prewarm_cycle_completed", refreshed=len(refreshed))
+        return refreshed
@@ -0,0 +1,89 @@
+"""
+Agent callbacks for the streaming endpoint.
+Kept apart from langchain_agent so LangChain is only imported once a stream starts.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+from langchain_core.callbacks import AsyncCallbackHandler
+from api.services.langchain_agent import FINAL_ANSWER_MARKER, SEARCH_TOOL_NAME, current_search_log
+
+
+class StreamingEventHandler(AsyncCallbackHandler):
+    """
+    Callback handler that turns agent callbacks into stream events.
+    
+    WebSearch calls become search_started/search_finished events and LLM
+    tokens after the "Final Answer:" marker become token events. If a step
+    whose answer was already streamed turns out to be unparseable, a reset
+    event tells the client to discard those tokens.
+    """
+    
+    def __init__(self, queue: asyncio.Queue, answer_marker: Optional[str] = FINAL_ANSWER_MARKER):
+        """
+        Initialize the handler.
+        
+        Args:
+            queue: Queue receiving event dicts
+            answer_marker: Text after which tokens belong to the answer (None
+                when every token is answer text, as in the direct pipeline)
+        """
+        self.queue = queue
+        self.answer_marker = answer_marker
+        self.answer_streamed = False
+        self._buffer = ""
+        self._emitted = None
+        self._search_runs: Dict[Any, str] = {}  # run_id -> query
+    
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages: List, **kwargs: Any) -> None:
+        """Reset the token buffer for each agent step."""
+        self._buffer = ""
+        self._emitted = None
+    
+    async def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
+        """Reset the token buffer for each agent step."""
+        self._buffer = ""
+        self._emitted = None
+    
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        """Emit tokens once the final answer has started."""
+        self._buffer += token
+        if self._emitted is None:
+            if self.answer_marker is None:
+                self._emitted = 0
+            else:
+                marker_at = self._buffer.find(self.answer_marker)
+                if marker_at == -1:
+                    return
+                self._emitted = marker_at + len(self.answer_marker)
+        
+        text = self._buffer[self._emitted:]
+        self._emitted = len(self._buffer)
+        if not self.answer_streamed:
+            text = text.lstrip()
+        if text:
+            self.answer_streamed = True
+            self.queue.put_nowait({"event": "token", "data": {"text": text}})
+    
+    async def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        """Emit a search_started event for WebSearch calls."""
+        if self.answer_streamed:
+            # The step that started the answer failed to parse (the executor
+            # runs its _Exception tool) and will be retried: drop its tokens
+            self.answer_streamed = False
+            self.queue.put_nowait({"event": "reset", "data": {}})
+        
+        if serialized.get("name") != SEARCH_TOOL_NAME:
+            return
+        self._search_runs[kwargs.get("run_id")] = input_str
+        self.queue.put_nowait({"event": "search_started", "data": {"query": input_str}})
+    
+    async def on_tool_end(self, output: str, **kwargs: Any) -> None:
+        """Emit a search_finished event with the URLs the search returned."""
+        query = self._search_runs.pop(kwargs.get("run_id"), None)
+        if query is None:
+            return
+        # Read from the generation's search log, not parsed from the output
+        search_log = current_search_log()
+        results = search_log.results_for(query) if search_log is not None else ()
+        urls = list(dict.fromkeys(result.url for result in results if result.url))
+        self.queue.put_nowait({"event": "search_finished", "data": {"sources": urls}})
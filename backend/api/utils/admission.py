@@ -0,0 +1,260 @@
+"""
+Admission control for generation requests.
+Per-client token buckets cap the request rate, and a process-wide limiter caps
+how many generations (agent runs and their LLM calls) run at once. Requests
+that cannot be admitted wait up to a timeout, then get 429 with Retry-After.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Tuple
+import structlog
+from starlette.responses import JSONResponse
+from api.utils.metrics import (
+    ADMISSION_LIMITS,
+    ADMISSION_REJECTIONS,
+    ADMISSION_WAIT_SECONDS,
+    GENERATIONS_WAITING
+)
+
+logger = structlog.get_logger()
+
+API_PREFIX = "/api/v1/"
+# GETs that start LLM work; every other rate-limited request is a POST
+RATE_LIMITED_GETS = ("/api/v1/image-suggestion",)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted within its wait budget."""
+    
+    def __init__(self, message: str, retry_after: float):
+        """
+        Initialize the error.
+        
+        Args:
+            message: Reason shown to the client
+            retry_after: Seconds the client should wait before retrying
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def retry_after_header(seconds: float) -> str:
+    """Format a Retry-After value (whole seconds, at least 1)."""
+    return str(max(1, math.ceil(seconds)))
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a fixed rate.
+    
+    Not thread-safe on its own; RateLimiter serializes access.
+    """
+    
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+    
+    def reserve(self, max_wait: float) -> Tuple[bool, float]:
+        """
+        Take a token now, or reserve the next one if it arrives within max_wait.
+        
+        A reservation takes the token immediately (the bucket may go negative),
+        so concurrent waiters are served in order of arrival.
+        
+        Args:
+            max_wait: Longest acceptable wait in seconds
+        
+        Returns:
+            (admitted, seconds): seconds to wait before proceeding if admitted,
+            otherwise seconds until a token would be available
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        if wait > max_wait:
+            return False, wait
+        self.tokens -= 1
+        return True, wait
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by client, bounded to the most recently seen clients.
+    """
+    
+    def __init__(self, rate: float, burst: int, max_clients: int = 10000):
+        """
+        Initialize the limiter.
+        
+        Args:
+            rate: Requests per second each client may sustain
+            burst: Requests a client may make at once after being idle
+            max_clients: Buckets kept before the least recently used is dropped
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+        ADMISSION_LIMITS.set(rate, limit="rate_per_second")
+        ADMISSION_LIMITS.set(self.burst, limit="burst")
+    
+    def reserve(self, key: str, max_wait: float) -> Tuple[bool, float]:
+        """
+        Reserve a request slot for a client.
+        
+        Args:
+            key: Client key (API key or IP address)
+            max_wait: Longest acceptable wait in seconds
+        
+        Returns:
+            (admitted, seconds) as returned by TokenBucket.reserve
+        """
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.reserve(max_wait)
+
+
+class ConcurrencyLimiter:
+    """
+    Process-wide cap on concurrent generations.
+    
+    Shared by single, streamed, batch and job requests, so N concurrent
+    batches cannot multiply the number of agent runs hitting the providers.
+    """
+    
+    def __init__(self, limit: int, wait_timeout: float, retry_after: float):
+        """
+        Initialize the limiter.
+        
+        Args:
+            limit: Generations allowed at once
+            wait_timeout: Seconds to wait for a free slot before rejecting
+            retry_after: Retry-After seconds suggested when rejecting
+        """
+        self.limit = max(limit, 1)
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self._semaphore = asyncio.Semaphore(self.limit)
+        ADMISSION_LIMITS.set(self.limit, limit="concurrent_generations")
+    
+    @property
+    def available(self) -> int:
+        """Generation slots currently free."""
+        return self.limit - self.active
+    
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold a generation slot for the duration of the block.
+        
+        Raises:
+            AdmissionRejected: If no slot frees up within wait_timeout
+        """
+        if self._semaphore.locked():
+            started = time.perf_counter()
+            GENERATIONS_WAITING.inc()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.wait_timeout)
+            except asyncio.TimeoutError:
+                ADMISSION_REJECTIONS.inc(reason="concurrency")
+                logger.warning("generation_rejected", limit=self.limit, waited=self.wait_timeout)
+                raise AdmissionRejected(
+                    f"Server busy: {self.limit} generations already running",
+                    self.retry_after
+                )
+            finally:
+                GENERATIONS_WAITING.dec()
+                ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started, gate="concurrency")
+        else:
+            await self._semaphore.acquire()
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying per-client rate limits to generation requests.
+    
+    POSTs under /api/v1/ and the image suggestion GET are limited; health,
+    docs, metrics and job polling are not. Clients are keyed on key_header
+    when set and present (only trust it if a gateway authenticates it), else
+    on the client IP address.
+    """
+    
+    def __init__(self, app, limiter: RateLimiter, max_wait: float, key_header: str = ""):
+        """
+        Wrap an ASGI app.
+        
+        Args:
+            app: Downstream ASGI application
+            limiter: Per-client rate limiter
+            max_wait: Seconds a request may wait for a token before 429
+            key_header: Header identifying the client (empty for IP only)
+        """
+        self.app = app
+        self.limiter = limiter
+        self.max_wait = max_wait
+        self.key_header = key_header.lower().encode("latin-1")
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _is_rate_limited(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        admitted, wait = self.limiter.reserve(self._client_key(scope), self.max_wait)
+        if not admitted:
+            ADMISSION_REJECTIONS.inc(reason="rate_limit")
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded"},
+                status_code=429,
+                headers={"Retry-After": retry_after_header(wait)}
+            )
+            await response(scope, receive, send)
+            return
+        if wait > 0:
+            ADMISSION_WAIT_SECONDS.observe(wait, gate="rate_limit")
+            await asyncio.sleep(wait)
+        await self.app(scope, receive, send)
+    
+    def _client_key(self, scope) -> str:
+        """Client identity used to pick the token bucket."""
+        if self.key_header:
+            for name, value in scope.get("headers", []):
+                if name == self.key_header and value:
+                    return "key:" + value.decode("latin-1")
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+
+def _is_rate_limited(scope) -> bool:
+    """Whether a request starts generation work."""
+    path = scope["path"]
+    if not path.startswith(API_PREFIX):
+        return False
+    return scope["method"] == "POST" or path in RATE_LIMITED_GETS
@@ -0,0 +1,249 @@
+"""
+In-process caching utilities.
+Provides a thread-safe TTL cache with LRU eviction and hit/miss counters,
+plus single-flight coalescing of concurrent async and threaded calls.
+"""
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from api.utils.metrics import CACHE_LOOKUPS
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_key(text: str) -> str:
+    """
+    Normalize free text into a cache key.
+    
+    Lowercases and collapses whitespace so "AI news" and "ai  news "
+    share one entry.
+    
+    Args:
+        text: Raw query or topic text
+    
+    Returns:
+        Normalized key string
+    """
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+class TTLCache:
+    """
+    Bounded cache with per-entry expiry and least-recently-used eviction.
+    
+    Safe to share between threads (search engines run in a thread pool).
+    """
+    
+    def __init__(self, maxsize: int, ttl: float, name: str = "cache"):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize: Maximum number of entries before LRU eviction
+            ttl: Default time-to-live for entries in seconds
+            name: Cache name used in stats and logs
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Look up a live entry and mark it as recently used.
+        
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+        
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    CACHE_LOOKUPS.inc(cache=self.name, result="hit")
+                    return value
+                del self._data[key]
+            self.misses += 1
+            CACHE_LOOKUPS.inc(cache=self.name, result="miss")
+            return default
+    
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Look up a live entry without touching counters or recency.
+        
+        Args:
+            key: Cache key
+            default: Value returned if absent or expired
+        
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            return default
+    
+    def ttl_remaining(self, key: Hashable) -> Optional[float]:
+        """
+        Seconds until an entry expires, without touching counters or recency.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Remaining time-to-live, or None if absent or expired
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            remaining = entry[0] - time.monotonic()
+            return remaining if remaining > 0 else None
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entries if full.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Optional override of the default time-to-live
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of cache counters.
+        
+        Returns:
+            Dict with size, capacity, hits, misses, evictions and hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent async calls for the same key into one execution.
+    
+    The first caller (leader) starts the work as a task; callers arriving
+    while it runs (followers) await the same task. The task is shielded, so
+    a cancelled caller never cancels the work others are waiting on.
+    """
+    
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._calls: Dict[Hashable, "asyncio.Task"] = {}
+    
+    def __len__(self) -> int:
+        return len(self._calls)
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run func once per key among concurrent callers.
+        
+        Args:
+            key: Coalescing key
+            func: Zero-argument coroutine function doing the work
+        
+        Returns:
+            Tuple of (result, shared) where shared is True for followers
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task), shared
+
+
+class BlockingSingleFlight:
+    """
+    Thread-based counterpart of SingleFlight for synchronous code.
+    
+    Used for search calls, which LangChain runs in worker threads.
+    """
+    
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._calls)
+    
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run func once per key among concurrent threads.
+        
+        Args:
+            key: Coalescing key
+            func: Zero-argument callable doing the work
+        
+        Returns:
+            Tuple of (result, shared) where shared is True for followers
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            shared = future is not None
+            if future is None:
+                future = Future()
+                self._calls[key] = future
+        
+        if shared:
+            return future.result(), True
+        
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
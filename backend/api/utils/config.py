@@ -4,7 +4,7 @@ Loads configuration from .env file with validation.
 """
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Literal
 
 
 class Settings(BaseSettings):
@@ -14,6 +14,32 @@ class Settings(BaseSettings):
     gemini_api_key: str = "test-api-key"  # Default for testing
     groq_api_key: str = ""  # Fallback LLM provider
     
+    # LLM Models
+    gemini_model: str = "gemini-1.5-flash"  # Used immediately at startup
+    groq_model: str = "llama-3.1-8b-instant"
+    model_probe_enabled: bool = True  # Probe candidates in the background
+    model_state_path: str = ""  # Known-good model file (default: system temp dir)
+    model_state_max_age: float = 86400.0  # Re-probe after a day
+    
+    # Direct Gemini Service (GeminiService, no agent)
+    gemini_service_concurrency: int = 4  # Calls in flight per generate_many batch
+    gemini_service_max_retries: int = 2  # Retries of timeouts, rate limits and overload
+    gemini_service_backoff_base: float = 0.5  # Seconds, doubled per retry with full jitter
+    gemini_service_backoff_max: float = 8.0
+    
+    # LLM Failover
+    llm_router_max_targets: int = 3  # Models the router may fail over between
+    llm_call_timeout: float = 30.0  # Per-call timeout in seconds
+    llm_breaker_window: int = 20  # Recent calls considered per model
+    llm_breaker_min_calls: int = 5
+    llm_breaker_error_rate: float = 0.5
+    llm_breaker_slow_call_seconds: float = 20.0
+    llm_breaker_slow_rate: float = 0.8
+    llm_breaker_open_seconds: float = 30.0  # Before a half-open trial call
+    
+    # Agent Pool (executors built at startup; GET /api/v1/ready is 503 until warm)
+    agent_pool_enabled: bool = False  # One executor per provider/model, warmed with one LLM call each
+    
     # Application Settings
     app_name: str = "LinkedIn Post Generator"
     app_version: str = "1.0.0"
@@ -24,6 +50,101 @@ class Settings(BaseSettings):
     
     # Logging
     log_level: str = "INFO"
+    log_file: str = "logs/app.log"  # Rotating JSON log (empty for stdout only)
+    log_file_max_bytes: int = 10485760  # Rotate at 10 MB
+    log_file_backup_count: int = 5
+    log_queue_size: int = 10000  # Records buffered for the writer thread, then dropped
+    log_sampling_enabled: bool = True  # Log a fraction of per-search events
+    log_sample_rates: Dict[str, float] = {}  # Event name to fraction kept, over the defaults
+    
+    # Streaming
+    sse_heartbeat_interval: float = 15.0  # Seconds between keep-alive comments
+    
+    # Generation
+    generation_mode: Literal["direct", "deep"] = "deep"  # direct: one search round and one LLM call
+    agent_max_iterations: int = 5  # ReAct steps (LLM round trips) allowed in deep mode
+    direct_search_queries: List[str] = ["{topic} latest news", "{topic}"]  # Searched in parallel
+    direct_search_result_chars: int = 4000  # Per-query search text given to the LLM
+    
+    # Observation Compaction (search results replayed in the agent prompt)
+    observation_compaction_enabled: bool = True
+    observation_token_budget: int = 400  # Estimated tokens per search observation
+    observation_dedupe_similarity: float = 0.8  # Word overlap treated as a repeated snippet
+    
+    # Metrics
+    metrics_enabled: bool = True  # Serve GET /metrics and record request metrics
+    
+    # Admission Control
+    rate_limit_enabled: bool = True
+    rate_limit_per_minute: float = 30.0  # Sustained generation requests per client
+    rate_limit_burst: int = 10  # Requests a client may make at once
+    rate_limit_key_header: str = ""  # Client key header, e.g. X-API-Key (default: client IP)
+    rate_limit_max_clients: int = 10000  # Token buckets kept in memory
+    max_concurrent_generations: int = 8  # Per worker process, across all requests and batches
+    admission_wait_timeout: float = 10.0  # Queue this long for a token or slot before 429
+    admission_retry_after: float = 5.0  # Retry-After seconds when generation slots are full
+    
+    # Request Deadline (split across search, page fetches, agent steps and image suggestion)
+    request_deadline: float = 55.0  # Seconds per generation request (clients give up at 60); 0 disables
+    request_deadline_header: str = "X-Request-Deadline"  # Lets clients ask for a shorter deadline (seconds)
+    deadline_search_share: float = 0.4  # Share of the time left that one search may use
+    deadline_answer_reserve: float = 10.0  # Seconds kept to write the post if the agent runs out of time
+    
+    # Batch Generation
+    batch_concurrency: int = 4  # Topics generated at once per batch request
+    
+    # Async Jobs
+    job_workers: int = 2  # Jobs generated at once per worker process
+    job_queue_depth: int = 100  # Waiting jobs before POST /jobs returns 429
+    job_ttl: float = 3600.0  # Keep job status and results for an hour
+    job_store: Literal["memory", "sqlite"] = "memory"  # sqlite shares jobs between worker processes
+    job_store_path: str = ""  # SQLite file (default: system temp dir)
+    job_retry_after: int = 5  # Retry-After seconds sent with 429
+    
+    # Web Search
+    search_max_results: int = 5
+    search_fetch_timeout: float = 5.0  # Per-page timeout in seconds
+    search_fetch_budget: float = 6.0  # Overall snippet fetch budget in seconds
+    search_fetch_max_bytes: int = 131072  # Read at most this much of each page
+    search_fetch_workers: int = 8
+    search_engine_timeout: float = 10.0  # Per search engine request (Google, Yahoo, DuckDuckGo)
+    search_mode: Literal["fallback", "hedged", "race"] = "fallback"
+    search_engine_order: List[Literal["google", "yahoo", "duckduckgo"]] = ["google", "yahoo", "duckduckgo"]
+    search_hedge_delays: List[float] = [2.0, 2.0]  # Seconds before starting each next engine
+    search_yahoo_url: str = "https://search.yahoo.com/search"  # Overridden by the offline benchmarks
+    search_engine_workers: int = 16  # Engine threads for hedged/race modes (losers run to completion)
+    search_cache_size: int = 256
+    search_cache_ttl: float = 600.0  # Keep news results for 10 minutes
+    
+    # Page Cache (shared by all worker processes)
+    page_cache_enabled: bool = True
+    page_cache_path: str = ""  # SQLite file (default: system temp dir)
+    page_cache_max_entries: int = 5000
+    page_cache_fresh_seconds: float = 3600.0  # Reuse snippets without revalidating for an hour
+    
+    # Post Cache
+    post_cache_size: int = 128
+    post_cache_ttl: float = 900.0  # Serve repeat topics for 15 minutes
+    
+    # Semantic Cache (similar topics and queries share post and search cache entries)
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.9  # Cosine similarity to reuse an entry (numbers and names must also match)
+    semantic_cache_capacity: int = 20000  # Indexed texts per cache (oldest replaced)
+    semantic_cache_dim: int = 128  # Embedding size (lookup cost grows with capacity x dim)
+    
+    # Pre-warming (keeps popular topics in the post cache)
+    prewarm_enabled: bool = False  # Spends LLM quota on topics nobody is waiting for
+    prewarm_top_n: int = 10  # Most requested topics kept warm
+    prewarm_min_requests: float = 1.5  # Decayed request count to qualify (1.5: repeat requests only)
+    prewarm_half_life: float = 3600.0  # Seconds for a topic's request count to halve
+    prewarm_tracked_topics: int = 1000
+    prewarm_interval: float = 60.0  # Seconds between cycles
+    prewarm_lead_seconds: float = 120.0  # Refresh posts expiring within this
+    prewarm_spacing: float = 5.0  # Seconds between refreshes within a cycle
+    prewarm_reserved_slots: int = 2  # Generation slots left free for user requests
+    
+    # Image Suggestion
+    image_suggestion_timeout: float = 8.0  # Give up on the image, not the post
     
     # LangChain (optional)
     langchain_tracing_v2: str = "false"
@@ -32,6 +153,7 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         case_sensitive = False
+        protected_namespaces = ("settings_",)  # Allow the model_* fields
 
 
 @lru_cache()
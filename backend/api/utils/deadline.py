@@ -0,0 +1,87 @@
+"""
+Per-request deadlines.
+A request's deadline is fixed when it arrives, and each stage (search
+engines, page fetches, LLM calls, image suggestion) takes its timeout from
+the time left rather than a fixed value, so nothing keeps working for a
+client that has already given up.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class DeadlineExceeded(Exception):
+    """The request deadline passed before a result was ready."""
+
+
+class Deadline:
+    """Point in time by which a request must be answered."""
+    
+    __slots__ = ("seconds", "expires_at")
+    
+    def __init__(self, seconds: float):
+        """
+        Start a deadline.
+        
+        Args:
+            seconds: Time allowed from now
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+    
+    def remaining(self) -> float:
+        """Seconds left (0.0 once expired)."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+    
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+# Deadline of the request being served in this context (tool threads inherit it)
+_current: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """
+    Get the deadline of the request being served.
+    
+    Returns:
+        Deadline, or None if the work has no deadline (jobs, pre-warming)
+    """
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[None]:
+    """
+    Make a deadline current for the enclosed block.
+    
+    Tasks and tool threads started inside the block inherit it.
+    
+    Args:
+        deadline: Deadline to apply (None for no deadline)
+    """
+    token = _current.set(deadline)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def time_left(timeout: float, share: float = 1.0) -> float:
+    """
+    Cap a stage timeout by the current deadline.
+    
+    Args:
+        timeout: The stage's own timeout in seconds
+        share: Fraction of the remaining time the stage may use
+    
+    Returns:
+        Timeout to apply (0.0 once the deadline has passed)
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return timeout
+    return min(timeout, deadline.remaining() * share)
@@ -0,0 +1,156 @@
+"""
+Persistent store of generation jobs.
+Keeps job state and results either in this process or in SQLite, so any worker
+process can answer a status poll for a job queued by another.
+"""
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+DEFAULT_STORE_FILE = "linkedin_post_generator_jobs.sqlite3"
+
+
+class MemoryJobStore:
+    """
+    Job store kept in this process.
+    
+    Jobs are dicts; expired jobs are dropped whenever a job is created.
+    """
+    
+    def __init__(self):
+        """Initialize an empty store."""
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def create(self, job: Dict[str, Any]) -> None:
+        """
+        Store a new job, purging expired ones.
+        
+        Args:
+            job: Job record with at least id and expires_at
+        """
+        now = time.time()
+        with self._lock:
+            for job_id in [key for key, value in self._jobs.items() if value["expires_at"] <= now]:
+                del self._jobs[job_id]
+            self._jobs[job["id"]] = dict(job)
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a live job.
+        
+        Args:
+            job_id: Job identifier
+        
+        Returns:
+            Copy of the job record, or None if unknown or expired
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["expires_at"] <= time.time():
+                return None
+            return dict(job)
+    
+    def update(self, job_id: str, **fields: Any) -> None:
+        """
+        Update fields of a job.
+        
+        Args:
+            job_id: Job identifier
+            **fields: Fields to set
+        """
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+
+class SQLiteJobStore:
+    """
+    Job store in a SQLite file, visible to every worker process.
+    
+    Follows the page cache's approach: one connection per thread and WAL mode
+    so readers in other processes are not blocked by a writer.
+    """
+    
+    _COLUMNS = ("id", "status", "params", "result", "error", "created_at",
+                "started_at", "finished_at", "expires_at")
+    
+    def __init__(self, path: Path):
+        """
+        Initialize the store, creating the database if needed.
+        
+        Args:
+            path: SQLite database path
+        """
+        self.path = path
+        self._local = threading.local()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, params TEXT NOT NULL, result TEXT, error TEXT, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL, expires_at REAL NOT NULL)"
+        )
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None)
+            self._local.connection = connection
+        return connection
+    
+    def create(self, job: Dict[str, Any]) -> None:
+        """Store a new job, purging expired ones."""
+        connection = self._connection()
+        connection.execute("DELETE FROM jobs WHERE expires_at <= ?", (time.time(),))
+        row = {**job, "params": json.dumps(job["params"]), "result": json.dumps(job.get("result"))}
+        connection.execute(
+            f"INSERT INTO jobs ({', '.join(self._COLUMNS)}) VALUES ({', '.join('?' * len(self._COLUMNS))})",
+            tuple(row.get(column) for column in self._COLUMNS)
+        )
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a live job."""
+        row = self._connection().execute(
+            f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE id = ? AND expires_at > ?",
+            (job_id, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(self._COLUMNS, row))
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+    
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Update fields of a job."""
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self._connection().execute(
+            f"UPDATE jobs SET {assignments} WHERE id = ?",
+            (*fields.values(), job_id)
+        )
+
+
+def create_job_store(kind: str, configured_path: str = "") -> Union[MemoryJobStore, SQLiteJobStore]:
+    """
+    Build the configured job store.
+    
+    Args:
+        kind: "memory" or "sqlite"
+        configured_path: SQLite path (empty for the system temp directory)
+    
+    Returns:
+        MemoryJobStore or SQLiteJobStore
+    """
+    if kind == "sqlite":
+        path = Path(configured_path) if configured_path else Path(tempfile.gettempdir()) / DEFAULT_STORE_FILE
+        return SQLiteJobStore(path)
+    return MemoryJobStore()
@@ -1,37 +1,114 @@
 """
 Advanced logging configuration with structured logging support.
-Provides console output, file logging, and JSON formatting for production.
+Provides console output, rotating file logging, and JSON formatting for
+production. Records are handed to a background writer thread through a
+bounded queue, so logging I/O never blocks the event loop.
 """
+import atexit
 import logging
+import logging.handlers
+import queue
+import random
 import sys
 from pathlib import Path
+from typing import Dict, Optional
 import structlog
-from datetime import datetime
+from api.utils.metrics import LOG_RECORDS_DROPPED
 
+# High-volume events logged for a fraction of occurrences (warnings and errors
+# are never sampled)
+DEFAULT_SAMPLE_RATES = {
+    "attempting_google_search": 0.1,
+    "attempting_yahoo_search": 0.1,
+    "attempting_duckduckgo_search": 0.1,
+    "google_search_success": 0.1,
+    "yahoo_search_success": 0.1,
+    "duckduckgo_search_success": 0.1,
+    "search_cache_hit": 0.1,
+    "page_fetch_failed": 0.1,
+}
 
-def setup_logging(log_level: str = "INFO") -> structlog.stdlib.BoundLogger:
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class EventSampler:
+    """
+    structlog processor keeping a fraction of selected events.
+    
+    Events below WARNING whose name is in rates are kept with that
+    probability; everything else passes through.
+    """
+    
+    def __init__(self, rates: Dict[str, float]):
+        """
+        Initialize the sampler.
+        
+        Args:
+            rates: Event name to fraction kept (0.0 to 1.0)
+        """
+        self.rates = rates
+    
+    def __call__(self, logger, method_name: str, event_dict: dict) -> dict:
+        rate = self.rates.get(event_dict.get("event"))
+        if rate is not None and method_name in ("debug", "info") and random.random() >= rate:
+            raise structlog.DropEvent
+        if rate is not None and rate < 1.0:
+            event_dict["sample_rate"] = rate
+        return event_dict
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that drops records when the queue is full instead of blocking.
+    
+    Dropped records are counted in the log_records_dropped_total metric.
+    """
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def setup_logging(
+    log_level: str = "INFO",
+    log_file: str = "logs/app.log",
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    queue_size: int = 10000,
+    sample_rates: Optional[Dict[str, float]] = None
+) -> structlog.stdlib.BoundLogger:
     """
     Configure structured logging with:
-    - Console output (colored for development)
+    - Console output on stdout
     - File output with rotation
     - JSON formatting for production
-    - Request IDs for tracing
+    - A background writer thread fed by a bounded queue
+    - Sampling of high-volume events
+    
+    Calling it again replaces the previous configuration (handlers added by
+    others, such as pytest's capture, are left in place).
     
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        log_file: Rotating log file path (empty to log to stdout only)
+        max_bytes: Size at which the log file is rotated
+        backup_count: Rotated files kept
+        queue_size: Records buffered for the writer thread before dropping
+        sample_rates: Event name to fraction kept (defaults to DEFAULT_SAMPLE_RATES)
     
     Returns:
         structlog.stdlib.BoundLogger: Configured logger instance
     """
-    
-    # Create logs directory if it doesn't exist
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
+    global _listener
+    stop_logging()
     
     # Configure structlog
     structlog.configure(
         processors=[
             structlog.stdlib.filter_by_level,
+            EventSampler(DEFAULT_SAMPLE_RATES if sample_rates is None else sample_rates),
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
             structlog.stdlib.PositionalArgumentsFormatter(),
@@ -46,14 +123,44 @@ def setup_logging(log_level: str = "INFO") -> structlog.stdlib.BoundLogger:
         cache_logger_on_first_use=True,
     )
     
+    # Writers run on the listener thread
+    formatter = logging.Formatter("%(message)s")
+    writers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        path = Path(log_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        writers.append(logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        ))
+    for writer in writers:
+        writer.setFormatter(formatter)
+    
+    records: queue.Queue = queue.Queue(maxsize=queue_size)
+    _listener = logging.handlers.QueueListener(records, *writers, respect_handler_level=False)
+    _listener.start()
+    
     # Setup standard logging
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=getattr(logging, log_level.upper()),
-    )
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(DroppingQueueHandler(records))
+    root.setLevel(getattr(logging, log_level.upper()))
     
     logger = structlog.get_logger()
-    logger.info("logging_initialized", log_level=log_level)
+    logger.info("logging_initialized", log_level=log_level, log_file=log_file or None)
     
     return logger
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread, if running."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for writer in _listener.handlers:
+            writer.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,386 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+Provides counters, gauges and histograms with labels, and the catalogue of
+metrics the API records, rendered by GET /metrics.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Render a label set, escaping values."""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    """Base class holding the name, help text and label names."""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Initialize the metric.
+        
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Names of the labels every sample carries
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """
+        Turn keyword labels into the sample key.
+        
+        Raises:
+            ValueError: If the labels do not match the declared label names
+        """
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def samples(self) -> List[str]:
+        """Exposition lines for the current values."""
+        raise NotImplementedError
+    
+    def render(self) -> str:
+        """
+        Render HELP, TYPE and sample lines.
+        
+        Returns:
+            Exposition text for this metric
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += self.samples()
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """
+        Increase the count.
+        
+        Args:
+            amount: Non-negative increment
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels: str) -> float:
+        """Current count for a label set (0 if never incremented)."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        """Decrease the gauge."""
+        self.inc(-amount, **labels)
+    
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def value(self, **labels: str) -> float:
+        """Current value for a label set (0 if never set)."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+    
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        """Increment for the duration of the block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+    
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Record one observation.
+        
+        Args:
+            value: Observed value (seconds for latency histograms)
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            # Per-bucket counts, then sum and count
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+    
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+    
+    def count(self, **labels: str) -> int:
+        """Number of observations for a label set."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(series[-1]) if series else 0
+    
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0.0
+                for bound, bucket_count in zip(self.buckets, series):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                    lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+    
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, metric: _Metric) -> _Metric:
+        """
+        Add a metric.
+        
+        Args:
+            metric: Metric to expose
+        
+        Returns:
+            The same metric, for assignment at module level
+        
+        Raises:
+            ValueError: If a metric with that name is already registered
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+    
+    def get(self, name: str) -> Optional[_Metric]:
+        """Look up a registered metric by name."""
+        return self._metrics.get(name)
+    
+    def render(self) -> str:
+        """
+        Render every metric in the exposition format.
+        
+        Returns:
+            Exposition text ending with a newline
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording HTTP request counts, in-flight requests and latency.
+    
+    Latency runs until the response body is complete, so streamed responses
+    are measured in full. Routes are labelled by their path template to keep
+    label cardinality bounded.
+    """
+    
+    def __init__(self, app):
+        """
+        Wrap an ASGI app.
+        
+        Args:
+            app: Downstream ASGI application
+        """
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        HTTP_IN_PROGRESS.inc(method=method)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_PROGRESS.dec(method=method)
+            route = _route_label(scope)
+            HTTP_SECONDS.observe(time.perf_counter() - started, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+
+
+def _route_label(scope) -> str:
+    """Path template of the matched route, or "unmatched"."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Plain Starlette routes (docs, openapi) have fixed paths
+    if "endpoint" in scope:
+        return scope["path"]
+    return "unmatched"
+
+
+REGISTRY = MetricsRegistry()
+
+# HTTP
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")))
+HTTP_IN_PROGRESS = REGISTRY.register(Gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled", ("method",)))
+HTTP_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency including the streamed body", ("method", "route")))
+
+# Generation pipeline
+GENERATIONS_IN_PROGRESS = REGISTRY.register(Gauge(
+    "post_generations_in_progress", "Post generations currently running"))
+GENERATIONS_WAITING = REGISTRY.register(Gauge(
+    "post_generations_waiting", "Post generations waiting for a concurrency slot"))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "post_stage_duration_seconds", "Latency of each post generation stage", ("stage",)))
+SEARCH_ENGINE_SECONDS = REGISTRY.register(Histogram(
+    "search_engine_duration_seconds", "Latency of each search engine call", ("engine", "outcome")))
+PAGE_FETCH_SECONDS = REGISTRY.register(Histogram(
+    "page_fetch_duration_seconds", "Latency of each result page snippet fetch", ("outcome",)))
+OBSERVATION_TOKENS = REGISTRY.register(Counter(
+    "observation_tokens_total", "Estimated prompt tokens of search observations before and after compaction",
+    ("stage",)))
+
+# LLM
+LLM_CALL_SECONDS = REGISTRY.register(Histogram(
+    "llm_call_duration_seconds", "Latency of each LLM call (agent steps and image suggestions)",
+    ("target", "outcome")))
+LLM_FAILOVERS = REGISTRY.register(Counter(
+    "llm_failovers_total", "LLM calls retried on the next provider/model", ("from_target", "to_target")))
+
+# Request deadlines
+DEADLINE_EXPIRIES = REGISTRY.register(Counter(
+    "deadline_expiries_total", "Stages cut short by the request deadline", ("stage",)))
+
+# Pre-warming
+PREWARM_REFRESHES = REGISTRY.register(Counter(
+    "prewarm_refreshes_total", "Background refreshes of popular topics", ("outcome",)))
+
+# Admission control
+ADMISSION_LIMITS = REGISTRY.register(Gauge(
+    "admission_limits", "Configured admission limits", ("limit",)))
+ADMISSION_REJECTIONS = REGISTRY.register(Counter(
+    "admission_rejections_total", "Requests rejected with 429", ("reason",)))
+ADMISSION_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "admission_wait_seconds", "Time admitted requests waited at each gate", ("gate",)))
+
+# Caches
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "cache_lookups_total", "In-process cache lookups", ("cache", "result")))
+
+# Jobs
+JOBS_QUEUED = REGISTRY.register(Gauge(
+    "jobs_queued", "Generation jobs waiting for a worker"))
+JOBS_FINISHED = REGISTRY.register(Counter(
+    "jobs_finished_total", "Generation jobs finished", ("outcome",)))
+
+# Logging
+LOG_RECORDS_DROPPED = REGISTRY.register(Counter(
+    "log_records_dropped_total", "Log records dropped because the writer queue was full"))
@@ -0,0 +1,77 @@
+"""
+Persistence of the last known-good LLM model.
+Lets a cold start reuse the model found by an earlier probe instead of probing again.
+"""
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+DEFAULT_STATE_FILE = "linkedin_post_generator_model.json"
+
+
+def resolve_state_path(configured: str) -> Path:
+    """
+    Resolve the model state file location.
+    
+    Args:
+        configured: Path from settings (empty for the system temp directory,
+            which is the only writable location on serverless platforms)
+    
+    Returns:
+        Path to the state file
+    """
+    if configured:
+        return Path(configured)
+    return Path(tempfile.gettempdir()) / DEFAULT_STATE_FILE
+
+
+def load_model_state(path: Path, max_age: float) -> Optional[Dict[str, str]]:
+    """
+    Load the last known-good model if it is recent enough.
+    
+    Args:
+        path: State file path
+        max_age: Maximum age in seconds before the state is considered stale
+    
+    Returns:
+        Dict with provider and model, or None if missing, invalid or stale
+    """
+    try:
+        state = json.loads(path.read_text())
+        if time.time() - float(state["saved_at"]) > max_age:
+            return None
+        return {"provider": state["provider"], "model": state["model"]}
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("model_state_unreadable", path=str(path), error=str(e))
+        return None
+
+
+def save_model_state(path: Path, provider: str, model: str) -> None:
+    """
+    Persist the known-good model atomically.
+    
+    Args:
+        path: State file path
+        provider: Provider name ("gemini" or "groq")
+        model: Model name
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({
+            "provider": provider,
+            "model": model,
+            "saved_at": time.time()
+        }))
+        os.replace(tmp_path, path)
+        logger.info("model_state_saved", provider=provider, model=model, path=str(path))
+    except Exception as e:
+        logger.warning("model_state_save_failed", path=str(path), error=str(e))
@@ -0,0 +1,172 @@
+"""
+Compaction of search observations before they reach the agent scratchpad.
+The ReAct prompt replays every observation on each later step, so results
+are deduplicated across engines and steps, stripped of page boilerplate and
+cut to a token budget first.
+"""
+import re
+from typing import List, Sequence, Set, Union
+from api.utils.metrics import OBSERVATION_TOKENS
+from api.utils.search_results import SearchResult, render_results
+
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+")
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Page furniture that scrapers pick up along with the article text
+BOILERPLATE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"\b(?:read more|continue reading|click here|subscribe now|sign up now|sign up for our newsletter)\b[\s.:…»›>-]*",
+        r"\bwe use cookies\b[^.]*\.?",
+        r"\baccept (?:all )?cookies\b[^.]*\.?",
+        r"©\s*(?:\d{4}\s*)?[^.]*\.?",
+        r"\ball rights reserved\b\.?",
+        r"\b(?:advertisement|sponsored content)\b",
+        r"(?:\.\.\.|…)\s*$",
+    )
+]
+
+# Snippets too short to be worth keeping after cleanup
+MIN_SNIPPET_CHARS = 20
+NOTHING_NEW = "No new results; everything found was already shown in earlier observations."
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate LLM tokens in a text (about four characters per token).
+    
+    Args:
+        text: Prompt text
+    
+    Returns:
+        Approximate token count
+    """
+    return (len(text) + 3) // 4
+
+
+def strip_boilerplate(text: str) -> str:
+    """
+    Remove page furniture and collapse whitespace.
+    
+    Args:
+        text: Snippet or raw result text
+    
+    Returns:
+        Cleaned text
+    """
+    for pattern in BOILERPLATE_PATTERNS:
+        text = pattern.sub(" ", text)
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def _truncate_words(text: str, max_chars: int) -> str:
+    """Cut text to at most max_chars, at a word boundary."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return cut.rstrip(" ,;:") if cut else ""
+
+
+class ObservationCompactor:
+    """
+    Compacts the observations of one generation.
+    
+    Keeps the words of every snippet and sentence already shown, so results
+    repeated by another engine or a later search step are dropped. URLs
+    already shown are not repeated either. Tracks estimated tokens before and
+    after compaction.
+    """
+    
+    def __init__(self, token_budget: int = 400, similarity: float = 0.8):
+        """
+        Initialize the compactor.
+        
+        Args:
+            token_budget: Maximum estimated tokens per observation
+            similarity: Word overlap (Jaccard) at which two snippets count as
+                the same text
+        """
+        self.token_budget = token_budget
+        self.similarity = similarity
+        self.raw_tokens = 0
+        self.compacted_tokens = 0
+        self._seen_text: List[Set[str]] = []
+        self._seen_urls: Set[str] = set()
+    
+    def compact(self, observation: Union[Sequence[SearchResult], str]) -> str:
+        """
+        Compact one observation.
+        
+        Args:
+            observation: Search results, or raw result text
+        
+        Returns:
+            Compacted observation
+        """
+        if isinstance(observation, str):
+            compacted = self._compact_text(observation)
+        else:
+            compacted = self._compact_results(observation)
+            observation = render_results(observation)
+        
+        compacted = compacted or NOTHING_NEW
+        raw_tokens = estimate_tokens(observation)
+        compacted_tokens = estimate_tokens(compacted)
+        self.raw_tokens += raw_tokens
+        self.compacted_tokens += compacted_tokens
+        OBSERVATION_TOKENS.inc(raw_tokens, stage="raw")
+        OBSERVATION_TOKENS.inc(compacted_tokens, stage="compacted")
+        return compacted
+    
+    def _is_repeat(self, text: str) -> bool:
+        """
+        Check text against everything shown so far, remembering it if new.
+        
+        Args:
+            text: Snippet or sentence
+        
+        Returns:
+            True if near-identical text was already shown
+        """
+        words = set(WORD_PATTERN.findall(text.lower()))
+        if not words:
+            return True
+        for seen in self._seen_text:
+            if len(words & seen) / len(words | seen) >= self.similarity:
+                return True
+        self._seen_text.append(words)
+        return False
+    
+    def _compact_results(self, results: Sequence[SearchResult]) -> str:
+        """Compact structured results, rendered as Title/URL/Snippet blocks."""
+        kept = []
+        for result in results:
+            if result.url and result.url in self._seen_urls:
+                continue
+            snippet = strip_boilerplate(result.snippet)
+            if len(snippet) < MIN_SNIPPET_CHARS or self._is_repeat(snippet):
+                snippet = ""
+            if result.url:
+                self._seen_urls.add(result.url)
+            kept.append((result, snippet))
+        
+        budget = self.token_budget * 4
+        rendered = []
+        for result, snippet in kept:
+            head = result.render(snippet="")
+            room = budget - len(head)
+            if room < 0:
+                break
+            if snippet and room > MIN_SNIPPET_CHARS + len("Snippet: \n"):
+                head = result.render(snippet=_truncate_words(snippet, room - len("Snippet: \n")))
+            rendered.append(head)
+            budget -= len(head) + 1
+        return "\n".join(rendered)
+    
+    def _compact_text(self, observation: str) -> str:
+        """Compact raw result text sentence by sentence."""
+        sentences = []
+        for sentence in SENTENCE_END_PATTERN.split(strip_boilerplate(observation)):
+            if sentence and not self._is_repeat(sentence):
+                sentences.append(sentence)
+        return _truncate_words(" ".join(sentences), self.token_budget * 4)
@@ -0,0 +1,172 @@
+"""
+Persistent cache of page snippets.
+Stores extracted snippets with their HTTP validators in SQLite so every worker
+process, and the next cold start, can reuse or cheaply revalidate a page.
+"""
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+DEFAULT_CACHE_FILE = "linkedin_post_generator_pages.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    snippet TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_fetched_at ON pages (fetched_at);
+"""
+
+
+def resolve_cache_path(configured: str) -> Path:
+    """
+    Resolve the page cache database location.
+    
+    Args:
+        configured: Path from settings (empty for the system temp directory)
+    
+    Returns:
+        Path to the SQLite database
+    """
+    if configured:
+        return Path(configured)
+    return Path(tempfile.gettempdir()) / DEFAULT_CACHE_FILE
+
+
+class PageCache:
+    """
+    SQLite-backed snippet cache keyed by URL, safe across threads and processes.
+    
+    Each thread keeps its own connection; the database runs in WAL mode so
+    readers in other processes are not blocked by a writer. When the table
+    grows past max_entries the least recently fetched pages are evicted.
+    Storage errors are logged and treated as misses, never raised.
+    """
+    
+    def __init__(self, path: Path, max_entries: int):
+        """
+        Initialize the cache, creating the database if needed.
+        
+        Args:
+            path: SQLite database path
+            max_entries: Maximum number of pages kept
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            connection = self._connection()
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+        except sqlite3.Error as e:
+            logger.warning("page_cache_unavailable", path=str(path), error=str(e))
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+    
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a page.
+        
+        Args:
+            url: Page URL
+        
+        Returns:
+            Dict with snippet, etag, last_modified and fetched_at, or None
+        """
+        try:
+            row = self._connection().execute(
+                "SELECT snippet, etag, last_modified, fetched_at FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("page_cache_read_failed", url=url, error=str(e))
+            return None
+        if row is None:
+            return None
+        snippet, etag, last_modified, fetched_at = row
+        return {"snippet": snippet, "etag": etag, "last_modified": last_modified, "fetched_at": fetched_at}
+    
+    def put(
+        self,
+        url: str,
+        snippet: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> None:
+        """
+        Store a page's snippet and validators, evicting the oldest pages if full.
+        
+        Args:
+            url: Page URL
+            snippet: Extracted snippet (may be empty)
+            etag: ETag response header
+            last_modified: Last-Modified response header
+        """
+        if self.max_entries <= 0:
+            return
+        try:
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO pages (url, snippet, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, snippet, etag, last_modified, time.time())
+            )
+            connection.execute(
+                "DELETE FROM pages WHERE url IN "
+                "(SELECT url FROM pages ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+        except sqlite3.Error as e:
+            logger.warning("page_cache_write_failed", url=url, error=str(e))
+    
+    def touch(self, url: str) -> None:
+        """
+        Mark a page as freshly validated (after a 304 Not Modified).
+        
+        Args:
+            url: Page URL
+        """
+        try:
+            self._connection().execute(
+                "UPDATE pages SET fetched_at = ? WHERE url = ?",
+                (time.time(), url)
+            )
+        except sqlite3.Error as e:
+            logger.warning("page_cache_write_failed", url=url, error=str(e))
+    
+    def clear(self) -> None:
+        """Remove all pages."""
+        try:
+            self._connection().execute("DELETE FROM pages")
+        except sqlite3.Error as e:
+            logger.warning("page_cache_write_failed", error=str(e))
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the cache for health reporting.
+        
+        Returns:
+            Dict with name, size and capacity
+        """
+        try:
+            size = self._connection().execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        except sqlite3.Error:
+            size = None
+        return {"name": "page", "size": size, "maxsize": self.max_entries}
@@ -0,0 +1,124 @@
+"""
+Structured search results.
+Engines return SearchResult records; the agent observation is rendered from
+them, and a generation's sources are read from its SearchLog rather than
+parsed back out of the observation text.
+"""
+import threading
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+
+class SearchResult:
+    """One search engine hit."""
+    
+    __slots__ = ("title", "url", "snippet", "engine", "rank")
+    
+    def __init__(self, title: str, url: str, snippet: str = "", engine: str = "", rank: int = 0):
+        self.title = title
+        self.url = url
+        self.snippet = snippet
+        self.engine = engine
+        self.rank = rank
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SearchResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    
+    def __repr__(self) -> str:
+        return f"SearchResult({self.engine}#{self.rank}: {self.url})"
+    
+    def render(self, snippet: Optional[str] = None) -> str:
+        """
+        Format the hit as an observation block.
+        
+        Args:
+            snippet: Snippet to show instead of the stored one
+        
+        Returns:
+            "Title/URL/Snippet" lines (no Snippet line if it is empty)
+        """
+        snippet = self.snippet if snippet is None else snippet
+        block = f"Title: {self.title}\nURL: {self.url}\n"
+        return block + f"Snippet: {snippet}\n" if snippet else block
+
+
+def render_results(results: Iterable[SearchResult]) -> str:
+    """
+    Format hits as the WebSearch observation.
+    
+    Args:
+        results: Hits in rank order
+    
+    Returns:
+        Result blocks separated by blank lines
+    """
+    return "\n".join(result.render() for result in results)
+
+
+class SearchLog:
+    """
+    Results of every search made during one generation, in call order.
+    
+    Searches run in tool threads, so recording is thread-safe.
+    """
+    
+    def __init__(self):
+        self._searches: List[Tuple[str, Sequence[SearchResult]]] = []
+        self._lock = threading.Lock()
+        self.cut_short = False  # A search was stopped by the request deadline
+    
+    def record(self, query: str, results: Sequence[SearchResult]) -> None:
+        """
+        Record the results one search returned.
+        
+        Args:
+            query: Search query as the agent sent it
+            results: Hits in rank order
+        """
+        with self._lock:
+            self._searches.append((query, results))
+    
+    def searches(self) -> List[Tuple[str, Sequence[SearchResult]]]:
+        """
+        Every search recorded so far.
+        
+        Returns:
+            (query, results) pairs in call order
+        """
+        with self._lock:
+            return list(self._searches)
+    
+    def results_for(self, query: str) -> Sequence[SearchResult]:
+        """
+        Results of the latest search for a query.
+        
+        Args:
+            query: Search query as the agent sent it
+        
+        Returns:
+            Hits in rank order (empty if the query was not searched)
+        """
+        with self._lock:
+            for searched, results in reversed(self._searches):
+                if searched == query:
+                    return results
+        return ()
+    
+    def urls(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Distinct result URLs, by search order and then rank.
+        
+        Args:
+            limit: Maximum URLs to return
+        
+        Returns:
+            URLs
+        """
+        urls = dict.fromkeys(
+            result.url for _, results in self.searches() for result in results if result.url
+        )
+        return list(urls)[:limit]
+    
+    def __len__(self) -> int:
+        return len(self._searches)
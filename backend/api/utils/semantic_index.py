@@ -0,0 +1,233 @@
+"""
+Similarity lookup of recent topics and queries, computed locally.
+Texts are embedded as hashed word and character trigram features (no model,
+no network) and matched by cosine similarity against a fixed-size
+NumPy matrix, so differently worded requests can share a cached result.
+Texts that differ in a number or a capitalised name never match.
+"""
+import re
+import threading
+import zlib
+from typing import Dict, FrozenSet, Hashable, List, Optional, Tuple
+import numpy as np
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+")
+
+# Words that do not change what a topic is about
+STOP_WORDS = frozenset({
+    "a", "an", "and", "the", "of", "in", "on", "for", "to", "with", "about", "at",
+    "by", "from", "into", "over", "vs", "versus", "news", "latest", "recent",
+})
+
+# Spelled-out phrases folded into their usual abbreviation (after stemming)
+ABBREVIATIONS = {
+    "artificial intelligence": "ai",
+    "machine learning": "ml",
+    "large language model": "llm",
+    "electric vehicle": "ev",
+    "internet thing": "iot",
+    "united state": "us",
+    "united kingdom": "uk",
+    "european union": "eu",
+}
+ABBREVIATION_PATTERN = re.compile(r"\b(" + "|".join(ABBREVIATIONS) + r")\b")
+
+# Weight of a character trigram relative to a whole word
+TRIGRAM_WEIGHT = 0.25
+
+
+def _stem(word: str) -> str:
+    """Strip a plural ending ("regulations" -> "regulation", "policies" -> "policy")."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _words(text: str) -> List[str]:
+    """Content words of a text: lower-cased, stemmed, abbreviations folded."""
+    words = [_stem(word) for word in WORD_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+    return ABBREVIATION_PATTERN.sub(lambda match: ABBREVIATIONS[match.group(1)], " ".join(words)).split()
+
+
+def _terms(text: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """
+    Words of a text and the ones that name something specific.
+    
+    Args:
+        text: Topic or query
+    
+    Returns:
+        (words, anchors): content words, and the stemmed words that contain a
+        digit or are capitalised ("2024", "Q3", "Germany", "Tesla")
+    """
+    anchors = frozenset(
+        _stem(token.lower()) for token in TOKEN_PATTERN.findall(text)
+        if token[0].isupper() or any(char.isdigit() for char in token)
+    )
+    return frozenset(_words(text)), anchors
+
+
+def _features(text: str) -> List[Tuple[str, float]]:
+    """
+    Weighted features of a text.
+    
+    Args:
+        text: Topic or query
+    
+    Returns:
+        (feature, weight) pairs
+    """
+    words = _words(text)
+    features = [("w:" + word, 1.0) for word in words]
+    for word in words:
+        padded = f" {word} "
+        features.extend(("c:" + padded[i:i + 3], TRIGRAM_WEIGHT) for i in range(len(padded) - 2))
+    return features
+
+
+def embed(text: str, dim: int) -> np.ndarray:
+    """
+    Embed a text as a unit vector of hashed features.
+    
+    Word order, case, plurals and filler words are ignored; shared character
+    trigrams give partial credit to related word forms.
+    
+    Args:
+        text: Topic or query
+        dim: Vector size
+    
+    Returns:
+        float32 vector of length dim (all zeros if the text has no words)
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, weight in _features(text):
+        vector[zlib.crc32(feature.encode()) % dim] += weight
+    norm = float(np.linalg.norm(vector))
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+class SemanticIndex:
+    """
+    Bounded index from texts to cache keys, searched by cosine similarity.
+    
+    Vectors live in one preallocated (capacity x dim) float32 matrix, so a
+    lookup is a single matrix-vector product. When full, the oldest entry is
+    overwritten. A similar entry only matches if neither text has a number or
+    capitalised word the other lacks ("... Germany 2024" never matches
+    "... France 2024", nor "Tesla Q3 earnings" "Tesla Q2 earnings").
+    Thread-safe.
+    """
+    
+    def __init__(self, capacity: int = 20000, dim: int = 128, name: str = "index"):
+        """
+        Initialize an empty index.
+        
+        Args:
+            capacity: Entries kept before the oldest is replaced
+            dim: Embedding size
+            name: Name for stats
+        """
+        self.capacity = max(capacity, 1)
+        self.dim = dim
+        self.name = name
+        self._vectors = np.zeros((self.capacity, dim), dtype=np.float32)
+        self._keys: List[Optional[Hashable]] = [None] * self.capacity
+        self._terms: List[Optional[Tuple[FrozenSet[str], FrozenSet[str]]]] = [None] * self.capacity
+        self._slots: Dict[Hashable, int] = {}
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def add(self, key: Hashable, text: str) -> None:
+        """
+        Index a text under a cache key, replacing the key's previous text.
+        
+        Args:
+            key: Cache key the text resolves to
+            text: Topic or query
+        """
+        vector = embed(text, self.dim)
+        if not vector.any():
+            return
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._next
+                evicted = self._keys[slot]
+                if evicted is not None:
+                    del self._slots[evicted]
+                self._next = (self._next + 1) % self.capacity
+                self._size = min(self._size + 1, self.capacity)
+                self._keys[slot] = key
+                self._slots[key] = slot
+            self._vectors[slot] = vector
+            self._terms[slot] = _terms(text)
+    
+    def lookup(self, text: str, threshold: float) -> Optional[Tuple[Hashable, float]]:
+        """
+        Find the most similar indexed text.
+        
+        Args:
+            text: Topic or query
+            threshold: Minimum cosine similarity (0.0 to 1.0)
+        
+        Returns:
+            (key, similarity) of the best match at or above threshold whose
+            numbers and capitalised words agree with the text's, or None
+        """
+        vector = embed(text, self.dim)
+        if not vector.any():
+            return None
+        words, anchors = _terms(text)
+        with self._lock:
+            if not self._size:
+                return None
+            scores = self._vectors[:self._size] @ vector
+            candidates = np.flatnonzero(scores >= threshold)
+            for slot in candidates[np.argsort(-scores[candidates], kind="stable")]:
+                entry_words, entry_anchors = self._terms[slot]
+                if (words ^ entry_words) & (anchors | entry_anchors):
+                    continue
+                return self._keys[slot], float(scores[slot])
+        return None
+    
+    def discard(self, key: Hashable) -> None:
+        """
+        Remove a key (e.g. when its cache entry has expired).
+        
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            slot = self._slots.pop(key, None)
+            if slot is not None:
+                self._keys[slot] = None
+                self._terms[slot] = None
+                self._vectors[slot] = 0.0
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._vectors[:] = 0.0
+            self._keys = [None] * self.capacity
+            self._terms = [None] * self.capacity
+            self._slots.clear()
+            self._next = 0
+            self._size = 0
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def stats(self) -> Dict[str, object]:
+        """
+        Snapshot of the index for health reporting.
+        
+        Returns:
+            Dict with name, size and capacity
+        """
+        return {"name": self.name, "size": len(self._slots), "maxsize": self.capacity}
@@ -0,0 +1,86 @@
+"""
+Request frequency of topics, for pre-warming the popular ones.
+Counts decay exponentially, so the ranking follows what is popular now.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from api.utils.cache import normalize_key
+
+
+class TopicTracker:
+    """
+    Decaying request counts per normalized topic, bounded in size.
+    
+    A request adds 1 to its topic's score; scores halve every half_life
+    seconds. When more than max_topics are tracked the lowest-scored other
+    topic is forgotten.
+    """
+    
+    def __init__(self, max_topics: int = 1000, half_life: float = 3600.0):
+        """
+        Initialize an empty tracker.
+        
+        Args:
+            max_topics: Topics tracked at once
+            half_life: Seconds for a score to halve
+        """
+        self.max_topics = max_topics
+        self.half_life = half_life
+        # key -> (score, scored_at, most recent spelling of the topic)
+        self._topics: Dict[str, Tuple[float, float, str]] = {}
+        self._lock = threading.Lock()
+    
+    def _decayed(self, score: float, scored_at: float, now: float) -> float:
+        """Score decayed from scored_at to now."""
+        return score * 0.5 ** ((now - scored_at) / self.half_life)
+    
+    def record(self, topic: str, now: Optional[float] = None) -> None:
+        """
+        Count one request for a topic.
+        
+        Args:
+            topic: Topic as requested
+            now: Current time (defaults to time.monotonic())
+        """
+        now = time.monotonic() if now is None else now
+        key = normalize_key(topic)
+        with self._lock:
+            score, scored_at, _ = self._topics.get(key, (0.0, now, topic))
+            self._topics[key] = (self._decayed(score, scored_at, now) + 1.0, now, topic)
+            if len(self._topics) > self.max_topics:
+                coldest = min(
+                    (name for name in self._topics if name != key),
+                    key=lambda name: self._decayed(self._topics[name][0], self._topics[name][1], now)
+                )
+                del self._topics[coldest]
+    
+    def top(self, count: int, min_score: float = 0.0, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        Most requested topics right now.
+        
+        Args:
+            count: Topics to return
+            min_score: Leave out topics scoring below this
+            now: Current time (defaults to time.monotonic())
+        
+        Returns:
+            (topic, score) pairs, highest score first
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            scored = [
+                (topic, self._decayed(score, scored_at, now))
+                for score, scored_at, topic in self._topics.values()
+            ]
+        scored = [item for item in scored if item[1] >= min_score]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:count]
+    
+    def __len__(self) -> int:
+        return len(self._topics)
+    
+    def clear(self) -> None:
+        """Forget all topics."""
+        with self._lock:
+            self._topics.clear()
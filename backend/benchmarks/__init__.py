@@ -0,0 +1 @@
+# Offline micro-benchmarks for the search and generation hot paths
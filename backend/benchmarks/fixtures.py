@@ -0,0 +1,128 @@
+"""
+Offline fixtures for the benchmarks.
+Generates realistic, deterministic HTML (news articles and a Yahoo results page)
+and serves it from a local HTTP server so no benchmark touches the network.
+"""
+import threading
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+LOREM = (
+    "Regulators in London and Brussels published fresh guidance this week, "
+    "and analysts expect the changes to reshape how firms deploy new models. "
+)
+
+
+def _scripts(kib: int) -> str:
+    """Inline scripts and styles of roughly the given size, as news sites ship."""
+    block = "<script>window.__data = window.__data || []; window.__data.push({\"k\": \"%s\"});</script>\n"
+    chunk = block % ("x" * 200)
+    return chunk * max(kib * 1024 // len(chunk), 1)
+
+
+def _navigation(links: int) -> str:
+    """Header navigation with many links."""
+    items = "".join(f'<li><a href="/section/{index}">Section {index}</a></li>' for index in range(links))
+    return f"<header><nav><ul>{items}</ul></nav></header>"
+
+
+@lru_cache(maxsize=None)
+def news_article(with_meta: bool = True, head_kib: int = 60, body_kib: int = 400) -> bytes:
+    """
+    Build a large news article page.
+    
+    Args:
+        with_meta: Put a meta description at the end of <head>; otherwise the
+            snippet has to come from the first paragraph after the navigation
+        head_kib: Approximate size of inline scripts in <head>
+        body_kib: Approximate size of the article body
+    
+    Returns:
+        UTF-8 encoded HTML
+    """
+    meta = '<meta name="description" content="Regulators publish new AI guidance for firms.">' if with_meta else ""
+    paragraphs = "".join(f"<p>{LOREM * 4}</p>\n" for _ in range(max(body_kib * 1024 // (len(LOREM) * 4), 1)))
+    html = (
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\">"
+        "<title>Regulators publish new AI guidance</title>"
+        f"{_scripts(head_kib)}{meta}</head><body>"
+        f"{_navigation(300)}<main><article>{paragraphs}</article></main>"
+        f"<footer>{_scripts(head_kib // 2)}</footer></body></html>"
+    )
+    return html.encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def yahoo_results(results: int = 10, filler_kib: int = 150) -> bytes:
+    """
+    Build a Yahoo search results page.
+    
+    Args:
+        results: Number of organic results
+        filler_kib: Approximate size of surrounding markup and scripts
+    
+    Returns:
+        UTF-8 encoded HTML
+    """
+    items: List[str] = []
+    for index in range(results):
+        items.append(
+            f'<div class="algo"><div class="compTitle"><h3><a href="https://news{index}.example.com/story">'
+            f"Story {index}: AI guidance</a></h3></div>"
+            f'<div class="compText"><p>{LOREM}</p></div></div>'
+        )
+    html = (
+        "<!DOCTYPE html><html><head><title>ai news - Yahoo Search</title>"
+        f"{_scripts(filler_kib)}</head><body>{_navigation(120)}"
+        f"<ol class=\"searchCenterMiddle\">{''.join(f'<li>{item}</li>' for item in items)}</ol>"
+        "</body></html>"
+    )
+    return html.encode("utf-8")
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    """Serve the generated pages by path."""
+    
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/search":
+            body = yahoo_results()
+        elif path.startswith("/article/meta"):
+            body = news_article(with_meta=True)
+        elif path.startswith("/article/plain"):
+            body = news_article(with_meta=False)
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The snippet fetcher stops reading once it has what it needs
+            pass
+    
+    def log_message(self, format, *args):
+        """Keep benchmark output clean."""
+
+
+class FixtureServer:
+    """Local HTTP server for the fixtures, usable as a context manager."""
+    
+    def __init__(self):
+        """Bind to a free port on localhost."""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-server", daemon=True)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+    
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
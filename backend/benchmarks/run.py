@@ -0,0 +1,193 @@
+"""
+Offline micro-benchmarks for the search and generation hot paths.
+
+Usage (from backend/):
+    python -m benchmarks.run                 # run all, compare with the baseline
+    python -m benchmarks.run --check         # exit 1 on a regression
+    python -m benchmarks.run --save-baseline # record the current numbers
+    python -m benchmarks.run yahoo_serp      # run selected benchmarks
+
+Each benchmark reports ops/sec, mean time per op and the peak memory
+allocated by one op (tracemalloc). Baselines are machine specific: record
+one before and after a change on the same machine.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import structlog
+
+from api.models.response import PostGenerationResponse
+from api.services.langchain_agent import NewsToLinkedInAgent, _get_fetch_resources
+from api.utils.config import Settings
+from api.utils.search_results import SearchLog, SearchResult
+from benchmarks.fixtures import FixtureServer, LOREM
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+
+def _agent(server: FixtureServer) -> NewsToLinkedInAgent:
+    """Agent wired to the fixture server, without an LLM or the page cache."""
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings(
+        search_yahoo_url=f"{server.url}/search",
+        page_cache_enabled=False,
+        search_max_results=5
+    )
+    return agent
+
+
+def _search_log(steps: int = 5, results_per_step: int = 200) -> SearchLog:
+    """Search log with large result sets, as seen by _extract_sources."""
+    search_log = SearchLog()
+    for step in range(steps):
+        search_log.record(f"query-{step}", tuple(
+            SearchResult(f"Story {index}", f"https://news{index}.example.com/2025/story-{index}?ref=search",
+                         LOREM, "yahoo", index + 1)
+            for index in range(results_per_step)
+        ))
+    return search_log
+
+
+def build_benchmarks(server: FixtureServer) -> Dict[str, Callable[[], object]]:
+    """
+    Create the benchmark callables.
+    
+    Args:
+        server: Running fixture server
+    
+    Returns:
+        Mapping of benchmark name to a zero-argument callable (one op)
+    """
+    agent = _agent(server)
+    session, _ = _get_fetch_resources(agent.settings.search_fetch_workers)
+    search_log = _search_log()
+    response_fields = {
+        "topic": "Artificial Intelligence",
+        "news_sources": [f"https://news{index}.example.com/story" for index in range(3)],
+        "linkedin_post": LOREM * 12,
+        "image_suggestion": "Professional image of a modern office",
+        "generated_at": datetime(2025, 11, 5, 10, 30)
+    }
+    
+    return {
+        "yahoo_serp": lambda: agent._search_yahoo("ai news"),
+        "snippet_meta_description": lambda: agent._fetch_snippet(session, f"{server.url}/article/meta"),
+        "snippet_first_paragraph": lambda: agent._fetch_snippet(session, f"{server.url}/article/plain"),
+        "extract_sources_large": lambda: agent._extract_sources(search_log),
+        "response_serialization": lambda: PostGenerationResponse(**response_fields).model_dump_json(),
+    }
+
+
+def measure(func: Callable[[], object], min_time: float, warmup: int = 3) -> Dict[str, float]:
+    """
+    Time a callable and measure the memory one call allocates.
+    
+    Args:
+        func: Operation to benchmark
+        min_time: Minimum seconds to spend timing
+        warmup: Untimed calls before measuring
+    
+    Returns:
+        Dict with ops_per_sec, mean_ms and peak_kib
+    """
+    for _ in range(warmup):
+        func()
+    
+    ops = 0
+    started = time.perf_counter()
+    while True:
+        func()
+        ops += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+    
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        "ops_per_sec": round(ops / elapsed, 2),
+        "mean_ms": round(elapsed / ops * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """
+    Print results against the baseline and list regressions.
+    
+    Args:
+        results: Current measurements
+        baseline: Stored measurements
+        tolerance: Allowed relative slowdown or memory growth (0.25 = 25%)
+    
+    Returns:
+        Names of benchmarks that regressed beyond the tolerance
+    """
+    regressions = []
+    print(f"{'benchmark':<28}{'ops/sec':>12}{'mean ms':>12}{'peak KiB':>12}{'vs baseline':>14}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        change = ""
+        if previous:
+            speed = current["ops_per_sec"] / previous["ops_per_sec"]
+            change = f"{speed:.2f}x"
+            slower = speed < 1 - tolerance
+            heavier = current["peak_kib"] > previous["peak_kib"] * (1 + tolerance)
+            if slower or heavier:
+                regressions.append(name)
+                change += " REGRESSED"
+        print(f"{name:<28}{current['ops_per_sec']:>12}{current['mean_ms']:>12}{current['peak_kib']:>12}{change:>14}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the benchmarks from the command line.
+    
+    Returns:
+        Process exit code (1 if --check found a regression)
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help="Benchmarks to run (default: all)")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to time each benchmark")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression ratio")
+    parser.add_argument("--save-baseline", action="store_true", help="Store results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero on a regression")
+    args = parser.parse_args(argv)
+    
+    # Per-call info logs would dominate the timings
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    
+    with FixtureServer() as server:
+        benchmarks = build_benchmarks(server)
+        unknown = set(args.names) - set(benchmarks)
+        if unknown:
+            parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+        selected = args.names or list(benchmarks)
+        results = {name: measure(benchmarks[name], args.min_time) for name in selected}
+    
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    regressions = compare(results, baseline, args.tolerance)
+    
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps({**baseline, **results}, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline saved to {BASELINE_PATH}")
+    if args.check and regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
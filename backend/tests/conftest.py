@@ -0,0 +1,23 @@
+"""
+Shared test fixtures.
+"""
+import os
+import pytest
+from api.utils.config import get_settings
+
+# api.main builds its middleware and logging on import; keep per-client rate
+# limits (covered in test_admission) from throttling the many requests the API
+# tests make, and keep log files out of the working tree
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("LOG_FILE", "")
+
+
+@pytest.fixture(autouse=True)
+def isolated_model_state(monkeypatch, tmp_path):
+    """Fixture to keep background model probing and on-disk state out of tests."""
+    monkeypatch.setenv("MODEL_PROBE_ENABLED", "false")
+    monkeypatch.setenv("MODEL_STATE_PATH", str(tmp_path / "model_state.json"))
+    monkeypatch.setenv("PAGE_CACHE_PATH", str(tmp_path / "pages.sqlite3"))
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
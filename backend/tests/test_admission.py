@@ -0,0 +1,105 @@
+"""
+Tests for admission control.
+"""
+import asyncio
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from api.utils.admission import (
+    AdmissionMiddleware,
+    AdmissionRejected,
+    ConcurrencyLimiter,
+    RateLimiter,
+    TokenBucket
+)
+from api.utils.metrics import ADMISSION_REJECTIONS
+
+
+def test_token_bucket_reserves_within_wait():
+    """Test a drained bucket admits with a wait only when it fits the budget."""
+    bucket = TokenBucket(rate=10.0, burst=2)
+    
+    assert bucket.reserve(max_wait=0) == (True, 0.0)
+    assert bucket.reserve(max_wait=0) == (True, 0.0)
+    admitted, wait = bucket.reserve(max_wait=0)
+    assert not admitted and 0 < wait <= 0.1
+    admitted, wait = bucket.reserve(max_wait=1.0)
+    assert admitted and 0 < wait <= 0.1
+    # The reservation took the next token, so the one after waits longer
+    admitted, wait = bucket.reserve(max_wait=0)
+    assert not admitted and 0.1 < wait <= 0.2
+
+
+def test_rate_limiter_is_per_client_and_bounded():
+    """Test clients have separate buckets and idle ones are dropped."""
+    limiter = RateLimiter(rate=0.01, burst=1, max_clients=2)
+    
+    assert limiter.reserve("a", 0)[0]
+    assert not limiter.reserve("a", 0)[0]
+    assert limiter.reserve("b", 0)[0]
+    assert limiter.reserve("c", 0)[0]
+    # "a" was least recently used and has been evicted with its empty bucket
+    assert limiter.reserve("a", 0)[0]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter_queues_then_rejects():
+    """Test generations wait for a free slot and are rejected after the timeout."""
+    limiter = ConcurrencyLimiter(limit=1, wait_timeout=0.05, retry_after=3.0)
+    release = asyncio.Event()
+    
+    async def hold():
+        async with limiter.slot():
+            await release.wait()
+    
+    holder = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    
+    rejected_before = ADMISSION_REJECTIONS.value(reason="concurrency")
+    with pytest.raises(AdmissionRejected) as excinfo:
+        async with limiter.slot():
+            pass
+    assert excinfo.value.retry_after == 3.0
+    assert ADMISSION_REJECTIONS.value(reason="concurrency") == rejected_before + 1
+    
+    async def wait_for_slot():
+        async with limiter.slot():
+            return "admitted"
+    
+    waiter = asyncio.ensure_future(wait_for_slot())
+    await asyncio.sleep(0)
+    release.set()
+    assert await waiter == "admitted"
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_admission_middleware_limits_generation_requests():
+    """Test POSTs are limited per client with Retry-After, other requests are not."""
+    async def ok(request):
+        return PlainTextResponse("ok")
+    
+    inner = Starlette(routes=[
+        Route("/api/v1/generate-post", ok, methods=["POST"]),
+        Route("/api/v1/health", ok)
+    ])
+    app = AdmissionMiddleware(
+        inner,
+        RateLimiter(rate=0.01, burst=1),
+        max_wait=0,
+        key_header="X-API-Key"
+    )
+    
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        first = await client.post("/api/v1/generate-post")
+        limited = await client.post("/api/v1/generate-post")
+        other_client = await client.post("/api/v1/generate-post", headers={"X-API-Key": "team-a"})
+        health = await client.get("/api/v1/health")
+    
+    assert first.status_code == 200
+    assert limited.status_code == 429
+    assert int(limited.headers["retry-after"]) >= 1
+    assert other_client.status_code == 200
+    assert health.status_code == 200
@@ -3,7 +3,37 @@ Tests for LangChain agent functionality.
 """
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
-from api.services.langchain_agent import NewsToLinkedInAgent
+from api.services.langchain_agent import (
+    NewsToLinkedInAgent,
+    get_image_cache,
+    get_post_cache,
+    get_search_cache,
+    get_semantic_index
+)
+from api.utils.search_results import SearchLog, SearchResult
+
+
+def _hits(engine: str, *urls: str) -> tuple:
+    """Search results from one engine, one per URL."""
+    return tuple(
+        SearchResult(f"Story {rank}", url, f"Snippet {rank}", engine, rank)
+        for rank, url in enumerate(urls, 1)
+    )
+
+
+def _clear_caches():
+    for cache in (get_search_cache(), get_post_cache(), get_image_cache()):
+        cache.clear()
+    get_semantic_index("search").clear()
+    get_semantic_index("post").clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Fixture to isolate tests from cached search results and posts."""
+    _clear_caches()
+    yield
+    _clear_caches()
 
 
 @pytest.fixture
@@ -14,7 +44,7 @@ def mock_api_key():
 
 @pytest.mark.asyncio
 @patch("api.services.langchain_agent.ChatGoogleGenerativeAI")
-@patch("api.services.langchain_agent.DuckDuckGoSearchRun")
+@patch("api.services.langchain_agent.DDGS")
 async def test_agent_initialization(mock_search, mock_llm, mock_api_key):
     """Test agent initializes correctly."""
     agent = NewsToLinkedInAgent(gemini_api_key=mock_api_key, groq_api_key="")
@@ -27,7 +57,7 @@ async def test_agent_initialization(mock_search, mock_llm, mock_api_key):
 
 @pytest.mark.asyncio
 @patch("api.services.langchain_agent.ChatGoogleGenerativeAI")
-@patch("api.services.langchain_agent.DuckDuckGoSearchRun")
+@patch("api.services.langchain_agent.DDGS")
 async def test_generate_post(mock_search, mock_llm, mock_api_key):
     """Test post generation flow."""
     # Mock the agent executor
@@ -58,18 +88,833 @@ async def test_generate_post(mock_search, mock_llm, mock_api_key):
 
 
 def test_extract_sources():
-    """Test URL extraction from agent results."""
+    """Test sources come from the recorded search results, deduplicated and capped."""
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    search_log = SearchLog()
+    search_log.record("AI news", _hits("google", "https://a.example/1", "https://b.example/2"))
+    search_log.record("AI news today", _hits("yahoo", "https://a.example/1", "", "https://c.example/3", "https://d.example/4"))
+    
+    assert agent._extract_sources(search_log) == ["https://a.example/1", "https://b.example/2", "https://c.example/3"]
+    assert agent._extract_sources(SearchLog()) == []
+
+
+def test_safe_search_fetch_budget():
+    """Test slow result pages are dropped once the fetch budget runs out."""
+    import time
+    from types import SimpleNamespace
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings(search_fetch_budget=0.3)
+    
+    hits = [
+        SimpleNamespace(title="Fast", url="https://fast.example.com"),
+        SimpleNamespace(title="Slow", url="https://slow.example.com"),
+    ]
+    
+    def fake_fetch(session, url):
+        if "slow" in url:
+            time.sleep(2)
+        return f"snippet for {url}"
+    
+    with patch("api.services.langchain_agent.google_search", return_value=hits), \
+            patch.object(agent, "_fetch_snippet", side_effect=fake_fetch):
+        started = time.monotonic()
+        result = agent._safe_search("test query")
+        elapsed = time.monotonic() - started
+    
+    assert elapsed < 1.5
+    assert "Snippet: snippet for https://fast.example.com" in result
+    assert "URL: https://slow.example.com" in result
+    assert "snippet for https://slow.example.com" not in result
+
+
+@pytest.mark.parametrize("mode,expected", [
+    ("fallback", "google results"),
+    ("hedged", "yahoo results"),
+    ("race", "yahoo results"),
+])
+def test_safe_search_modes(mode, expected):
+    """Test hedged and race modes return the first good engine result."""
+    import time
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings(search_mode=mode, search_hedge_delays=[0.1])
+    
+    def slow_google(query):
+        time.sleep(0.5)
+        return _hits("google", "https://google.example/1")
+    
+    with patch.object(agent, "_search_google", side_effect=slow_google), \
+            patch.object(agent, "_search_yahoo", return_value=_hits("yahoo", "https://yahoo.example/1")), \
+            patch.object(agent, "_search_duckduckgo", return_value=None):
+        assert f"URL: https://{expected.split()[0]}.example/1" in agent._safe_search("test query")
+
+
+@pytest.mark.asyncio
+async def test_search_observations_compacted_within_generation():
+    """Test a later search step does not replay results already in the scratchpad."""
+    import asyncio
+    from api.utils.config import Settings
+    from api.utils.observations import NOTHING_NEW
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings(search_mode="fallback", search_engine_order=["yahoo"])
+    agent._executor_pool = {}
+    agent.agent_executor = AsyncMock()
+    results = (
+        SearchResult("Chips", "https://a.example/chips", "Chipmakers report record sales. Read more", "yahoo", 1),
+        SearchResult("Chips", "https://b.example/chips", "Chipmakers report record sales!", "yahoo", 2),
+    )
+    observations = []
+    
+    async def fake_agent(inputs, config=None):
+        # Tool calls run in worker threads, as LangChain runs sync tools
+        for query in ("AI chips", "AI chips news"):
+            observations.append(await asyncio.to_thread(agent._safe_search, query))
+        return {"output": "Post", "intermediate_steps": list(zip(("AI chips", "AI chips news"), observations))}
+    
+    agent.agent_executor.ainvoke.side_effect = fake_agent
+    with patch.object(agent, "_search_yahoo", return_value=results):
+        post = await agent._run_generation("AI Chips", include_image=False)
+    
+    assert observations[0] == (
+        "Title: Chips\nURL: https://a.example/chips\nSnippet: Chipmakers report record sales.\n\n"
+        "Title: Chips\nURL: https://b.example/chips\n"
+    )
+    assert observations[1] == NOTHING_NEW
+    assert post["news_sources"] == ["https://a.example/chips", "https://b.example/chips"]
+
+
+@patch("api.services.langchain_agent.DDGS")
+def test_search_duckduckgo_returns_ranked_results(mock_ddgs):
+    """Test DuckDuckGo hits become ranked results with their URLs."""
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings(search_max_results=2)
+    mock_ddgs.return_value.text.return_value = [
+        {"title": "Fusion milestone", "href": "https://a.example/fusion", "body": "Reactor holds plasma."},
+        {"title": "Fusion funding", "href": "https://b.example/fusion", "body": "Startup raises money."},
+    ]
+    
+    results = agent._search_duckduckgo("fusion")
+    
+    mock_ddgs.return_value.text.assert_called_once_with("fusion", max_results=2)
+    assert results == (
+        SearchResult("Fusion milestone", "https://a.example/fusion", "Reactor holds plasma.", "duckduckgo", 1),
+        SearchResult("Fusion funding", "https://b.example/fusion", "Startup raises money.", "duckduckgo", 2),
+    )
+    mock_ddgs.return_value.text.return_value = []
+    assert agent._search_duckduckgo("fusion") is None
+
+
+def test_safe_search_all_engines_fail():
+    """Test the general knowledge message when every engine fails."""
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings(search_mode="hedged", search_hedge_delays=[0.05])
+    
+    with patch.object(agent, "_search_google", return_value=None), \
+            patch.object(agent, "_search_yahoo", return_value=None), \
+            patch.object(agent, "_search_duckduckgo", return_value=None):
+        result = agent._safe_search("test query")
+    
+    assert result.startswith("Unable to fetch live search results")
+
+
+def test_safe_search_cache_normalizes_query():
+    """Test near-identical queries are served from the search cache."""
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings()
+    
+    fresh = _hits("google", "https://fresh.example/1")
+    with patch.object(agent, "_run_search_engines", return_value=fresh) as mock_run:
+        first = agent._safe_search("AI news")
+        assert "https://fresh.example/1" in first
+        assert agent._safe_search("  ai   NEWS ") == first
+    
+    assert mock_run.call_count == 1
+    stats = get_search_cache().stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    
+    # A reworded query is matched through the semantic index
+    with patch.object(agent, "_run_search_engines", return_value=_hits("google", "https://other.example/1")) as mock_run:
+        assert agent._safe_search("latest news about AI") == first
+    mock_run.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_generate_post_coalesces_and_caches():
+    """Test concurrent requests share one generation and repeats hit the cache."""
+    import asyncio
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings()
+    
+    async def slow_generation(topic, **kwargs):
+        await asyncio.sleep(0.05)
+        return {
+            "linkedin_post": f"Post about {topic}",
+            "news_sources": ["https://example.com"],
+            "image_suggestion": None
+        }
+    
+    with patch.object(agent, "_run_generation", side_effect=slow_generation) as mock_run:
+        first, second = await asyncio.gather(
+            agent.generate_post("Climate Policy"),
+            agent.generate_post("climate  policy")
+        )
+        third = await agent.generate_post("Climate Policy ")
+    
+    assert mock_run.call_count == 1
+    assert first["linkedin_post"] == second["linkedin_post"] == third["linkedin_post"]
+    assert first["cached"] is False
+    assert second["cached"] is False
+    assert third["cached"] is True
+
+
+@pytest.mark.asyncio
+async def test_refresh_post_replaces_cached_post():
+    """Test a pre-warm refresh regenerates a cached topic and counts requests."""
+    from api.services.langchain_agent import get_topic_tracker
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings()
+    get_topic_tracker().clear()
+    posts = iter(["First post", "Refreshed post"])
+    
+    async def fake_generation(topic, **kwargs):
+        return {"linkedin_post": next(posts), "news_sources": [], "image_suggestion": "Image"}
+    
+    with patch.object(agent, "_run_generation", side_effect=fake_generation):
+        await agent.generate_post("Fusion Power")
+        await agent.refresh_post("Fusion Power")
+        served = await agent.generate_post("fusion power")
+    
+    assert served["linkedin_post"] == "Refreshed post"
+    assert served["cached"] is True
+    assert get_topic_tracker().top(1)[0][1] == pytest.approx(2.0, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_generate_post_reuses_similar_topic():
+    """Test a reworded topic is served from the cache and a different one is not."""
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings(semantic_cache_threshold=0.9)
+    generate = AsyncMock(side_effect=lambda topic, **kwargs: {
+        "linkedin_post": f"Post about {topic}", "news_sources": [], "image_suggestion": "Image"
+    })
+    
+    with patch.object(agent, "_run_generation", generate):
+        first = await agent.generate_post("AI in healthcare")
+        similar = await agent.generate_post("Artificial Intelligence in Healthcare")
+        reordered = await agent.generate_post("healthcare AI")
+        different = await agent.generate_post("AI in finance")
+    
+    assert generate.await_count == 2
+    assert similar["linkedin_post"] == reordered["linkedin_post"] == first["linkedin_post"]
+    assert similar["cached"] is True
+    assert different["linkedin_post"] == "Post about AI in finance"
+    assert different["cached"] is False
+    
+    agent.settings = Settings(semantic_cache_enabled=False)
+    with patch.object(agent, "_run_generation", generate):
+        await agent.generate_post("healthcare artificial intelligence")
+    assert generate.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_post_events():
+    """Test streaming emits search, token, image and done events in order."""
+    from api.utils.config import Settings
+    
+    class FakeExecutor:
+        async def ainvoke(self, inputs, config):
+            handler = config["callbacks"][0]
+            await handler.on_tool_start({"name": "WebSearch"}, "AI news", run_id="search-1")
+            observation = agent._safe_search("AI news")
+            await handler.on_tool_end(observation, run_id="search-1")
+            await handler.on_chat_model_start({}, [])
+            for token in ["Thought: done\nFinal", " Answer: Hello", " world"]:
+                await handler.on_llm_new_token(token)
+            return {
+                "output": "Hello world",
+                "intermediate_steps": [("action", "URL: https://example.com/a")]
+            }
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings()
+    agent._executor_pool = {}
+    agent.stream_executor = FakeExecutor()
+    
+    with patch.object(agent, "_suggest_image", AsyncMock(return_value="Office photo")), \
+            patch.object(agent, "_run_search_engines", return_value=_hits("google", "https://example.com/a")):
+        events = [event async for event in agent.stream_post("AI news")]
+    
+    names = [event["event"] for event in events]
+    assert names == [
+        "search_started", "search_finished", "token", "token",
+        "sources", "image_suggestion", "done"
+    ]
+    assert "".join(e["data"]["text"] for e in events if e["event"] == "token") == "Hello world"
+    assert events[1]["data"]["sources"] == ["https://example.com/a"]
+    assert events[-1]["data"]["news_sources"] == ["https://example.com/a"]
+    assert events[-1]["data"]["cached"] is False
+    
+    # Second request is served from the post cache
+    cached_events = [event async for event in agent.stream_post("ai news")]
+    assert cached_events[-1]["data"]["cached"] is True
+
+
+@pytest.mark.asyncio
+async def test_generate_posts_bounded_concurrency():
+    """Test batches respect the concurrency cap, dedupe topics and isolate errors."""
+    import asyncio
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    running = 0
+    peak = 0
+    calls = []
+    
+    async def fake_generate(topic, image_mode="inline", generation_mode=None, deadline=None):
+        nonlocal running, peak
+        calls.append(topic)
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        if topic == "Broken Topic":
+            raise RuntimeError("generation failed")
+        return {"linkedin_post": f"Post about {topic}", "news_sources": [], "image_suggestion": None}
+    
+    topics = ["Topic One", "Topic Two", "topic one", "Topic Three", "Broken Topic"]
+    with patch.object(agent, "generate_post", side_effect=fake_generate):
+        items = [item async for item in agent.generate_posts(topics, concurrency=2)]
+    
+    assert peak <= 2
+    assert len(calls) == 4
+    assert sorted(item["index"] for item in items) == [0, 1, 2, 3, 4]
+    by_index = {item["index"]: item for item in items}
+    assert by_index[2]["result"]["linkedin_post"] == "Post about Topic One"
+    assert isinstance(by_index[4]["error"], RuntimeError)
+
+
+
+@pytest.mark.asyncio
+async def test_generate_posts_starts_deadline_per_topic():
+    """Test topics queued behind others get their full deadline, not what is left of the batch's."""
+    import asyncio
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    remaining = []
+    
+    async def fake_generate(topic, image_mode="inline", generation_mode=None, deadline=None):
+        remaining.append(deadline.remaining())
+        await asyncio.sleep(0.1)
+        return {"linkedin_post": topic, "news_sources": [], "image_suggestion": None}
+    
+    with patch.object(agent, "generate_post", side_effect=fake_generate):
+        items = [item async for item in agent.generate_posts(
+            ["Topic One", "Topic Two", "Topic Three"], concurrency=1, topic_deadline=0.25
+        )]
+    
+    assert all(item["error"] is None for item in items)
+    assert min(remaining) > 0.2
+
+def test_fetch_snippet_total_time_cap():
+    """Test a slow-drip page is abandoned once the total fetch timeout elapses."""
+    import time
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings(search_fetch_timeout=0.2)
+    
+    def slow_drip(chunk_size):
+        while True:
+            time.sleep(0.05)
+            yield b"<div>drip</div>"
+    
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.headers = {"Content-Type": "text/html"}
+    response.iter_content.side_effect = slow_drip
+    session = MagicMock()
+    session.get.return_value = response
+    
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        agent._fetch_snippet(session, "https://slow.example.com")
+    assert time.monotonic() - started < 1
+
+
+def _streamed_page(chunks, content_type="text/html; charset=utf-8"):
+    """Build a mock session serving a page in chunks, recording how many were read."""
+    read = []
+    
+    def iter_content(chunk_size):
+        for chunk in chunks:
+            read.append(chunk)
+            yield chunk
+    
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.headers = {"Content-Type": content_type}
+    response.encoding = "utf-8"
+    response.iter_content.side_effect = iter_content
+    session = MagicMock()
+    session.get.return_value = response
+    return session, read
+
+
+@pytest.mark.parametrize("chunks,expected,chunks_read", [
+    ([b'<html><head><meta name="description" content="Head summary"></head>', b"<body>" * 1000], "Head summary", 1),
+    ([b"<html><head></head><body><p>First para", b"graph</p>", b"<p>Second</p>" * 1000], "First paragraph", 2),
+])
+def test_fetch_snippet_stops_once_snippet_seen(chunks, expected, chunks_read):
+    """Test the fetch stops reading as soon as the snippet is in the prefix."""
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings()
+    session, read = _streamed_page(chunks)
+    
+    assert agent._fetch_snippet(session, "https://news.example.com") == expected
+    assert len(read) == chunks_read
+
+
+def test_fetch_snippet_byte_cap_and_content_type():
+    """Test the fetch reads at most the byte cap and skips non-HTML bodies."""
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings(search_fetch_max_bytes=1024)
+    
+    session, read = _streamed_page([b"<html><body><div>" + b"x" * 512] * 100)
+    assert agent._fetch_snippet(session, "https://big.example.com") == ""
+    assert len(read) == 2
+    
+    session, read = _streamed_page([b"%PDF-1.7"], content_type="application/pdf")
+    assert agent._fetch_snippet(session, "https://example.com/report.pdf") == ""
+    assert read == []
+
+
+def test_fetch_snippet_uses_page_cache():
+    """Test fresh pages skip the network and stale pages revalidate with a 304."""
+    from api.services.langchain_agent import get_page_cache
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings()
+    session, _ = _streamed_page([b'<head><meta name="description" content="Fresh"></head>'])
+    session.get.return_value.status_code = 200
+    session.get.return_value.headers["ETag"] = '"v1"'
+    
+    assert agent._fetch_snippet(session, "https://news.example.com") == "Fresh"
+    assert agent._fetch_snippet(session, "https://news.example.com") == "Fresh"
+    assert session.get.call_count == 1
+    
+    agent.settings = Settings(page_cache_fresh_seconds=0)
+    session.get.return_value.status_code = 304
+    
+    assert agent._fetch_snippet(session, "https://news.example.com") == "Fresh"
+    assert session.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert get_page_cache(agent.settings).get("https://news.example.com")["snippet"] == "Fresh"
+
+
+def test_search_engine_order_rejects_unknown_engine():
+    """Test a misspelt engine name fails validation instead of being dropped."""
+    from pydantic import ValidationError
+    from api.utils.config import Settings
+    
+    with pytest.raises(ValidationError):
+        Settings(search_engine_order=["gogle"])
+
+
+@pytest.mark.asyncio
+async def test_stream_post_resets_after_parse_error():
+    """Test parse-error retries emit reset and are not reported as searches."""
+    from api.utils.config import Settings
+    
+    class FakeExecutor:
+        async def ainvoke(self, inputs, config):
+            handler = config["callbacks"][0]
+            await handler.on_chat_model_start({}, [])
+            for token in ["Final Answer: Draft", " post\nAction: WebSearch"]:
+                await handler.on_llm_new_token(token)
+            # Unparseable step: AgentExecutor runs its _Exception tool
+            await handler.on_tool_start({"name": "_Exception"}, "Invalid Format", run_id="exc-1")
+            await handler.on_tool_end("Invalid Format", run_id="exc-1")
+            await handler.on_chat_model_start({}, [])
+            for token in ["Final Answer: Clean", " post"]:
+                await handler.on_llm_new_token(token)
+            return {"output": "Clean post", "intermediate_steps": []}
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings()
+    agent._executor_pool = {}
+    agent.stream_executor = FakeExecutor()
+    
+    with patch.object(agent, "_suggest_image", AsyncMock(return_value=None)):
+        events = [event async for event in agent.stream_post("Retry Topic")]
+    
+    names = [event["event"] for event in events]
+    assert "search_started" not in names
+    assert "search_finished" not in names
+    reset_at = names.index("reset")
+    streamed = "".join(e["data"]["text"] for e in events[reset_at:] if e["event"] == "token")
+    assert streamed == events[-1]["data"]["linkedin_post"] == "Clean post"
+
+
+@pytest.mark.asyncio
+async def test_stream_post_joins_in_flight_generation():
+    """Test a stream and a plain request for one topic share a generation."""
+    import asyncio
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings()
+    agent.stream_executor = MagicMock()
+    
+    async def slow_generation(topic, **kwargs):
+        await asyncio.sleep(0.05)
+        return {"linkedin_post": "Shared post", "news_sources": [], "image_suggestion": None}
+    
+    async def collect():
+        return [event async for event in agent.stream_post("Hot Topic")]
+    
+    with patch.object(agent, "_run_generation", side_effect=slow_generation) as mock_run:
+        plain, events = await asyncio.gather(agent.generate_post("Hot Topic"), collect())
+    
+    assert mock_run.call_count == 1
+    assert plain["linkedin_post"] == events[-1]["data"]["linkedin_post"] == "Shared post"
+
+
+def test_safe_search_rechecks_cache_inside_flight():
+    """Test a search that missed just before a leader finished reuses its result."""
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings()
+    cache = get_search_cache()
+    
+    def racing_get(key, default=None):
+        # The lookup misses; the leader stores its result right after
+        cache.set(key, _hits("google", "https://leader.example/1"))
+        return default
+    
+    with patch.object(cache, "get", side_effect=racing_get), \
+            patch.object(agent, "_run_search_engines") as mock_run:
+        assert "https://leader.example/1" in agent._safe_search("race query")
+    
+    mock_run.assert_not_called()
+
+
+@patch("api.services.langchain_agent.ChatGoogleGenerativeAI")
+def test_agent_init_does_not_call_llm(mock_llm, mock_api_key):
+    """Test startup uses the configured model without any blocking LLM call."""
+    agent = NewsToLinkedInAgent(gemini_api_key=mock_api_key, groq_api_key="")
+    
+    assert agent.provider == "gemini"
+    assert agent.model == agent.settings.gemini_model
+    mock_llm.return_value.invoke.assert_not_called()
+
+
+@patch("api.services.langchain_agent.ChatGoogleGenerativeAI")
+def test_agent_init_uses_remembered_model(mock_llm, mock_api_key, tmp_path):
+    """Test a persisted known-good model is reused and probing is skipped."""
+    from api.utils.config import Settings
+    from api.utils.model_state import save_model_state
+    
+    state_path = tmp_path / "state.json"
+    save_model_state(state_path, "gemini", "gemini-pro")
+    settings = Settings(model_state_path=str(state_path), model_probe_enabled=True)
+    
+    agent = NewsToLinkedInAgent(gemini_api_key=mock_api_key, groq_api_key="", settings=settings)
+    
+    assert agent.model == "gemini-pro"
+    assert agent._probe_thread is None
+    mock_llm.return_value.invoke.assert_not_called()
+
+
+@patch("api.services.langchain_agent.ChatGoogleGenerativeAI")
+def test_probe_models_switches_and_persists(mock_llm, mock_api_key, tmp_path):
+    """Test the probe moves to the first working model and remembers it."""
+    from api.utils.config import Settings
+    from api.utils.model_state import load_model_state
+    
+    state_path = tmp_path / "state.json"
+    settings = Settings(model_state_path=str(state_path), gemini_model="gemini-broken")
+    
+    def build(model, **kwargs):
+        llm = MagicMock()
+        if model in ("gemini-broken", "gemini-2.0-flash-exp"):
+            llm.invoke.side_effect = RuntimeError("model not found")
+        return llm
+    
+    mock_llm.side_effect = build
+    agent = NewsToLinkedInAgent(gemini_api_key=mock_api_key, groq_api_key="", settings=settings)
+    
+    assert agent._probe_models() == ("gemini", "gemini-1.5-flash")
+    assert agent.model == "gemini-1.5-flash"
+    assert load_model_state(state_path, max_age=60) == {"provider": "gemini", "model": "gemini-1.5-flash"}
+
+
+@pytest.mark.asyncio
+@patch("api.services.langchain_agent.ChatGoogleGenerativeAI")
+async def test_warm_pool_routes_to_first_healthy_model(mock_llm, mock_api_key):
+    """Test the pool keeps models that answer the warm-up and skips open breakers."""
+    from api.utils.config import Settings
+    
+    def build(model, **kwargs):
+        llm = MagicMock()
+        llm.ainvoke = AsyncMock(side_effect=RuntimeError("model not found") if model == "gemini-broken" else None)
+        return llm
+    
+    mock_llm.side_effect = build
+    settings = Settings(gemini_model="gemini-broken", llm_breaker_min_calls=1, agent_pool_enabled=True)
+    agent = NewsToLinkedInAgent(gemini_api_key=mock_api_key, groq_api_key="", settings=settings)
+    assert agent._pick_executor() is agent.agent_executor
+    
+    pooled = await agent.warm_pool()
+    
+    broken, first, second = agent.llm.targets[:3]
+    assert broken.name not in pooled
+    assert pooled[:2] == [first.name, second.name]
+    # The failed warm-up already opened the broken model's breaker
+    assert agent._pick_executor() is agent._executor_pool[first.name][0]
+    assert agent._pick_executor(stream=True) is agent._executor_pool[first.name][1]
+    
+    first.breaker.record(False, 0.1)
+    assert agent._pick_executor() is agent._executor_pool[second.name][0]
+    assert agent.llm_status()["pool"] == pooled
+
+
+@pytest.mark.asyncio
+async def test_run_generation_overlaps_image_suggestion():
+    """Test the image suggestion runs alongside the agent, not after it."""
+    import asyncio
+    import time
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings()
+    agent._executor_pool = {}
+    
+    async def slow_agent(inputs, config=None):
+        await asyncio.sleep(0.2)
+        return {"output": "Post body", "intermediate_steps": []}
+    
+    async def slow_image(topic):
+        await asyncio.sleep(0.2)
+        return "Team at a whiteboard"
+    
+    agent.agent_executor = MagicMock()
+    agent.agent_executor.ainvoke = AsyncMock(side_effect=slow_agent)
+    
+    started = time.monotonic()
+    with patch.object(agent, "_suggest_image", side_effect=slow_image):
+        post = await agent._run_generation("Remote Work")
+    
+    assert time.monotonic() - started < 0.35
+    assert post["image_suggestion"] == "Team at a whiteboard"
+
+
+@pytest.mark.asyncio
+async def test_image_suggestion_timeout_does_not_fail_post():
+    """Test a slow image suggestion is dropped without failing the post."""
+    import asyncio
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings(image_suggestion_timeout=0.05)
+    agent._executor_pool = {}
+    agent.agent_executor = MagicMock()
+    agent.agent_executor.ainvoke = AsyncMock(return_value={"output": "Post body", "intermediate_steps": []})
+    
+    async def hanging_image(topic):
+        await asyncio.sleep(5)
+    
+    with patch.object(agent, "_suggest_image", side_effect=hanging_image):
+        post = await agent._run_generation("Remote Work")
+    
+    assert post["linkedin_post"] == "Post body"
+    assert post["image_suggestion"] is None
+
+
+@pytest.mark.asyncio
+async def test_generate_post_image_modes():
+    """Test skip leaves the image out and defer fills it in the background."""
+    import asyncio
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings()
+    agent._executor_pool = {}
+    agent.agent_executor = MagicMock()
+    agent.agent_executor.ainvoke = AsyncMock(return_value={"output": "Post body", "intermediate_steps": []})
+    
+    with patch.object(agent, "_suggest_image", AsyncMock(return_value="City skyline")) as mock_image:
+        skipped = await agent.generate_post("Urban Planning", image_mode="skip")
+        assert skipped["image_suggestion"] is None
+        assert mock_image.call_count == 0
+        
+        deferred = await agent.generate_post("Urban Planning", image_mode="defer")
+        assert deferred["cached"] is True
+        assert deferred["image_pending"] is True
+        assert deferred["image_suggestion"] is None
+        
+        await asyncio.sleep(0)
+        assert await agent.suggest_image("urban planning") == "City skyline"
+        
+        inline = await agent.generate_post("Urban Planning")
+    
+    assert inline["image_suggestion"] == "City skyline"
+    assert inline["image_pending"] is False
+    assert mock_image.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_direct_mode_searches_in_parallel_and_calls_llm_once():
+    """Test the direct pipeline runs query variants together and one LLM call."""
+    import asyncio
+    import time
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings(direct_search_queries=["{topic} latest news", "{topic} analysis"])
+    agent.agent_executor = MagicMock()
+    agent.llm = MagicMock()
+    agent.llm.ainvoke = AsyncMock(return_value=MagicMock(content="Final Answer: Direct post"))
+    
+    def slow_search(query):
+        time.sleep(0.2)
+        return _hits("google", f"https://example.com/{query.split()[-1]}")
+    
+    from langchain.tools import Tool
+    agent.tools = [Tool(name="WebSearch", func=agent._safe_search, description="search")]
+    
+    started = time.monotonic()
+    with patch.object(agent, "_run_search_engines", side_effect=slow_search):
+        post = await agent._run_generation("Fusion Power", include_image=False, generation_mode="direct")
+    
+    assert time.monotonic() - started < 0.35
+    assert post["linkedin_post"] == "Direct post"
+    # Recorded in the order the parallel searches finished
+    assert sorted(post["news_sources"]) == ["https://example.com/analysis", "https://example.com/news"]
+    agent.llm.ainvoke.assert_awaited_once()
+    assert "Fusion Power analysis" in agent.llm.ainvoke.await_args.args[0]
+    agent.agent_executor.ainvoke.assert_not_called()
+
+
+def test_search_stops_at_request_deadline():
+    """Test fallback mode tries no further engine once the search's deadline share is spent."""
+    import time
+    from api.utils.config import Settings
+    from api.utils.deadline import Deadline, deadline_scope
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings(deadline_search_share=0.5)
+    
+    def slow_google(query):
+        time.sleep(0.2)
+        return None
+    
+    with patch.object(agent, "_search_google", side_effect=slow_google), \
+            patch.object(agent, "_search_yahoo", return_value=_hits("yahoo", "https://yahoo.example/1")) as yahoo, \
+            deadline_scope(Deadline(0.3)):
+        result = agent._safe_search("test query")
+    
+    assert yahoo.call_count == 0
+    assert result.startswith("Unable to fetch live search results")
+
+
+@pytest.mark.asyncio
+async def test_agent_writes_post_from_searches_at_deadline():
+    """Test an agent still running near the deadline is cut short and the post written from its searches."""
+    import asyncio
+    from api.utils.config import Settings
+    from api.utils.deadline import Deadline
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings(deadline_answer_reserve=0.2)
+    agent._executor_pool = {}
+    agent.llm = MagicMock()
+    agent.llm.ainvoke = AsyncMock(return_value=MagicMock(content="Final Answer: Post from searches"))
+    cancelled = asyncio.Event()
+    
+    async def slow_agent(inputs, config=None):
+        agent._safe_search("fusion power news")
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    agent.agent_executor = MagicMock()
+    agent.agent_executor.ainvoke = AsyncMock(side_effect=slow_agent)
+    
+    with patch.object(agent, "_run_search_engines", return_value=_hits("google", "https://example.com/fusion")):
+        post = await agent._run_generation("Fusion Power", include_image=False, deadline=Deadline(0.3))
+    
+    assert post["linkedin_post"] == "Post from searches"
+    assert post["partial"] is True
+    assert post["news_sources"] == ["https://example.com/fusion"]
+    assert cancelled.is_set()
+    assert "https://example.com/fusion" in agent.llm.ainvoke.await_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_partial_post_is_not_cached():
+    """Test a post cut short by the deadline is returned but not served to later requests."""
+    from api.utils.config import Settings
+    
+    agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings()
+    posts = [
+        {"linkedin_post": "Partial post", "news_sources": [], "image_suggestion": None, "partial": True},
+        {"linkedin_post": "Full post", "news_sources": [], "image_suggestion": None, "partial": False},
+    ]
+    
+    with patch.object(agent, "_run_generation", AsyncMock(side_effect=posts)) as run:
+        first = await agent.generate_post("Quantum Computing", image_mode="skip")
+        second = await agent.generate_post("Quantum Computing", image_mode="skip")
+        third = await agent.generate_post("Quantum Computing", image_mode="skip")
+    
+    assert first["linkedin_post"] == "Partial post"
+    assert second["linkedin_post"] == "Full post"
+    assert third["cached"] is True
+    assert run.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_deferred_image_ignores_request_deadline():
+    """Test a deferred suggestion keeps running after the request's deadline has passed."""
+    import asyncio
+    from api.utils.config import Settings
+    from api.utils.deadline import Deadline
+    
     agent = NewsToLinkedInAgent.__new__(NewsToLinkedInAgent)
+    agent.settings = Settings()
+    post = {"linkedin_post": "Post body", "news_sources": [], "image_suggestion": None, "partial": False}
     
-    test_result = {
-        "output": "Check this link: https://example.com/article",
-        "intermediate_steps": [
-            ("action", "Found news at https://news.com/story")
-        ]
-    }
+    async def slow_image(topic):
+        await asyncio.sleep(0.1)
+        return "Solar farm at dusk"
     
-    sources = agent._extract_sources(test_result)
+    with patch.object(agent, "_run_generation", AsyncMock(return_value=post)), \
+            patch.object(agent, "_suggest_image", side_effect=slow_image):
+        result = await agent.generate_post("Solar Power", image_mode="defer", deadline=Deadline(0.02))
+        await asyncio.sleep(0.2)
     
-    assert isinstance(sources, list)
-    # Should find at least one URL
-    assert len(sources) >= 0
+    assert result["image_pending"] is True
+    assert get_image_cache().get("solar power") == "Solar farm at dusk"
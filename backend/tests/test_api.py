@@ -1,10 +1,13 @@
 """
 Tests for FastAPI endpoints.
 """
+import json
+import threading
+import time
 import pytest
 from httpx import AsyncClient, ASGITransport
 from api.main import app
-from unittest.mock import AsyncMock, patch
+from unittest.mock import ANY, AsyncMock, patch
 
 
 @pytest.mark.asyncio
@@ -32,6 +35,19 @@ async def test_health_check():
     assert "timestamp" in data
 
 
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    """Test /metrics exposes request counts by route template."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/api/v1/health")
+        response = await client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/api/v1/health",status="200"}' in response.text
+    assert "# TYPE post_stage_duration_seconds histogram" in response.text
+
+
 @pytest.mark.asyncio
 async def test_generate_post_validation():
     """Test post generation with invalid input."""
@@ -73,11 +89,305 @@ async def test_generate_post_success():
         assert "linkedin_post" in data
         assert "news_sources" in data
         assert "generated_at" in data
+        assert data["cached"] is False
     finally:
         # Clean up dependency override
         app.dependency_overrides.clear()
 
 
+@pytest.mark.asyncio
+async def test_generate_post_busy_returns_429():
+    """Test a generation that cannot get a slot is refused with Retry-After."""
+    from api.routes.post_generator import get_agent
+    from api.utils.admission import AdmissionRejected
+    
+    mock_agent = AsyncMock()
+    mock_agent.generate_post.side_effect = AdmissionRejected("Server busy", retry_after=2.5)
+    app.dependency_overrides[get_agent] = lambda: mock_agent
+    
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/api/v1/generate-post", json={"topic": "Artificial Intelligence"})
+        
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "3"
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_generate_post_deadline():
+    """Test the deadline header shortens the deadline and a missed deadline returns 504."""
+    from api.routes.post_generator import get_agent
+    from api.utils.deadline import DeadlineExceeded
+    
+    mock_agent = AsyncMock()
+    mock_agent.generate_post.side_effect = DeadlineExceeded("too slow")
+    app.dependency_overrides[get_agent] = lambda: mock_agent
+    
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/generate-post",
+                json={"topic": "Artificial Intelligence"},
+                headers={"X-Request-Deadline": "5"}
+            )
+            invalid = await client.post(
+                "/api/v1/generate-post",
+                json={"topic": "Artificial Intelligence"},
+                headers={"X-Request-Deadline": "soon"}
+            )
+        
+        assert response.status_code == 504
+        deadline = mock_agent.generate_post.await_args.kwargs["deadline"]
+        assert deadline.seconds == 5
+        assert invalid.status_code == 400
+        assert mock_agent.generate_post.await_count == 1
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_generate_post_reports_cache_hit():
+    """Test the response reports when a post came from the result cache."""
+    mock_agent = AsyncMock()
+    mock_agent.generate_post.return_value = {
+        "linkedin_post": "Cached LinkedIn post content",
+        "news_sources": ["https://example.com/news"],
+        "image_suggestion": None,
+        "cached": True
+    }
+    
+    from api.routes.post_generator import get_agent
+    app.dependency_overrides[get_agent] = lambda: mock_agent
+    
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/generate-post",
+                json={"topic": "Artificial Intelligence"}
+            )
+        
+        assert response.status_code == 200
+        assert response.json()["cached"] is True
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_generate_post_stream():
+    """Test the SSE endpoint relays agent events."""
+    async def fake_stream(topic, image_mode="inline", generation_mode=None, deadline=None):
+        yield {"event": "search_started", "data": {"query": topic}}
+        yield {"event": "token", "data": {"text": "Streamed post"}}
+        yield {"event": "done", "data": {
+            "linkedin_post": "Streamed post",
+            "news_sources": [],
+            "image_suggestion": None,
+            "cached": False
+        }}
+    
+    mock_agent = AsyncMock()
+    mock_agent.stream_post = fake_stream
+    
+    from api.routes.post_generator import get_agent
+    app.dependency_overrides[get_agent] = lambda: mock_agent
+    
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/generate-post/stream",
+                json={"topic": "Artificial Intelligence"}
+            )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = response.text
+        assert "event: search_started" in body
+        assert 'data: {"text": "Streamed post"}' in body
+        assert body.index("event: token") < body.index("event: done")
+        assert '"topic": "Artificial Intelligence"' in body
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_generate_post_stream_error_event():
+    """Test a failing generation ends the stream with an error event."""
+    async def failing_stream(topic, image_mode="inline", generation_mode=None, deadline=None):
+        yield {"event": "search_started", "data": {"query": topic}}
+        raise RuntimeError("provider down")
+    
+    mock_agent = AsyncMock()
+    mock_agent.stream_post = failing_stream
+    
+    from api.routes.post_generator import get_agent
+    app.dependency_overrides[get_agent] = lambda: mock_agent
+    
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/generate-post/stream",
+                json={"topic": "Artificial Intelligence"}
+            )
+        
+        assert response.status_code == 200
+        assert "event: error" in response.text
+        assert "provider down" in response.text
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_generate_posts_batch():
+    """Test batch generation returns per-topic results in request order."""
+    async def fake_batch(topics, concurrency, image_modes=None, generation_modes=None, topic_deadline=None):
+        yield {"index": 1, "topic": topics[1], "result": None, "error": RuntimeError("quota exceeded")}
+        yield {"index": 0, "topic": topics[0], "result": {
+            "linkedin_post": "Batch post",
+            "news_sources": ["https://example.com/news"],
+            "image_suggestion": None
+        }, "error": None}
+    
+    mock_agent = AsyncMock()
+    mock_agent.generate_posts = fake_batch
+    
+    from api.routes.post_generator import get_agent
+    app.dependency_overrides[get_agent] = lambda: mock_agent
+    
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/generate-posts",
+                json={"topics": [{"topic": "Artificial Intelligence"}, {"topic": "Climate Policy"}]}
+            )
+            streamed = await client.post(
+                "/api/v1/generate-posts?stream=true",
+                json={"topics": [{"topic": "Artificial Intelligence"}, {"topic": "Climate Policy"}]}
+            )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["succeeded"] == 1
+        assert data["failed"] == 1
+        assert [result["index"] for result in data["results"]] == [0, 1]
+        assert data["results"][0]["post"]["linkedin_post"] == "Batch post"
+        assert "quota exceeded" in data["results"][1]["error"]
+        
+        assert streamed.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in streamed.text.splitlines()]
+        assert [line["status"] for line in lines] == ["error", "ok"]
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_generate_posts_validation():
+    """Test batch generation rejects an empty topic list."""
+    from api.routes.post_generator import get_agent
+    app.dependency_overrides[get_agent] = lambda: AsyncMock()
+    
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/api/v1/generate-posts", json={"topics": []})
+        
+        assert response.status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_deferred_image_suggestion():
+    """Test a deferred post reports a pending image that can be fetched later."""
+    mock_agent = AsyncMock()
+    mock_agent.generate_post.return_value = {
+        "linkedin_post": "LinkedIn post content",
+        "news_sources": [],
+        "image_suggestion": None,
+        "cached": False,
+        "image_pending": True
+    }
+    mock_agent.suggest_image.return_value = "Wind turbines at sunrise"
+    
+    from api.routes.post_generator import get_agent
+    app.dependency_overrides[get_agent] = lambda: mock_agent
+    
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/generate-post",
+                json={"topic": "Renewable Energy", "image_mode": "defer"}
+            )
+            image = await client.get("/api/v1/image-suggestion", params={"topic": "Renewable Energy"})
+        
+        assert response.status_code == 200
+        assert response.json()["image_pending"] is True
+        mock_agent.generate_post.assert_awaited_once_with("Renewable Energy", "defer", None, deadline=ANY)
+        assert image.status_code == 200
+        assert image.json() == {
+            "topic": "Renewable Energy",
+            "status": "ready",
+            "image_suggestion": "Wind turbines at sunrise"
+        }
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_generation_job_lifecycle():
+    """Test a job is accepted at once, then polled through to its result."""
+    import asyncio
+    from api.routes.post_generator import get_job_manager
+    from api.services.jobs import JobManager
+    from api.utils.job_store import MemoryJobStore
+    
+    release = asyncio.Event()
+    
+    async def fake_run(params):
+        await release.wait()
+        return {
+            "topic": params["topic"],
+            "news_sources": [],
+            "linkedin_post": "Queued post",
+            "image_suggestion": None,
+            "generated_at": "2025-11-05T10:30:00",
+            "cached": False,
+            "image_pending": False
+        }
+    
+    manager = JobManager(fake_run, MemoryJobStore(), workers=1, queue_depth=1, ttl=60.0)
+    app.dependency_overrides[get_job_manager] = lambda: manager
+    
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            submitted = await client.post("/api/v1/jobs", json={"topic": "Artificial Intelligence"})
+            await asyncio.sleep(0)  # Worker picks the first job up
+            queued = await client.post("/api/v1/jobs", json={"topic": "Climate Policy"})
+            rejected = await client.post("/api/v1/jobs", json={"topic": "Renewable Energy"})
+            running = await client.get(submitted.json()["status_url"])
+            
+            release.set()
+            for _ in range(50):
+                finished = await client.get(submitted.json()["status_url"])
+                if finished.json()["status"] == "succeeded":
+                    break
+                await asyncio.sleep(0.01)
+            missing = await client.get("/api/v1/jobs/unknown")
+        
+        assert submitted.status_code == 202
+        assert submitted.json()["status"] == "queued"
+        assert queued.status_code == 202
+        assert rejected.status_code == 429
+        assert rejected.headers["retry-after"] == "5"
+        assert running.json()["status"] == "running"
+        assert finished.json()["result"]["linkedin_post"] == "Queued post"
+        assert finished.json()["finished_at"] is not None
+        assert missing.status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+        await manager.shutdown()
+
+
 @pytest.mark.asyncio
 @pytest.mark.integration  # Mark as integration test
 async def test_gemini_api_key_validation():
@@ -131,7 +441,7 @@ async def test_gemini_api_key_validation():
         assert len(response.text) > 0
         print(f"\n✅ API Key validated! Model: {model_name}")
         print(f"Response: {response.text}")
-        
+    
     except Exception as e:
         pytest.fail(f"Gemini API key validation failed: {str(e)}")
 
@@ -177,3 +487,61 @@ async def test_generate_post_real_api():
     assert "generated_at" in data
     print(f"\n✅ Post generated successfully!")
     print(f"Post preview: {data['linkedin_post'][:200]}...")
+
+
+def test_get_agent_builds_once_under_concurrency():
+    """Test concurrent first requests share one agent build."""
+    from api.routes import post_generator
+    from api.utils.config import get_settings
+    
+    def slow_build(**kwargs):
+        time.sleep(0.05)
+        return object()
+    
+    with patch.object(post_generator, "_agent_instance", None), \
+            patch.object(post_generator, "_agent_ready", threading.Event()), \
+            patch.object(post_generator, "NewsToLinkedInAgent", side_effect=slow_build) as build:
+        agents = []
+        threads = [
+            threading.Thread(target=lambda: agents.append(post_generator.get_agent(get_settings())))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert build.call_count == 1
+        assert len(set(map(id, agents))) == 1
+        assert post_generator._agent_ready.is_set()
+
+
+@pytest.mark.asyncio
+async def test_readiness_waits_for_agent_pool():
+    """Test /ready is 503 until the startup build and pool warm-up finish."""
+    import asyncio
+    from api.routes import post_generator
+    from api.utils.config import Settings
+    
+    warmed = asyncio.Event()
+    mock_agent = AsyncMock()
+    mock_agent.llm_status = lambda: {"provider": "gemini", "pool": ["gemini:gemini-1.5-flash"]}
+    mock_agent.warm_pool.side_effect = warmed.wait
+    
+    with patch.object(post_generator, "_agent_instance", None), \
+            patch.object(post_generator, "_agent_ready", threading.Event()), \
+            patch.object(post_generator, "NewsToLinkedInAgent", return_value=mock_agent):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.get("/api/v1/ready")).status_code == 503
+            
+            await post_generator.init_agent(Settings(agent_pool_enabled=True))
+            assert (await client.get("/api/v1/ready")).status_code == 503
+            
+            warmed.set()
+            await post_generator._pool_warmup
+            response = await client.get("/api/v1/ready")
+        
+        await post_generator.stop_pool_warmup()
+    
+    assert response.status_code == 200
+    assert response.json()["llm"]["pool"] == ["gemini:gemini-1.5-flash"]
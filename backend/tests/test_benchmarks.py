@@ -0,0 +1,17 @@
+"""
+Smoke test keeping the offline benchmarks runnable.
+"""
+from benchmarks.fixtures import FixtureServer
+from benchmarks.run import build_benchmarks
+
+
+def test_benchmarks_run_offline():
+    """Test every benchmark op succeeds against the local fixture server."""
+    with FixtureServer() as server:
+        benchmarks = build_benchmarks(server)
+        
+        assert benchmarks["yahoo_serp"]()[0].url == "https://news0.example.com/story"
+        assert benchmarks["snippet_meta_description"]() == "Regulators publish new AI guidance for firms."
+        assert benchmarks["snippet_first_paragraph"]().startswith("Regulators in London")
+        assert len(benchmarks["extract_sources_large"]()) == 3
+        assert '"topic":"Artificial Intelligence"' in benchmarks["response_serialization"]()
@@ -0,0 +1,108 @@
+"""
+Tests for in-process caching utilities.
+"""
+import asyncio
+import time
+import pytest
+from api.utils.cache import BlockingSingleFlight, SingleFlight, TTLCache, normalize_key
+
+
+def test_normalize_key():
+    """Test whitespace and case are normalized."""
+    assert normalize_key("  AI   News\n") == "ai news"
+    assert normalize_key("AI news") == normalize_key("ai  news ")
+
+
+def test_ttl_cache_hit_and_miss():
+    """Test hit/miss counters."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    
+    assert cache.get("missing") is None
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_ttl_cache_expiry():
+    """Test entries expire after their TTL."""
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set("key", "value")
+    time.sleep(0.1)
+    
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_lru_eviction():
+    """Test least recently used entries are evicted first."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+    
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_result():
+    """Test concurrent callers for one key share a single execution."""
+    flights = SingleFlight()
+    calls = []
+    
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+    
+    results = await asyncio.gather(*(flights.do("key", work) for _ in range(3)))
+    
+    assert len(calls) == 1
+    assert [result for result, _ in results] == ["done"] * 3
+    assert [shared for _, shared in results] == [False, True, True]
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_propagates_errors():
+    """Test followers receive the leader's exception."""
+    flights = SingleFlight()
+    
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+    
+    results = await asyncio.gather(
+        flights.do("key", failing),
+        flights.do("key", failing),
+        return_exceptions=True
+    )
+    
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_blocking_single_flight_shares_result():
+    """Test concurrent threads for one key share a single execution."""
+    from concurrent.futures import ThreadPoolExecutor
+    
+    flights = BlockingSingleFlight()
+    calls = []
+    
+    def work():
+        calls.append(1)
+        time.sleep(0.1)
+        return "done"
+    
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(lambda _: flights.do("key", work), range(3)))
+    
+    assert len(calls) == 1
+    assert [result for result, _ in results] == ["done"] * 3
+    assert sorted(shared for _, shared in results) == [False, True, True]
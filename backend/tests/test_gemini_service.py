@@ -0,0 +1,92 @@
+"""
+Tests for the direct Gemini service.
+"""
+import asyncio
+import pytest
+from google.api_core import exceptions as google_exceptions
+from api.services.gemini_service import GeminiService
+from api.utils.config import Settings
+
+
+class FakeModel:
+    """Async stand-in for genai.GenerativeModel."""
+    
+    def __init__(self, failures=None, delay=0.0):
+        self.failures = dict(failures or {})
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def generate_content_async(self, prompt):
+        self.calls.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            errors = self.failures.get(prompt)
+            if errors:
+                raise errors.pop(0)
+            return type("Response", (), {"text": f"post about {prompt}"})()
+        finally:
+            self.in_flight -= 1
+
+
+def _service(model, **overrides) -> GeminiService:
+    settings = Settings(
+        gemini_model="gemini-1.5-flash",
+        gemini_service_backoff_base=0.001,
+        gemini_service_backoff_max=0.002,
+        **overrides
+    )
+    service = GeminiService(api_key="test-api-key", settings=settings)
+    service.model = model
+    return service
+
+
+@pytest.mark.asyncio
+async def test_generate_content_uses_configured_model():
+    """Test the model comes from settings and the async API is used."""
+    model = FakeModel()
+    service = _service(model)
+    
+    assert service.model_name == "gemini-1.5-flash"
+    assert await service.generate_content("AI") == "post about AI"
+    assert model.calls == ["AI"]
+
+
+@pytest.mark.asyncio
+async def test_generate_content_retries_transient_errors():
+    """Test rate limits and timeouts are retried, other errors are not."""
+    model = FakeModel(failures={
+        "AI": [google_exceptions.ResourceExhausted("quota"), asyncio.TimeoutError()],
+        "Bad": [google_exceptions.InvalidArgument("bad prompt")],
+    })
+    service = _service(model, gemini_service_max_retries=2)
+    
+    assert await service.generate_content("AI") == "post about AI"
+    assert model.calls.count("AI") == 3
+    assert await service.generate_content("Bad") is None
+    assert model.calls.count("Bad") == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_content_times_out_each_attempt():
+    """Test a hung call is abandoned after the timeout and retries run out."""
+    model = FakeModel(delay=1.0)
+    service = _service(model, gemini_service_max_retries=1)
+    
+    assert await service.generate_content("AI", timeout=0.01) is None
+    assert len(model.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_many_bounds_concurrency_and_keeps_order():
+    """Test a batch runs at most N calls at once and returns results in order."""
+    model = FakeModel(delay=0.01, failures={"B": [google_exceptions.InvalidArgument("bad")]})
+    service = _service(model)
+    
+    results = await service.generate_many(["A", "B", "C", "D", "E"], concurrency=2)
+    
+    assert results == ["post about A", None, "post about C", "post about D", "post about E"]
+    assert model.max_in_flight == 2
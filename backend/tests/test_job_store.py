@@ -0,0 +1,60 @@
+"""
+Tests for the job stores.
+"""
+import time
+import pytest
+from api.utils.job_store import MemoryJobStore, SQLiteJobStore, create_job_store
+
+
+def _job(job_id: str, ttl: float = 60.0) -> dict:
+    now = time.time()
+    return {
+        "id": job_id,
+        "status": "queued",
+        "params": {"topic": "Artificial Intelligence", "image_mode": "inline", "generation_mode": None},
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "started_at": None,
+        "finished_at": None,
+        "expires_at": now + ttl,
+    }
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Fixture providing each store implementation."""
+    if request.param == "sqlite":
+        return SQLiteJobStore(tmp_path / "jobs.sqlite3")
+    return MemoryJobStore()
+
+
+def test_job_round_trip(store):
+    """Test a job and its result survive storage unchanged."""
+    store.create(_job("a"))
+    store.update("a", status="succeeded", result={"linkedin_post": "Post"}, finished_at=1.0)
+    
+    job = store.get("a")
+    assert job["status"] == "succeeded"
+    assert job["params"]["topic"] == "Artificial Intelligence"
+    assert job["result"] == {"linkedin_post": "Post"}
+    assert job["finished_at"] == 1.0
+    assert store.get("missing") is None
+
+
+def test_expired_jobs_are_hidden_and_purged(store):
+    """Test jobs past their TTL are no longer returned."""
+    store.create(_job("old", ttl=-1.0))
+    assert store.get("old") is None
+    
+    store.create(_job("new"))
+    assert store.get("new") is not None
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    """Test a job written by one process's store is visible to another's."""
+    path = tmp_path / "jobs.sqlite3"
+    create_job_store("sqlite", str(path)).create(_job("a"))
+    
+    assert create_job_store("sqlite", str(path)).get("a")["status"] == "queued"
+    assert isinstance(create_job_store("memory"), MemoryJobStore)
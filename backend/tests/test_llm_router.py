@@ -0,0 +1,220 @@
+"""
+Tests for the LLM router and circuit breakers.
+"""
+import asyncio
+import time
+import pytest
+from typing import Any, List
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from api.services.llm_router import CircuitBreaker, LLMRouter, RouteTarget
+from api.utils.deadline import Deadline, DeadlineExceeded, deadline_scope
+from api.utils.metrics import DEADLINE_EXPIRIES, LLM_FAILOVERS
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers with a fixed reply, fails, or hangs."""
+    
+    reply: str = "ok"
+    fail: bool = False
+    delay: float = 0.0
+    calls: int = 0
+    streams_closed: int = 0
+    
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+    
+    def _answer(self) -> ChatResult:
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("rate limited")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.delay)
+        return self._answer()
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.delay)
+        return self._answer()
+    
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("rate limited")
+        try:
+            for word in self.reply.split():
+                yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+        finally:
+            self.streams_closed += 1
+
+
+def make_router(*llms: FakeChatModel, timeout: float = 1.0, **breaker_args: Any) -> LLMRouter:
+    """Build a router over fake models with fresh breakers."""
+    targets = [
+        RouteTarget("fake", f"model-{index}", llm, CircuitBreaker(**breaker_args))
+        for index, llm in enumerate(llms)
+    ]
+    return LLMRouter(targets=targets, call_timeout=timeout)
+
+
+def test_breaker_opens_on_error_rate_and_recovers():
+    """Test the breaker trips, refuses calls, then closes after a good trial."""
+    breaker = CircuitBreaker(window=4, min_calls=4, error_rate=0.5, open_seconds=0.05)
+    for success in (True, False, True, False):
+        breaker.record(success, 0.1)
+    
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow() is False
+    
+    time.sleep(0.06)
+    assert breaker.allow() is True  # Half-open trial
+    assert breaker.allow() is False  # Only one trial at a time
+    breaker.record(True, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_on_slow_calls():
+    """Test consistently slow calls trip the breaker."""
+    breaker = CircuitBreaker(window=3, min_calls=3, slow_call_seconds=1.0, slow_rate=0.6)
+    for _ in range(3):
+        breaker.record(True, 2.0)
+    
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+@pytest.mark.asyncio
+async def test_router_fails_over_on_error():
+    """Test a failing primary falls through to the next model."""
+    router = make_router(FakeChatModel(fail=True), FakeChatModel(reply="from fallback"))
+    
+    failovers = LLM_FAILOVERS.value(from_target="fake:model-0", to_target="fake:model-1")
+    
+    response = await router.ainvoke("hello")
+    
+    assert response.content == "from fallback"
+    assert router.snapshot()[0]["window_failures"] == 1
+    assert LLM_FAILOVERS.value(from_target="fake:model-0", to_target="fake:model-1") == failovers + 1
+
+
+@pytest.mark.asyncio
+async def test_router_fails_over_on_timeout():
+    """Test a hanging primary is abandoned after the per-call timeout."""
+    router = make_router(FakeChatModel(delay=5), FakeChatModel(reply="fast"), timeout=0.05)
+    
+    started = time.monotonic()
+    response = await router.ainvoke("hello")
+    
+    assert response.content == "fast"
+    assert time.monotonic() - started < 1
+
+
+@pytest.mark.asyncio
+async def test_router_stops_failing_over_at_request_deadline():
+    """Test the call timeout is capped by the deadline and no fallback starts after it."""
+    fallback = FakeChatModel(reply="fallback")
+    router = make_router(FakeChatModel(delay=5), fallback, timeout=10)
+    expiries = DEADLINE_EXPIRIES.value(stage="llm")
+    
+    started = time.monotonic()
+    with deadline_scope(Deadline(0.05)), pytest.raises(DeadlineExceeded):
+        await router.ainvoke("hello")
+    
+    assert time.monotonic() - started < 1
+    assert fallback.calls == 0
+    assert router.snapshot()[0]["window_failures"] == 0
+    assert DEADLINE_EXPIRIES.value(stage="llm") == expiries + 1
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_releases_half_open_trial():
+    """Test a call refused by an expired deadline does not keep a half-open trial slot."""
+    router = make_router(FakeChatModel(reply="recovered"), window=1, min_calls=1, open_seconds=0.01)
+    breaker = router.targets[0].breaker
+    breaker.record(False, 0.1)
+    await asyncio.sleep(0.02)
+    
+    expired = Deadline(0)
+    with deadline_scope(expired), pytest.raises(DeadlineExceeded):
+        await router.ainvoke("hello")
+    
+    assert breaker.snapshot()["state"] == CircuitBreaker.HALF_OPEN
+    assert (await router.ainvoke("hello")).content == "recovered"
+    assert breaker.snapshot()["state"] == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_router_skips_open_breaker():
+    """Test an open breaker keeps calls away from its model."""
+    primary = FakeChatModel(fail=True)
+    fallback = FakeChatModel(reply="fallback")
+    router = make_router(primary, fallback, window=2, min_calls=2, open_seconds=60)
+    
+    for _ in range(4):
+        await router.ainvoke("hello")
+    
+    assert primary.calls == 2
+    assert router.snapshot()[0]["state"] == CircuitBreaker.OPEN
+
+
+@pytest.mark.asyncio
+async def test_router_raises_when_all_fail():
+    """Test the last provider error surfaces when every model fails."""
+    router = make_router(FakeChatModel(fail=True), FakeChatModel(fail=True))
+    
+    with pytest.raises(RuntimeError, match="rate limited"):
+        await router.ainvoke("hello")
+
+
+@pytest.mark.asyncio
+async def test_router_stream_fails_over_before_first_chunk():
+    """Test streaming switches model if the primary fails before producing output."""
+    router = make_router(FakeChatModel(fail=True), FakeChatModel(reply="streamed reply"))
+    
+    chunks = [chunk.content async for chunk in router.astream("hello")]
+    
+    assert "".join(chunks) == "streamedreply"
+
+
+def test_router_promote_moves_existing_target():
+    """Test promoting a known model keeps its breaker and reorders routing."""
+    router = make_router(FakeChatModel(), FakeChatModel())
+    second = router.targets[1]
+    
+    router.promote(RouteTarget("fake", "model-1", FakeChatModel(), CircuitBreaker()))
+    
+    assert router.primary is second
+    assert len(router.targets) == 2
+
+
+def test_router_sync_call_times_out_and_fails_over():
+    """Test synchronous calls get the per-call timeout too."""
+    # The abandoned call keeps its worker thread until it returns
+    router = make_router(FakeChatModel(delay=0.5), FakeChatModel(reply="fast"), timeout=0.05)
+    
+    started = time.monotonic()
+    response = router.invoke("hello")
+    
+    assert response.content == "fast"
+    assert time.monotonic() - started < 0.4
+    assert router.snapshot()[0]["window_failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_router_stream_closes_abandoned_provider_stream():
+    """Test the provider stream is closed when the consumer stops early."""
+    from langchain_core.messages import HumanMessage
+    
+    model = FakeChatModel(reply="one two three")
+    router = make_router(model)
+    
+    stream = router._astream([HumanMessage(content="hello")])
+    first = await stream.__anext__()
+    await stream.aclose()
+    
+    assert first.message.content == "one"
+    assert model.streams_closed == 1
+    assert router.targets[0].breaker.snapshot()["window_calls"] == 0
@@ -0,0 +1,51 @@
+"""
+Tests for logging configuration.
+"""
+import json
+import logging
+import queue
+import pytest
+import structlog
+from api.utils.logger import DroppingQueueHandler, EventSampler, setup_logging, stop_logging
+from api.utils.metrics import LOG_RECORDS_DROPPED
+
+
+def test_event_sampler_only_samples_listed_info_events(monkeypatch):
+    """Test listed events are sampled at info level, never at warning level."""
+    sampler = EventSampler({"attempting_google_search": 0.1})
+    monkeypatch.setattr("api.utils.logger.random.random", lambda: 0.5)
+    
+    with pytest.raises(structlog.DropEvent):
+        sampler(None, "info", {"event": "attempting_google_search"})
+    assert sampler(None, "warning", {"event": "attempting_google_search"})["sample_rate"] == 0.1
+    assert sampler(None, "info", {"event": "post_generated"}) == {"event": "post_generated"}
+    
+    monkeypatch.setattr("api.utils.logger.random.random", lambda: 0.05)
+    assert sampler(None, "info", {"event": "attempting_google_search"})["sample_rate"] == 0.1
+
+
+def test_queue_handler_drops_when_full():
+    """Test a full queue drops records instead of blocking the caller."""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+    dropped_before = LOG_RECORDS_DROPPED.value()
+    
+    handler.emit(record)
+    handler.emit(record)
+    
+    assert handler.queue.qsize() == 1
+    assert LOG_RECORDS_DROPPED.value() == dropped_before + 1
+
+
+def test_setup_logging_writes_rotating_file_in_background(tmp_path):
+    """Test records reach the log file through the writer thread."""
+    log_file = tmp_path / "logs" / "app.log"
+    try:
+        setup_logging("INFO", log_file=str(log_file), sample_rates={})
+        structlog.get_logger().info("queued_record", topic="AI")
+        stop_logging()
+        
+        events = [json.loads(line)["event"] for line in log_file.read_text().splitlines()]
+        assert events == ["logging_initialized", "queued_record"]
+    finally:
+        setup_logging("INFO", log_file="")
@@ -0,0 +1,44 @@
+"""
+Tests for the Prometheus-format metrics.
+"""
+import pytest
+from api.utils.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+def test_counter_and_gauge_render():
+    """Test counters and gauges render HELP, TYPE and labelled samples."""
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("requests_total", "Requests", ("route",)))
+    in_flight = registry.register(Gauge("in_flight", "In flight"))
+    
+    requests.inc(route="/a")
+    requests.inc(2, route="/a")
+    with in_flight.track_inprogress():
+        assert in_flight.value() == 1
+    
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/a"} 3' in text
+    assert "in_flight 0" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test histogram buckets, sum and count follow the exposition format."""
+    histogram = Histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="agent")
+    histogram.observe(0.5, stage="agent")
+    histogram.observe(5, stage="agent")
+    
+    lines = histogram.samples()
+    assert 'latency_seconds_bucket{stage="agent",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="agent",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="agent",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{stage="agent"} 5.55' in lines
+    assert 'latency_seconds_count{stage="agent"} 3' in lines
+
+
+def test_metric_rejects_wrong_labels():
+    """Test label names are enforced."""
+    counter = Counter("errors_total", "Errors", ("kind",))
+    with pytest.raises(ValueError):
+        counter.inc(stage="agent")
@@ -0,0 +1,64 @@
+"""
+Tests for search observation compaction.
+"""
+from api.utils.observations import NOTHING_NEW, ObservationCompactor, estimate_tokens, strip_boilerplate
+from api.utils.search_results import SearchResult, render_results
+
+
+def _results(*items) -> tuple:
+    return tuple(
+        SearchResult(title, url, snippet, "google", rank)
+        for rank, (title, url, snippet) in enumerate(items, 1)
+    )
+
+
+def test_strip_boilerplate():
+    """Test page furniture is removed and whitespace collapsed."""
+    text = "Chipmakers   report record sales. Read more » We use cookies to improve your experience. © 2025 News Ltd."
+    
+    assert strip_boilerplate(text) == "Chipmakers report record sales."
+
+
+def test_repeated_results_are_dropped_across_observations():
+    """Test near-identical snippets and seen URLs are not replayed."""
+    compactor = ObservationCompactor(token_budget=1000)
+    first = compactor.compact(_results(
+        ("AI chips", "https://a.example/chips", "Chipmakers report record quarterly sales as AI demand grows"),
+        ("AI chips again", "https://b.example/chips", "Chipmakers report record quarterly sales as AI demand grows!"),
+    ))
+    second = compactor.compact(_results(
+        ("AI chips", "https://a.example/chips", "Chipmakers report record quarterly sales as AI demand grows"),
+    ))
+    
+    assert first.count("Snippet:") == 1
+    assert "https://b.example/chips" in first  # New source kept, repeated snippet dropped
+    assert second == NOTHING_NEW
+
+
+def test_observation_is_cut_to_token_budget():
+    """Test results beyond the budget are truncated at a word boundary."""
+    compactor = ObservationCompactor(token_budget=40)
+    observation = _results(
+        ("One", "https://a.example/1", "alpha " * 60),
+        ("Two", "https://a.example/2", "beta " * 60),
+    )
+    
+    compacted = compactor.compact(observation)
+    
+    assert estimate_tokens(compacted) <= 40
+    assert compacted.startswith("Title: One\nURL: https://a.example/1\nSnippet: alpha")
+    assert compactor.raw_tokens == estimate_tokens(render_results(observation))
+    assert compactor.compacted_tokens == estimate_tokens(compacted)
+    assert compactor.compacted_tokens < compactor.raw_tokens
+
+
+def test_raw_text_is_deduplicated_by_sentence():
+    """Test unstructured result text drops repeated sentences."""
+    compactor = ObservationCompactor(token_budget=1000)
+    
+    compacted = compactor.compact(
+        "Fusion startup raises new funding round. Investors back fusion power plans. "
+        "Fusion startup raises new funding round."
+    )
+    
+    assert compacted == "Fusion startup raises new funding round. Investors back fusion power plans."
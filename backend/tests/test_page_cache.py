@@ -0,0 +1,41 @@
+"""
+Tests for the persistent page snippet cache.
+"""
+import time
+from api.utils.page_cache import PageCache
+
+
+def test_page_cache_round_trip_across_instances(tmp_path):
+    """Test entries written by one instance are visible to another (another worker)."""
+    path = tmp_path / "pages.sqlite3"
+    PageCache(path, max_entries=10).put("https://a.example.com", "Snippet A", etag='"v1"')
+    
+    entry = PageCache(path, max_entries=10).get("https://a.example.com")
+    
+    assert entry["snippet"] == "Snippet A"
+    assert entry["etag"] == '"v1"'
+    assert entry["last_modified"] is None
+
+
+def test_page_cache_evicts_oldest(tmp_path):
+    """Test the cache keeps only the most recently fetched pages."""
+    cache = PageCache(tmp_path / "pages.sqlite3", max_entries=2)
+    for index in range(3):
+        cache.put(f"https://{index}.example.com", f"Snippet {index}")
+        time.sleep(0.01)
+    
+    assert cache.get("https://0.example.com") is None
+    assert cache.get("https://2.example.com")["snippet"] == "Snippet 2"
+    assert cache.stats()["size"] == 2
+
+
+def test_page_cache_touch_refreshes_fetch_time(tmp_path):
+    """Test a revalidated page gets a new fetch time."""
+    cache = PageCache(tmp_path / "pages.sqlite3", max_entries=10)
+    cache.put("https://a.example.com", "Snippet A")
+    before = cache.get("https://a.example.com")["fetched_at"]
+    time.sleep(0.01)
+    
+    cache.touch("https://a.example.com")
+    
+    assert cache.get("https://a.example.com")["fetched_at"] > before
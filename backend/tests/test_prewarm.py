@@ -0,0 +1,79 @@
+"""
+Tests for topic tracking and pre-warming.
+"""
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from api.services.langchain_agent import get_post_cache
+from api.services.prewarm import PrewarmScheduler
+from api.utils.config import Settings
+from api.utils.trending import TopicTracker
+
+
+@pytest.fixture(autouse=True)
+def clear_post_cache():
+    """Fixture to isolate tests from cached posts."""
+    get_post_cache().clear()
+    yield
+    get_post_cache().clear()
+
+
+def test_tracker_ranks_by_decayed_frequency():
+    """Test recent requests outrank older ones and spellings share a topic."""
+    tracker = TopicTracker(half_life=100.0)
+    for _ in range(4):
+        tracker.record("Climate Policy", now=0.0)
+    tracker.record("AI", now=300.0)
+    tracker.record("  ai ", now=300.0)
+    
+    ranking = tracker.top(5, now=300.0)
+    
+    assert [topic for topic, _ in ranking] == ["  ai ", "Climate Policy"]
+    assert ranking[0][1] == pytest.approx(2.0)
+    assert ranking[1][1] == pytest.approx(0.5)  # 4 halved three times
+    assert tracker.top(5, min_score=1.0, now=300.0) == [("  ai ", pytest.approx(2.0))]
+
+
+def test_tracker_forgets_coldest_topic():
+    """Test the tracker stays bounded without dropping the topic just recorded."""
+    tracker = TopicTracker(max_topics=2)
+    tracker.record("A", now=0.0)
+    tracker.record("A", now=0.0)
+    tracker.record("B", now=0.0)
+    tracker.record("C", now=0.0)
+    
+    assert sorted(topic for topic, _ in tracker.top(5, now=0.0)) == ["A", "C"]
+
+
+@pytest.mark.asyncio
+async def test_prewarm_refreshes_popular_topics_near_expiry():
+    """Test only popular topics that are missing or about to expire are refreshed."""
+    settings = Settings(prewarm_top_n=3, prewarm_min_requests=1.5, prewarm_lead_seconds=60, prewarm_spacing=0)
+    tracker = TopicTracker()
+    for topic in ("Expiring", "Expiring", "Fresh", "Fresh", "Missing", "Missing", "Rare"):
+        tracker.record(topic)
+    cache = get_post_cache()
+    cache.set("expiring", {"linkedin_post": "old"}, ttl=30)
+    cache.set("fresh", {"linkedin_post": "new"}, ttl=600)
+    
+    agent = SimpleNamespace(refresh_post=AsyncMock())
+    scheduler = PrewarmScheduler(agent, tracker, settings)
+    
+    refreshed = await scheduler.run_once()
+    
+    assert sorted(refreshed) == ["Expiring", "Missing"]
+    assert agent.refresh_post.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_prewarm_leaves_slots_for_user_requests():
+    """Test a cycle stops when the generation slots are needed by users."""
+    settings = Settings(prewarm_min_requests=1, prewarm_reserved_slots=2)
+    tracker = TopicTracker()
+    tracker.record("Busy Topic")
+    agent = SimpleNamespace(refresh_post=AsyncMock())
+    scheduler = PrewarmScheduler(agent, tracker, settings)
+    
+    with patch("api.services.langchain_agent.get_run_limiter", return_value=SimpleNamespace(available=2)):
+        assert await scheduler.run_once() == []
+    agent.refresh_post.assert_not_awaited()
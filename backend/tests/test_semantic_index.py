@@ -0,0 +1,94 @@
+"""
+Tests for the semantic topic index.
+"""
+import time
+import pytest
+from api.utils.semantic_index import SemanticIndex, embed
+
+
+def test_embedding_ignores_wording():
+    """Test case, word order, plurals, filler words and abbreviations don't matter."""
+    base = embed("AI in healthcare", 128)
+    
+    assert float(base @ embed("healthcare AI", 128)) == pytest.approx(1.0, abs=1e-5)
+    assert float(base @ embed("Artificial Intelligence in Healthcare", 128)) == pytest.approx(1.0, abs=1e-5)
+    assert float(embed("Electric vehicles", 128) @ embed("electric vehicle news", 128)) == pytest.approx(1.0, abs=1e-5)
+    assert float(base @ embed("AI in finance", 128)) < 0.7
+    assert not embed("the latest news", 128).any()
+
+
+def test_lookup_returns_similar_key_above_threshold():
+    """Test a reworded topic finds the indexed key and an unrelated one does not."""
+    index = SemanticIndex(capacity=10, dim=128)
+    index.add("ai in healthcare", "AI in healthcare")
+    index.add("climate policy", "Climate policy")
+    
+    key, similarity = index.lookup("Artificial Intelligence in Healthcare", threshold=0.9)
+    
+    assert key == "ai in healthcare"
+    assert similarity > 0.99
+    assert index.lookup("AI in finance", threshold=0.9) is None
+    assert SemanticIndex(capacity=10).lookup("AI in healthcare", threshold=0.9) is None
+
+
+
+@pytest.mark.parametrize("indexed,requested", [
+    ("AI investment trends in Germany 2024", "AI investment trends in France 2024"),
+    ("Tesla Q3 2024 earnings", "Tesla Q2 2024 earnings"),
+    ("Tesla Q3 2024 earnings", "Tesla Q3 2023 earnings"),
+    ("Tesla earnings", "Ford earnings"),
+    ("ai investment trends in germany 2024", "ai investment trends in france 2024"),
+])
+def test_lookup_rejects_different_entity_or_number(indexed, requested):
+    """Test topics that differ only in a name or number do not share an entry, even at a low threshold."""
+    index = SemanticIndex(capacity=10, dim=128)
+    index.add("indexed", indexed)
+    
+    assert index.lookup(requested, threshold=0.9) is None
+    if requested[0].isupper():
+        assert index.lookup(requested, threshold=0.5) is None
+
+
+def test_lookup_skips_best_score_with_different_entity():
+    """Test a higher-scoring entry naming something else gives way to a matching one."""
+    index = SemanticIndex(capacity=10, dim=128)
+    index.add("germany", "AI investment trends in Germany 2024")
+    index.add("worldwide", "AI investment trends internationally 2024")
+    
+    # The Germany entry scores higher but names a country the request does not
+    key, similarity = index.lookup("AI investment trends 2024", threshold=0.5)
+    assert key == "worldwide"
+    assert similarity < float(embed("AI investment trends 2024", 128) @ embed("AI investment trends in Germany 2024", 128))
+
+def test_capacity_replaces_oldest_entry():
+    """Test the index stays bounded and re-adding a key reuses its slot."""
+    index = SemanticIndex(capacity=2, dim=128)
+    index.add("quantum", "Quantum computing")
+    index.add("fusion", "Fusion power")
+    index.add("fusion", "Fusion energy")
+    index.add("mars", "Mars mission")
+    
+    assert len(index) == 2
+    assert index.lookup("Quantum computing", threshold=0.9) is None
+    assert index.lookup("fusion energy", threshold=0.9)[0] == "fusion"
+    assert index.lookup("Mars missions", threshold=0.9)[0] == "mars"
+    
+    index.discard("mars")
+    assert index.lookup("Mars mission", threshold=0.9) is None
+    assert index.stats() == {"name": "index", "size": 1, "maxsize": 2}
+
+
+def test_lookup_latency_at_capacity():
+    """Test lookups stay around a millisecond with 20k indexed topics."""
+    index = SemanticIndex(capacity=20000, dim=128)
+    for number in range(20000):
+        index.add(number, f"topic {number} market update {number % 97}")
+    
+    index.lookup("AI in healthcare", threshold=0.9)
+    started = time.perf_counter()
+    for _ in range(100):
+        index.lookup("AI in healthcare", threshold=0.9)
+    per_lookup = (time.perf_counter() - started) / 100
+    
+    # Typically well under 1ms; the bound leaves room for slow CI machines
+    assert per_lookup < 0.01
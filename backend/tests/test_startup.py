@@ -0,0 +1,69 @@
+"""
+Cold-start import benchmark for the serverless entry point.
+
+Run with ``pytest tests/test_startup.py -s`` to print the slowest imports.
+COLD_START_MAX_SECONDS overrides the import time budget.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Libraries that must only load when a post is generated
+DEFERRED_MODULES = [
+    "langchain",
+    "langchain_core",
+    "langchain_community",
+    "langchain_google_genai",
+    "langchain_groq",
+    "googlesearch",
+    "requests",
+    "bs4",
+    "numpy",
+    "duckduckgo_search",
+]
+
+
+def _import_profile(module: str) -> dict:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+    
+    Args:
+        module: Module to import
+    
+    Returns:
+        Mapping of module name to cumulative import time in seconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            profile[name.strip()] = int(cumulative) / 1_000_000
+    return profile
+
+
+@pytest.mark.slow
+def test_entry_point_import_time():
+    """Test index.py imports within budget and without the heavy LLM stack."""
+    budget = float(os.environ.get("COLD_START_MAX_SECONDS", "2.0"))
+    profile = _import_profile("index")
+    
+    print("\nSlowest imports (cumulative seconds):")
+    for name, seconds in sorted(profile.items(), key=lambda item: item[1], reverse=True)[:15]:
+        print(f"  {seconds:8.3f}  {name}")
+    
+    loaded = [module for module in DEFERRED_MODULES if module in profile]
+    assert not loaded, f"Imported at startup: {loaded}"
+    assert profile["index"] <= budget, f"Cold-start import took {profile['index']:.2f}s (budget {budget}s)"